@@ -0,0 +1,57 @@
+"""
+Walk-forward backtest of a model over the BIST universe.
+
+Uses the configured market data provider (replay by default, so runs are
+reproducible offline) and prints the summary, per-symbol results and timing.
+
+Usage:
+    python -m benchmarks.backtest --model random_forest --symbols 48 --horizon 7
+    python -m benchmarks.backtest --model arima --train-window 250 --output folds.csv
+"""
+import os
+import re
+import json
+import argparse
+
+# Must be set before the app modules pick their provider
+os.environ.setdefault("MARKET_DATA_PROVIDER", "replay")
+
+from models.backtest import BACKTEST_WORKERS, BacktestConfig, run_backtest
+from models.data_providers import get_provider
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def bist_symbols():
+    # Read the symbol list without importing the app (and its background tasks)
+    with open(os.path.join(API_DIR, "main.py"), encoding="utf-8") as f:
+        return re.findall(r'"([A-Z0-9]+\.IS)":', f.read())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="random_forest")
+    parser.add_argument("--symbols", type=int, default=48)
+    parser.add_argument("--period", default="2y")
+    parser.add_argument("--horizon", type=int, default=7)
+    parser.add_argument("--step", type=int, default=20)
+    parser.add_argument("--min-train", type=int, default=250)
+    parser.add_argument("--train-window", type=int, default=None, help="rolling window rows (default: expanding)")
+    parser.add_argument("--max-folds", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=BACKTEST_WORKERS)
+    parser.add_argument("--output", help="write per-fold rows to this CSV file")
+    args = parser.parse_args()
+
+    config = BacktestConfig(args.model, args.horizon, args.step, args.min_train, args.train_window, args.max_folds)
+    frames = get_provider().get_history(bist_symbols()[:args.symbols], args.period)
+    result = run_backtest(frames, config, workers=args.workers)
+
+    print(json.dumps(result.summary(), indent=2, default=str))
+    print(result.by_symbol().to_string())
+    if args.output:
+        result.folds.to_csv(args.output, index=False)
+        print(f"Per-fold results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Offline benchmark for the prediction and sentiment paths.
+
+Runs /predict, the prediction sweep and the sentiment analysis against the
+deterministic replay provider, so timings are reproducible and no network
+access is needed.
+
+Usage:
+    python -m benchmarks.pipeline --symbols 10 --repeat 3
+"""
+import os
+import time
+import asyncio
+import argparse
+import statistics
+from typing import Callable, List
+
+# Must be set before the app modules pick their provider
+os.environ.setdefault("MARKET_DATA_PROVIDER", "replay")
+
+import main
+from models.sentiment_analysis import analyze_stocks_sentiment
+
+
+def _time(fn: Callable[[], object], repeat: int) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def _report(name: str, timings: List[float], count: int) -> None:
+    best = min(timings)
+    print(f"{name:<28} best {best:8.3f}s  median {statistics.median(timings):8.3f}s  "
+          f"({count / best:8.2f} symbols/s)")
+
+
+def run(symbol_count: int, repeat: int) -> None:
+    symbols = list(main.BIST_STOCKS.keys())[:symbol_count]
+    print(f"Provider: {os.environ['MARKET_DATA_PROVIDER']}, symbols: {len(symbols)}, repeat: {repeat}")
+
+    def predict_requests():
+        main.PREDICTION_CACHE.clear()
+        for symbol in symbols:
+            asyncio.run(main.predict(main.PredictionRequest(symbol=symbol)))
+
+    def prediction_sweep():
+        main.PREDICTION_CACHE.clear()
+        asyncio.run(main.update_prediction_cache())
+
+    def sentiment_sweep():
+        analyze_stocks_sentiment({symbol: symbol for symbol in symbols})
+
+    _report("POST /predict (cold cache)", _time(predict_requests, repeat), len(symbols))
+    _report("prediction sweep", _time(prediction_sweep, repeat), len(main.BIST_STOCKS))
+    _report("sentiment sweep", _time(sentiment_sweep, repeat), len(symbols))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline pipeline benchmark")
+    parser.add_argument("--symbols", type=int, default=10, help="Number of symbols for per-request paths")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of timed repetitions")
+    args = parser.parse_args()
+    run(args.symbols, args.repeat)
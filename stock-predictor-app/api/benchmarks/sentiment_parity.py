@@ -0,0 +1,98 @@
+"""
+Parity and speed of the batch sentiment scorer against TextBlob.
+
+Scores the fixture corpus (benchmarks/fixtures/sentiment_corpus.json) plus the
+replay provider's synthetic articles with both TextBlob and
+models.sentiment_scorer, prints the agreement and timings, and exits with
+status 1 when the agreement is below the thresholds.
+
+Usage:
+    python -m benchmarks.sentiment_parity
+    python -m benchmarks.sentiment_parity --repeat 50 --workers 4
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import datetime, timedelta
+
+import numpy as np
+
+os.environ.setdefault("MARKET_DATA_PROVIDER", "replay")
+
+from textblob import TextBlob
+
+from models.data_providers import ReplayProvider
+from models.sentiment_analysis import get_sentiment_explanation
+from models.sentiment_scorer import SentimentScorer, score_articles_local
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "sentiment_corpus.json")
+
+# Minimum share of articles scored exactly like TextBlob, and with the same label
+MIN_EXACT = 0.95
+MIN_LABEL = 0.98
+
+
+def textblob_score(article):
+    headline, summary = article.get('headline') or '', article.get('summary') or ''
+    if not headline.strip() and not summary.strip():
+        return None
+    summary_sentiment = TextBlob(summary).sentiment.polarity if summary else 0.0
+    return (TextBlob(headline).sentiment.polarity * 2 + summary_sentiment) / 3
+
+
+def corpus():
+    with open(FIXTURE, encoding="utf-8") as f:
+        articles = json.load(f)
+    provider, end = ReplayProvider(), datetime.now()
+    for symbol in ("AKBNK", "THYAO", "ASELS", "TUPRS"):
+        articles += provider.get_company_news(symbol, end - timedelta(days=90), end)
+    return articles
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="corpus copies in the timed batch")
+    parser.add_argument("--workers", type=int, default=0, help="scorer process pool size")
+    args = parser.parse_args()
+
+    articles = corpus()
+    expected = [textblob_score(article) for article in articles]
+    actual = score_articles_local(articles)
+
+    if [e is None for e in expected] != [a is None for a in actual]:
+        print("Empty-article handling differs")
+        sys.exit(1)
+    pairs = np.array([(e, a) for e, a in zip(expected, actual) if e is not None])
+    diff = np.abs(pairs[:, 0] - pairs[:, 1])
+    exact = float((diff < 1e-9).mean())
+    labels = float(np.mean([get_sentiment_explanation(e) == get_sentiment_explanation(a) for e, a in pairs]))
+    print(f"articles: {len(articles)}  exact: {exact:.1%}  same label: {labels:.1%}  "
+          f"mean |diff|: {diff.mean():.4f}  max |diff|: {diff.max():.4f}")
+    for i in np.flatnonzero(diff >= 1e-9)[:10]:
+        article = [a for a, e in zip(articles, expected) if e is not None][i]
+        print(f"  textblob {pairs[i, 0]:+.3f} batch {pairs[i, 1]:+.3f}  {article['headline']!r}")
+
+    batch = articles * args.repeat
+    start = time.perf_counter()
+    for article in batch:
+        textblob_score(article)
+    textblob_seconds = time.perf_counter() - start
+
+    scorer = SentimentScorer(workers=args.workers, pool_min_articles=0)
+    scorer.score_articles(batch[:10])  # start the pool outside the timing
+    start = time.perf_counter()
+    scorer.score_articles(batch)
+    batch_seconds = time.perf_counter() - start
+    scorer.shutdown()
+    print(f"{len(batch)} articles: textblob {textblob_seconds:.3f}s, batch {batch_seconds:.3f}s "
+          f"({textblob_seconds / batch_seconds:.0f}x)")
+
+    if exact < MIN_EXACT or labels < MIN_LABEL:
+        print(f"Parity below thresholds (exact >= {MIN_EXACT:.0%}, label >= {MIN_LABEL:.0%})")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Startup benchmark: API import time and memory, and the cost of each model backend.
+
+Every measurement runs in a fresh interpreter so module caches from one
+measurement do not hide the cost of the next.
+
+Usage:
+    python -m benchmarks.startup
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+from typing import Dict, List
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_CHILD = """
+import json, sys, time
+from models.backends import rss_mb
+base = rss_mb()
+start = time.perf_counter()
+import main
+result = {"main_seconds": time.perf_counter() - start, "main_rss_mb": rss_mb() - base}
+backend = sys.argv[1] if len(sys.argv) > 1 else None
+if backend:
+    from models.backends import load_backend, backend_status
+    try:
+        load_backend(backend)
+        result.update(backend_status()[backend])
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+print(json.dumps(result))
+"""
+
+
+def _measure(backend: str = None) -> Dict:
+    args = [sys.executable, "-c", _CHILD] + ([backend] if backend else [])
+    env = {**os.environ, "MARKET_DATA_PROVIDER": os.environ.get("MARKET_DATA_PROVIDER", "replay")}
+    completed = subprocess.run(args, cwd=API_DIR, env=env, capture_output=True, text=True)
+    if completed.returncode != 0:
+        return {"error": completed.stderr.strip().splitlines()[-1] if completed.stderr else "failed"}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run(backends: List[str]) -> None:
+    app = _measure()
+    if "error" in app:
+        print(f"import main failed: {app['error']}")
+        return
+    print(f"{'import main':<16} {app['main_seconds']:8.3f}s  {app['main_rss_mb']:8.1f} MB")
+
+    for name in backends:
+        result = _measure(name)
+        if "error" in result:
+            print(f"{name + ' backend':<16} unavailable ({result['error']})")
+        else:
+            print(f"{name + ' backend':<16} {result['seconds']:8.3f}s  {result['rss_mb']:8.1f} MB")
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, API_DIR)
+    from models.backends import BACKENDS
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", default=",".join(BACKENDS), help="comma separated backend names")
+    run([name for name in parser.parse_args().backends.split(",") if name])
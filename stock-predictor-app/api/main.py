@@ -12,16 +12,22 @@ from datetime import datetime, timedelta
 import logging
 
 from models.stock_data import get_stock_data, prepare_data, train_model
-from models.ml_models import (
-    moving_average_forecast,
-    linear_regression_forecast,
-    knn_forecast,
-    auto_arima_forecast,
-    prophet_forecast,
-    lstm_forecast
-)
-from models.sentiment_analysis import analyze_stocks_sentiment, get_all_bist_sentiment, SentimentAnalyzer
-from models.predictor import StockPredictor
+from models.data_providers import get_provider
+from models.sentiment_analysis import empty_result, get_sentiment_analyzer, is_placeholder
+from models.sentiment_scorer import get_sentiment_scorer
+from models.sentiment_stream import SENTIMENT_HALF_LIVES
+from models.news_client import close_news_clients
+from models.refresh_scheduler import RefreshScheduler
+from models.predictor import StockPredictor, MODEL_TYPES, BATCH_MODEL_TYPES
+from models.multi_horizon import MULTI_HORIZON_MODEL_TYPE
+from models.pooled_model import POOLED_MODEL_TYPE
+from models.panel_features import prepare_feature_frames
+from models.streaming_indicators import save_indicator_engine
+from models.singleflight import SingleFlight
+from models.ensemble import run_ensemble
+from models.analog_index import get_analog_index
+from models.backends import PRELOAD_BACKENDS, backend_status, load_backend, preload_backends
+from models.training_executor import TrainingExecutor
 
 # Load environment variables
 load_dotenv()
@@ -43,6 +49,8 @@ app.add_middleware(
 # Cache for sentiment analysis results
 SENTIMENT_CACHE: Dict[str, Dict] = {}
 PREDICTION_CACHE: Dict[str, Dict] = {}
+# Zaman serisi tahminleri: sembol -> model -> 30 günlük tahmin
+FORECAST_CACHE: Dict[str, Dict[str, Dict]] = {}
 
 # BIST hisselerinin listesi ve şirket adları
 BIST_STOCKS = {
@@ -107,17 +115,130 @@ class ForecastRequest(BaseModel):
     time_horizon: int = 7
     model_type: str = "random_forest"
 
+class EnsembleRequest(BaseModel):
+    symbol: str
+    models: Optional[List[str]] = None  # Varsayılan: tüm modeller
+    deadlines: Dict[str, float] = {}  # Model başına süre sınırı (saniye)
+    weights: Dict[str, float] = {}
+
 class SentimentRequest(BaseModel):
     symbols: List[str]
     force_refresh: bool = False
+    half_life: Optional[str] = None  # SENTIMENT_HALF_LIVES içinden (ör. "1d", "30d")
 
 class WebSocketSubscription(BaseModel):
     action: str  # "subscribe" veya "unsubscribe"
     symbols: List[str]
 
-# Model ve analizör başlatma
-predictor = StockPredictor()
-sentiment_analyzer = SentimentAnalyzer()
+# Arka plan taramasında kullanılacak model tipi (random_forest, linear_regression, pooled_forest, multi_horizon)
+SWEEP_MODEL_TYPE = os.getenv("SWEEP_MODEL_TYPE", "random_forest")
+if SWEEP_MODEL_TYPE not in MODEL_TYPES:
+    SWEEP_MODEL_TYPE = "random_forest"
+
+# Taramadan sonra tüm hisseler için çalıştırılacak zaman serisi modelleri (ör. "prophet,arima")
+SWEEP_FORECASTERS = [name.strip() for name in os.getenv("SWEEP_FORECASTERS", "").split(",") if name.strip()]
+
+# Duygu önbelleği haber hızı ve abone ilgisine göre sembol bazında yenilenir ("0": 3 saatte bir tüm hisseler)
+SENTIMENT_ADAPTIVE_REFRESH = os.getenv("SENTIMENT_ADAPTIVE_REFRESH", "1") == "1"
+
+# Model ve analizör başlatma (havuzlanmış model tüm BIST evreni üzerinde eğitilir)
+predictor = StockPredictor(universe=list(BIST_STOCKS.keys()))
+sentiment_analyzer = get_sentiment_analyzer()
+
+# Aynı anahtar için eşzamanlı hesaplamaları tek bir hesaplamada birleştirir
+inflight_requests = SingleFlight()
+
+# Toplu tarama eğitimleri için süreç havuzu (TRAINING_WORKERS, TRAINING_THREADS_PER_TASK)
+training_executor = TrainingExecutor()
+
+async def predict_coalesced(symbol: str, time_horizon: int, model_type: str,
+                            data: Optional[pd.DataFrame] = None,
+                            features: Optional[pd.DataFrame] = None,
+                            use_pool: bool = False) -> Dict[str, Any]:
+    """
+    Aynı (sembol, model, ufuk, veri sürümü) için eşzamanlı tahminleri tek hesaplamada birleştirir.
+    use_pool ile hesaplama API sürecindeki bir iş parçacığı yerine eğitim süreç havuzunda yapılır.
+    """
+    if model_type == POOLED_MODEL_TYPE:
+        await ensure_pooled_model([symbol])
+    data_version = await asyncio.to_thread(get_provider().data_version, symbol)
+    # Çok ufuklu model tüm ufukları tek eğride döndürdüğü için ufuk anahtara girmez
+    horizon_key = None if model_type == MULTI_HORIZON_MODEL_TYPE else time_horizon
+    key = ("prediction", symbol, model_type, horizon_key, data_version)
+    if use_pool:
+        result = await inflight_requests.do(
+            key,
+            training_executor.predict,
+            symbol,
+            time_horizon,
+            model_type,
+            data,
+            features
+        )
+    else:
+        result = await inflight_requests.run_in_thread(
+            key,
+            predictor.predict_stock,
+            symbol,
+            time_horizon,
+            model_type,
+            data,
+            features
+        )
+    return StockPredictor.result_for_horizon(result, time_horizon)
+
+async def ensure_pooled_model(symbols: List[str]) -> None:
+    """
+    Havuzlanmış model eskiyse tüm evren üzerinde eğitim süreç havuzunda eğitir.
+    Eşzamanlı çağıranlar aynı eğitimi bekler; tahmin API sürecinde eğitim yapmaz.
+    """
+    reason = await asyncio.to_thread(predictor.pooled_stale_reason, symbols)
+    if reason is None:
+        return
+    universe = list(dict.fromkeys(predictor.universe + [StockPredictor._ticker(symbol) for symbol in symbols]))
+    logger.info(f"Training {POOLED_MODEL_TYPE} model in the training pool: {reason}")
+    await inflight_requests.do(("train", POOLED_MODEL_TYPE), training_executor.train_pooled, universe)
+
+def cached_prediction(symbol: str, model_type: str, time_horizon: int) -> Optional[Dict[str, Any]]:
+    """
+    12 saatten yeni ve aynı model tipiyle hesaplanmış önbellek kaydını döndürür.
+    Tahmin eğrisi içeren kayıtlar istenen ufka uyarlanır.
+    """
+    cached = PREDICTION_CACHE.get(symbol)
+    if not cached or cached.get("model_type") != model_type:
+        return None
+    cache_time = datetime.fromisoformat(cached["prediction_date"])
+    if datetime.now() - cache_time >= timedelta(hours=12):
+        return None
+    return StockPredictor.result_for_horizon(cached, time_horizon)
+
+def check_half_life(half_life: Optional[str]) -> None:
+    """İstenen yarı ömür takip edilenlerden biri değilse 400 döndürür."""
+    if half_life is not None and half_life not in SENTIMENT_HALF_LIVES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown half_life {half_life}. Available: {', '.join(SENTIMENT_HALF_LIVES)}"
+        )
+
+def select_half_life(data: Dict[str, Any], half_life: Optional[str]) -> Dict[str, Any]:
+    """Duygu sonucunun puan, açıklama ve tavsiyesini istenen yarı ömrün değerleriyle döndürür."""
+    horizon = data.get("sentiment_horizons", {}).get(half_life) if half_life else None
+    if horizon is None:
+        return data
+    return {
+        **data,
+        "sentiment": horizon["sentiment"],
+        "sentiment_explanation": horizon["sentiment_explanation"],
+        "recommendation": horizon["recommendation"],
+    }
+
+async def sentiment_coalesced(symbol: str) -> Optional[Dict[str, Any]]:
+    """Aynı sembol için eşzamanlı duygu analizlerini tek hesaplamada birleştirir."""
+    return await inflight_requests.do(
+        ("sentiment", symbol),
+        sentiment_analyzer.aget_news_sentiment,
+        symbol
+    )
 
 # WebSocket bağlantı yöneticisi
 class ConnectionManager:
@@ -146,6 +267,15 @@ class ConnectionManager:
                 if symbol in self.subscriptions[websocket]:
                     self.subscriptions[websocket].remove(symbol)
                     
+    def subscriber_counts(self) -> Dict[str, int]:
+        """Sembol başına doğrudan abone sayısı ("*" aboneleri hiçbir sembolü öne çıkarmaz)"""
+        counts: Dict[str, int] = {}
+        for symbols in self.subscriptions.values():
+            for symbol in symbols:
+                if symbol != "*":
+                    counts[symbol] = counts.get(symbol, 0) + 1
+        return counts
+                    
     async def broadcast_to_subscribers(self, symbol: str, message: str):
         for connection, symbols in self.subscriptions.items():
             if symbol in symbols or "*" in symbols:  # "*" tüm hisselere abone olmak anlamına gelir
@@ -156,71 +286,208 @@ class ConnectionManager:
 
 manager = ConnectionManager()
 
+# Sıcak hisseleri birkaç dakikada, sessiz olanları birkaç saatte bir yoklar (SENTIMENT_REFRESH_* ayarları)
+sentiment_scheduler = RefreshScheduler(list(BIST_STOCKS.keys()), manager.subscriber_counts)
+sentiment_refresh_task: Optional[asyncio.Task] = None
+
+@app.on_event("startup")
+async def preload_model_backends():
+    """PRELOAD_BACKENDS ile seçilen ağır model kütüphanelerini ilk istekten önce yükler."""
+    if PRELOAD_BACKENDS:
+        await asyncio.to_thread(preload_backends)
+
+@app.on_event("startup")
+async def start_sentiment_scheduler():
+    """Uyarlanabilir duygu yenileme döngüsünü başlatır."""
+    global sentiment_refresh_task
+    if SENTIMENT_ADAPTIVE_REFRESH:
+        sentiment_refresh_task = asyncio.create_task(sentiment_scheduler.run(refresh_sentiment))
+
 @app.on_event("startup")
 @repeat_every(seconds=60 * 60 * 3)  # Run every 3 hours
 async def update_caches():
     """Önbellekleri periyodik olarak günceller."""
     try:
-        await update_sentiment_cache()
+        if not SENTIMENT_ADAPTIVE_REFRESH:
+            await update_sentiment_cache()
         await update_prediction_cache()
     except Exception as e:
         logger.error(f"Cache update error: {e}")
 
+async def refresh_sentiment(symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Verilen hisselerin duygu analizini yeniler, önbelleğe yazar ve tavsiyesi
+    değişen hisselerin abonelerine bildirim gönderir.
+    """
+    # Haberler ortak bağlantı havuzu ve API kotası sınırında eşzamanlı çekilir
+    results = await sentiment_analyzer.analyze_many(symbols)
+    for symbol, data in results.items():
+        # Haber alınamayan hisselerin yer tutucu sonucu önceki kaydın yerine yazılmaz, bildirim gönderilmez
+        if is_placeholder(data):
+            continue
+        
+        # Eski tavsiye önbellek güncellenmeden önce okunur
+        old_recommendation = SENTIMENT_CACHE.get(symbol, {}).get("recommendation")
+        new_recommendation = data.get("recommendation")
+        SENTIMENT_CACHE[symbol] = {
+            **data,
+            "analysis_date": datetime.now().isoformat()
+        }
+        
+        # Tavsiye değiştiğinde bildirim gönder
+        if old_recommendation is not None and old_recommendation != new_recommendation:
+            notification = {
+                "type": "recommendation_change",
+                "symbol": symbol,
+                "company": BIST_STOCKS.get(symbol, symbol),
+                "old_recommendation": old_recommendation,
+                "new_recommendation": new_recommendation,
+                "sentiment": data.get("sentiment"),
+                "timestamp": datetime.now().isoformat()
+            }
+            await manager.broadcast_to_subscribers(
+                symbol, 
+                json.dumps(notification)
+            )
+    return results
+
 async def update_sentiment_cache():
-    """Duygu analizi önbelleğini günceller."""
+    """Duygu analizi önbelleğini tüm hisseler için günceller."""
     logger.info("Updating sentiment cache...")
     try:
-        results = await asyncio.to_thread(sentiment_analyzer.get_all_bist_sentiment)
-        for symbol, data in results.items():
-            SENTIMENT_CACHE[symbol] = {
-                **data,
-                "analysis_date": datetime.now().isoformat()
-            }
-        
-        # Önemli haber veya değişiklik olan hisseleri belirle ve bildirimleri gönder
-        for symbol, data in results.items():
-            if symbol in SENTIMENT_CACHE:
-                old_recommendation = SENTIMENT_CACHE[symbol].get("recommendation")
-                new_recommendation = data.get("recommendation")
-                
-                # Tavsiye değiştiğinde bildirim gönder
-                if old_recommendation != new_recommendation:
-                    notification = {
-                        "type": "recommendation_change",
-                        "symbol": symbol,
-                        "company": BIST_STOCKS.get(symbol, symbol),
-                        "old_recommendation": old_recommendation,
-                        "new_recommendation": new_recommendation,
-                        "sentiment": data.get("sentiment"),
-                        "timestamp": datetime.now().isoformat()
-                    }
-                    await manager.broadcast_to_subscribers(
-                        symbol, 
-                        json.dumps(notification)
-                    )
+        results = await refresh_sentiment(list(BIST_STOCKS.keys()))
+        # Zamanlayıcı bu yoklamaları sayar, hisseler hemen tekrar yoklanmaz
+        sentiment_scheduler.record_results(results)
     except Exception as e:
         logger.error(f"Sentiment update error: {e}")
 
 async def update_prediction_cache():
     """Fiyat tahmin önbelleğini günceller."""
     logger.info("Updating prediction cache...")
+    progress = training_executor.progress
     try:
-        for symbol in BIST_STOCKS.keys():
-            try:
-                prediction = await asyncio.to_thread(
-                    predictor.predict_stock, 
-                    symbol, 
-                    7, 
-                    "random_forest"
-                )
+        # Tüm hisselerin geçmişini sağlayıcıdan tek seferde al
+        price_frames = await asyncio.to_thread(
+            get_provider().get_history,
+            list(BIST_STOCKS.keys()),
+            "2y"
+        )
+        logger.info(f"Market data provider returned data for {len(price_frames)}/{len(BIST_STOCKS)} stocks")
+        
+        progress.start(len(BIST_STOCKS))
+        if SWEEP_MODEL_TYPE in BATCH_MODEL_TYPES:
+            if SWEEP_MODEL_TYPE == POOLED_MODEL_TYPE:
+                await ensure_pooled_model(list(BIST_STOCKS.keys()))
+            # Tüm hisselerin özelliklerini tek vektörel geçişte hesapla
+            feature_frames = await asyncio.to_thread(prepare_feature_frames, price_frames)
+            # Tüm hisseler tek bir toplu eğitim ve tahmin çağrısıyla güncellenir
+            predictions = await asyncio.to_thread(
+                predictor.predict_stocks,
+                list(BIST_STOCKS.keys()),
+                7,
+                SWEEP_MODEL_TYPE,
+                feature_frames
+            )
+            for symbol, prediction in predictions.items():
                 PREDICTION_CACHE[symbol] = {
                     **prediction,
                     "prediction_date": datetime.now().isoformat()
                 }
-            except Exception as e:
-                logger.error(f"Prediction error for {symbol}: {e}")
+                progress.advance(failed="error" in prediction)
+        else:
+            # Taze modeli olan hisselerde yalnızca son satır akış motoruyla hesaplanır
+            latest = await asyncio.to_thread(predictor.predict_latest, price_frames, 7, SWEEP_MODEL_TYPE)
+            for symbol, prediction in latest.items():
+                PREDICTION_CACHE[symbol] = {
+                    **prediction,
+                    "prediction_date": datetime.now().isoformat()
+                }
+                progress.advance()
+            
+            # Eğitilecek hisselerin özellikleri tek vektörel geçişte hesaplanır
+            pending = [symbol for symbol in BIST_STOCKS.keys() if symbol not in latest]
+            feature_frames = await asyncio.to_thread(
+                prepare_feature_frames,
+                {symbol: price_frames[symbol] for symbol in pending if symbol in price_frames}
+            )
+            logger.info(f"{len(latest)} stocks scored from stored models, {len(pending)} to train")
+            
+            async def update_symbol(symbol: str):
+                try:
+                    prediction = await predict_coalesced(
+                        symbol, 
+                        7, 
+                        SWEEP_MODEL_TYPE,
+                        None if symbol in feature_frames else price_frames.get(symbol),
+                        feature_frames.get(symbol),
+                        use_pool=True
+                    )
+                    # Her hisse biter bitmez önbelleğe yaz
+                    PREDICTION_CACHE[symbol] = {
+                        **prediction,
+                        "prediction_date": datetime.now().isoformat()
+                    }
+                    progress.advance(failed="error" in prediction)
+                except Exception as e:
+                    progress.advance(failed=True)
+                    logger.error(f"Prediction error for {symbol}: {e}")
+            
+            # Eğitimler süreç havuzuna dağıtılır; havuz boyutu eşzamanlılığı sınırlar
+            await asyncio.gather(*(update_symbol(symbol) for symbol in pending))
+        progress.finish()
+        logger.info(f"Prediction sweep finished: {progress.as_dict()}")
     except Exception as e:
+        progress.finish()
         logger.error(f"Prediction update error: {e}")
+        return
+    
+    await update_forecast_cache(price_frames)
+
+async def update_forecast_cache(price_frames: Dict[str, pd.DataFrame]):
+    """Benzer örüntü dizinini ve SWEEP_FORECASTERS ile seçilen zaman serisi modellerinin tahminlerini günceller."""
+    closes = {symbol: df['Close'] for symbol, df in price_frames.items() if not df.empty}
+    
+    # Benzer geçmiş örüntü dizinine yalnızca yeni tamamlanan pencereler eklenir
+    added = await asyncio.to_thread(get_analog_index().update_many, closes)
+    logger.info(f"Analog index updated with {added} windows ({len(get_analog_index())} total)")
+    
+    for name in SWEEP_FORECASTERS:
+        try:
+            if name == "prophet":
+                # Modeller süreç havuzunda, kayıtlı parametrelerden sıcak başlatılarak eğitilir
+                forecasts = await asyncio.to_thread(
+                    load_backend("prophet").get_prophet_service().forecast_many, closes
+                )
+            elif name == "arima":
+                forecasts = {
+                    symbol: {"forecast": values.tolist()}
+                    for symbol, values in (await asyncio.to_thread(
+                        load_backend("arima").get_arima_service().forecast_many, closes
+                    )).items()
+                }
+            else:
+                logger.warning(f"Unknown sweep forecaster: {name}")
+                continue
+            
+            for symbol, forecast in forecasts.items():
+                FORECAST_CACHE.setdefault(symbol, {})[name] = {
+                    **forecast,
+                    "forecast_date": datetime.now().isoformat()
+                }
+            logger.info(f"{name} forecasts updated for {len(forecasts)}/{len(closes)} stocks")
+        except Exception as e:
+            logger.error(f"{name} forecast update error: {e}")
+
+@app.on_event("shutdown")
+async def shutdown_training_pool():
+    if sentiment_refresh_task is not None:
+        sentiment_refresh_task.cancel()
+    training_executor.shutdown()
+    await close_news_clients()
+    get_sentiment_scorer().shutdown()
+    save_indicator_engine()
+    if backend_status()["prophet"] is not None:
+        load_backend("prophet").get_prophet_service().shutdown()
 
 @app.get("/")
 async def root():
@@ -230,6 +497,28 @@ async def root():
 async def get_stocks():
     return BIST_STOCKS
 
+@app.get("/sweep-status")
+async def get_sweep_status():
+    """Arka plan tahmin taramasının ilerleme durumunu döndürür"""
+    return training_executor.progress.as_dict()
+
+@app.get("/sentiment-schedule")
+async def get_sentiment_schedule():
+    """Hisselerin duygu yenileme aralıklarını ve haber hızlarını döndürür"""
+    return sentiment_scheduler.status()
+
+@app.get("/backends")
+async def get_backends():
+    """Yüklenmiş model kütüphanelerini, yükleme süresi ve bellek kullanımıyla döndürür"""
+    return backend_status()
+
+@app.get("/forecasts/{symbol}")
+async def get_forecasts(symbol: str):
+    """Arka plan taramasında hesaplanan zaman serisi tahminlerini döndürür"""
+    if symbol not in FORECAST_CACHE:
+        raise HTTPException(status_code=404, detail=f"No forecasts for {symbol}")
+    return FORECAST_CACHE[symbol]
+
 @app.post("/predict")
 async def predict(request: PredictionRequest):
     try:
@@ -237,16 +526,11 @@ async def predict(request: PredictionRequest):
         cache_key = f"{request.symbol}_{request.model_type}_{request.time_horizon}"
         
         # Tahmin önbelleği kontrolü
-        prediction_data = None
-        if request.symbol in PREDICTION_CACHE:
-            cache_time = datetime.fromisoformat(PREDICTION_CACHE[request.symbol]["prediction_date"])
-            if datetime.now() - cache_time < timedelta(hours=12):  # 12 saatten yeni ise
-                prediction_data = PREDICTION_CACHE[request.symbol]
+        prediction_data = cached_prediction(request.symbol, request.model_type, request.time_horizon)
         
         # Önbellekte yoksa hesapla
         if not prediction_data:
-            prediction_data = await asyncio.to_thread(
-                predictor.predict_stock, 
+            prediction_data = await predict_coalesced(
                 request.symbol, 
                 request.time_horizon, 
                 request.model_type
@@ -261,15 +545,16 @@ async def predict(request: PredictionRequest):
         
         # Önbellekte yoksa duygu analizini hesapla
         if not sentiment_data:
-            sentiment_result = await asyncio.to_thread(
-                sentiment_analyzer.get_news_sentiment, 
-                request.symbol
-            )
-            sentiment_data = {
-                **sentiment_result,
-                "analysis_date": datetime.now().isoformat()
-            }
-            SENTIMENT_CACHE[request.symbol] = sentiment_data
+            sentiment_result = await sentiment_coalesced(request.symbol)
+            if sentiment_result is not None:
+                sentiment_data = {
+                    **sentiment_result,
+                    "analysis_date": datetime.now().isoformat()
+                }
+                SENTIMENT_CACHE[request.symbol] = sentiment_data
+            else:
+                # Haber alınamazsa varsa eski kayıt kullanılır
+                sentiment_data = SENTIMENT_CACHE.get(request.symbol, {})
         
         # Tahmin ve duygu analizini birleştir
         result = {
@@ -306,15 +591,13 @@ async def forecast(request: ForecastRequest):
     for symbol in request.symbols:
         try:
             # Önbelleği kontrol et
-            if symbol in PREDICTION_CACHE:
-                cache_time = datetime.fromisoformat(PREDICTION_CACHE[symbol]["prediction_date"])
-                if datetime.now() - cache_time < timedelta(hours=12):  # 12 saatten yeni ise
-                    results[symbol] = PREDICTION_CACHE[symbol]
-                    continue
+            cached = cached_prediction(symbol, request.model_type, request.time_horizon)
+            if cached:
+                results[symbol] = cached
+                continue
             
             # Önbellekte yoksa hesapla
-            prediction = await asyncio.to_thread(
-                predictor.predict_stock, 
+            prediction = await predict_coalesced(
                 symbol, 
                 request.time_horizon, 
                 request.model_type
@@ -331,9 +614,25 @@ async def forecast(request: ForecastRequest):
     
     return results
 
+@app.post("/ensemble")
+async def ensemble(request: EnsembleRequest):
+    """
+    Seçilen zaman serisi modellerini aynı fiyat serisi üzerinde eşzamanlı çalıştırır.
+    Süre sınırını aşan modeller beklenmeden birleşimden çıkarılır.
+    """
+    ticker = request.symbol if request.symbol.endswith('.IS') else f"{request.symbol}.IS"
+    data = await asyncio.to_thread(get_provider().get_price_history, ticker, "2y")
+    if data.empty:
+        raise HTTPException(status_code=404, detail=f"No data for {request.symbol}")
+    try:
+        return await run_ensemble(data, ticker, request.models, request.deadlines, request.weights)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @app.get("/sentiment")
-async def get_all_sentiment(force_refresh: bool = False):
-    """Tüm BIST hisseleri için duygu analizi sonuçlarını döndürür"""
+async def get_all_sentiment(force_refresh: bool = False, half_life: Optional[str] = None):
+    """Tüm BIST hisseleri için duygu analizi sonuçlarını döndürür (half_life: kısa/uzun vadeli duygu)"""
+    check_half_life(half_life)
     try:
         # Force refresh kontrolü
         if force_refresh:
@@ -349,6 +648,7 @@ async def get_all_sentiment(force_refresh: bool = False):
         hold = []
         
         for symbol, data in SENTIMENT_CACHE.items():
+            data = select_half_life(data, half_life)
             result = {
                 "symbol": symbol,
                 "company": BIST_STOCKS.get(symbol, symbol),
@@ -383,6 +683,7 @@ async def get_all_sentiment(force_refresh: bool = False):
 @app.post("/sentiment-specific")
 async def get_specific_sentiment(request: SentimentRequest):
     """Belirli hisseler için duygu analizi sonuçlarını döndürür"""
+    check_half_life(request.half_life)
     try:
         results = {}
         
@@ -391,14 +692,18 @@ async def get_specific_sentiment(request: SentimentRequest):
             if not request.force_refresh and symbol in SENTIMENT_CACHE:
                 cache_time = datetime.fromisoformat(SENTIMENT_CACHE[symbol]["analysis_date"])
                 if datetime.now() - cache_time < timedelta(hours=12):  # 12 saatten yeni ise
-                    results[symbol] = SENTIMENT_CACHE[symbol]
+                    results[symbol] = select_half_life(SENTIMENT_CACHE[symbol], request.half_life)
                     continue
             
             # Önbellekte yoksa veya yenileme isteniyorsa
-            sentiment_result = await asyncio.to_thread(
-                sentiment_analyzer.get_news_sentiment, 
-                symbol
-            )
+            sentiment_result = await sentiment_coalesced(symbol)
+            if sentiment_result is None:
+                # Haber alınamazsa önceki kayıt korunur; kayıt yoksa nötr yer tutucu döner
+                results[symbol] = select_half_life(
+                    SENTIMENT_CACHE.get(symbol) or empty_result(symbol, "No data"), request.half_life
+                )
+                continue
+            sentiment_scheduler.record(symbol, sentiment_result.get("new_articles", 0))
             
             results[symbol] = {
                 **sentiment_result,
@@ -407,14 +712,16 @@ async def get_specific_sentiment(request: SentimentRequest):
             
             # Önbelleğe ekle/güncelle
             SENTIMENT_CACHE[symbol] = results[symbol]
+            results[symbol] = select_half_life(results[symbol], request.half_life)
             
         return results
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/recommendations")
-async def get_recommendations(min_confidence: float = 0.2):
+async def get_recommendations(min_confidence: float = 0.2, half_life: Optional[str] = None):
     """Güven seviyesine göre alım-satım tavsiyelerini döndürür"""
+    check_half_life(half_life)
     try:
         # Önbellek boşsa güncelle
         if not SENTIMENT_CACHE:
@@ -425,6 +732,7 @@ async def get_recommendations(min_confidence: float = 0.2):
         hold = []
         
         for symbol, data in SENTIMENT_CACHE.items():
+            data = select_half_life(data, half_life)
             sentiment = data.get("sentiment", 0)
             
             # Sadece belirli güven seviyesinin üstündeki tavsiyeleri ekle
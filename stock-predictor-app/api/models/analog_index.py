@@ -0,0 +1,232 @@
+import os
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+logger = logging.getLogger(__name__)
+
+# Number of daily returns in a pattern window
+ANALOG_WINDOW = int(os.getenv("ANALOG_WINDOW", 20))
+# Days of outcome stored after each window
+ANALOG_HORIZON = 30
+ANALOG_NEIGHBORS = int(os.getenv("ANALOG_NEIGHBORS", 20))
+# Log close difference on an already indexed bar that counts as a revision
+ANALOG_REVISION_TOLERANCE = 1e-6
+
+
+def zscore_windows(returns: np.ndarray, window: int) -> np.ndarray:
+    """
+    Z-normalized sliding windows of returns
+
+    Args:
+        returns: Daily log returns, shape (rows,)
+        window: Window length
+
+    Returns:
+        Array of shape (rows - window + 1, window); flat windows become all zeros
+    """
+    windows = sliding_window_view(returns, window)
+    mean = windows.mean(axis=1, keepdims=True)
+    std = windows.std(axis=1, keepdims=True)
+    return np.where(std > 0, (windows - mean) / np.where(std > 0, std, 1.0), 0.0)
+
+
+class AnalogIndex:
+    """
+    Flat index of historical return patterns across all symbols.
+
+    Each row is a z-normalized window of `window` daily log returns and the
+    cumulative log returns of the `horizon` days that followed it. Z-normalized
+    windows all have the same norm, so the nearest windows are those with the
+    largest dot product with the query and a search is one matrix-vector
+    product plus a partial sort. Arrays grow with amortized doubling and only
+    the windows completed by newly arrived bars are added on update.
+
+    Updates are aligned by date, so the input may be a sliding window of
+    history. The newest bar can still change intraday, so it is left out
+    until the next bar arrives.
+    """
+
+    def __init__(self, window: int = ANALOG_WINDOW, horizon: int = ANALOG_HORIZON):
+        self.window = window
+        self.horizon = horizon
+        self._patterns = np.empty((0, window), dtype=np.float32)
+        self._outcomes = np.empty((0, horizon), dtype=np.float32)
+        self._owners = np.empty(0, dtype=np.int32)
+        self._size = 0
+        self._symbols: List[str] = []
+        # symbol -> last window + horizon indexed log closes, by date
+        self._tails: Dict[str, pd.Series] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _reserve(self, rows: int) -> None:
+        capacity = len(self._owners)
+        if self._size + rows <= capacity:
+            return
+        capacity = max(self._size + rows, 2 * capacity, 1024)
+        for name in ('_patterns', '_outcomes'):
+            old = getattr(self, name)
+            new = np.empty((capacity, old.shape[1]), dtype=np.float32)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+        owners = np.empty(capacity, dtype=np.int32)
+        owners[:self._size] = self._owners[:self._size]
+        self._owners = owners
+
+    def _symbol_id(self, symbol: str) -> int:
+        if symbol not in self._symbols:
+            self._symbols.append(symbol)
+        return self._symbols.index(symbol)
+
+    def _remove(self, symbol: str) -> None:
+        symbol_id = self._symbol_id(symbol)
+        keep = self._owners[:self._size] != symbol_id
+        size = int(keep.sum())
+        self._patterns[:size] = self._patterns[:self._size][keep]
+        self._outcomes[:size] = self._outcomes[:self._size][keep]
+        self._owners[:size] = self._owners[:self._size][keep]
+        self._size = size
+
+    def _windows(self, log_close: np.ndarray, first_end: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Patterns ending at rows first_end.. whose full outcome is known
+
+        A pattern ending at row t uses the returns up to t; its outcome is
+        log_close[t + 1: t + 1 + horizon] - log_close[t].
+        """
+        n = len(log_close)
+        last_end = n - 1 - self.horizon
+        first_end = max(first_end, self.window)
+        if last_end < first_end:
+            return np.empty((0, self.window)), np.empty((0, self.horizon))
+
+        returns = np.diff(log_close[first_end - self.window:last_end + 1])
+        patterns = zscore_windows(returns, self.window)
+        ends = np.arange(first_end, last_end + 1)
+        future = sliding_window_view(log_close[first_end + 1:], self.horizon)[:len(ends)]
+        outcomes = future - log_close[ends][:, None]
+        return patterns, outcomes
+
+    def _is_continuation(self, tail: pd.Series, log_close: pd.Series) -> bool:
+        """Whether log_close overlaps the indexed tail on the same dates with unrevised values"""
+        overlap = log_close[(log_close.index >= tail.index[0]) & (log_close.index <= tail.index[-1])]
+        if overlap.empty:
+            return False
+        stored = tail[tail.index >= overlap.index[0]]
+        return overlap.index.equals(stored.index) and np.allclose(
+            overlap.to_numpy(), stored.to_numpy(), rtol=0.0, atol=ANALOG_REVISION_TOLERANCE
+        )
+
+    def update(self, symbol: str, close: pd.Series) -> int:
+        """
+        Add the windows completed since the last update of a symbol
+
+        The input is aligned with the last indexed bars by date; a symbol whose
+        indexed bars were revised, or whose input leaves a gap after them, is
+        re-indexed from scratch.
+
+        Args:
+            symbol: Stock symbol
+            close: Closing price history indexed by date (may start later than before)
+
+        Returns:
+            Number of windows added
+        """
+        close = close[close > 0].dropna()
+        log_close = pd.Series(np.log(close.to_numpy(dtype=np.float64)), index=close.index).iloc[:-1]
+
+        with self._lock:
+            tail = self._tails.get(symbol)
+            first_end = 0
+            if tail is not None:
+                if self._is_continuation(tail, log_close):
+                    log_close = pd.concat([tail, log_close[log_close.index > tail.index[-1]]])
+                    # Windows ending up to len(tail) - 1 - horizon are already indexed
+                    first_end = len(tail) - self.horizon
+                else:
+                    logger.debug(f"Analog index: re-indexing {symbol}")
+                    self._remove(symbol)
+                    del self._tails[symbol]
+
+            patterns, outcomes = self._windows(log_close.to_numpy(), first_end)
+            if len(patterns):
+                self._reserve(len(patterns))
+                rows = slice(self._size, self._size + len(patterns))
+                self._patterns[rows] = patterns
+                self._outcomes[rows] = outcomes
+                self._owners[rows] = self._symbol_id(symbol)
+                self._size += len(patterns)
+            if len(log_close):
+                self._tails[symbol] = log_close.iloc[-(self.window + self.horizon):]
+        return len(patterns)
+
+    def update_many(self, closes: Dict[str, pd.Series]) -> int:
+        """Update the index for many symbols; returns the number of windows added"""
+        added = sum(self.update(symbol, close) for symbol, close in closes.items())
+        logger.debug(f"Analog index: {added} windows added, {self._size} total")
+        return added
+
+    def query(self, close: pd.Series, k: int = ANALOG_NEIGHBORS) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the historical windows most similar to the latest window of close
+
+        Args:
+            close: Closing prices (at least window + 1 values)
+            k: Number of matches
+
+        Returns:
+            Tuple of (outcomes of the matches, shape (k, horizon); similarity scores in [-1, 1])
+        """
+        close = close[close > 0].dropna()
+        if len(close) <= self.window:
+            raise ValueError(f"Need more than {self.window} prices to query the analog index")
+        returns = np.diff(np.log(close.to_numpy(dtype=np.float64)[-self.window - 1:]))
+        pattern = zscore_windows(returns, self.window)[0].astype(np.float32)
+
+        with self._lock:
+            if self._size == 0:
+                raise ValueError("Analog index is empty")
+            scores = self._patterns[:self._size] @ pattern
+            k = min(k, self._size)
+            best = np.argpartition(scores, -k)[-k:]
+            outcomes = self._outcomes[best].copy()
+        # Correlation of the z-normalized windows
+        return outcomes, scores[best] / self.window
+
+    def forecast(self, close: pd.Series, k: int = ANALOG_NEIGHBORS) -> np.ndarray:
+        """
+        Price path implied by what followed the best matching historical windows
+
+        Matches are weighted by their (positive) correlation with the current window.
+
+        Args:
+            close: Closing prices
+            k: Number of matches
+
+        Returns:
+            Forecasted prices for the next `horizon` days
+        """
+        outcomes, similarity = self.query(close, k)
+        weights = np.clip(similarity, 0.0, None)
+        if weights.sum() == 0:
+            weights = np.ones_like(weights)
+        path = (weights[:, None] * outcomes).sum(axis=0) / weights.sum()
+        return float(close.dropna().iloc[-1]) * np.exp(path)
+
+
+_index: Optional[AnalogIndex] = None
+
+
+def get_analog_index() -> AnalogIndex:
+    """Return the process-wide analog index"""
+    global _index
+    if _index is None:
+        _index = AnalogIndex()
+    return _index
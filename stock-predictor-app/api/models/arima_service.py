@@ -0,0 +1,215 @@
+import os
+import json
+import logging
+import threading
+import warnings
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+
+logger = logging.getLogger(__name__)
+
+# Directory holding the fitted parameters of each symbol's model
+ARIMA_MODEL_DIR = os.getenv(
+    "ARIMA_MODEL_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "arima")
+)
+ARIMA_ORDER = (5, 1, 0)
+# Re-estimate parameters after this many hours even without drift
+ARIMA_REFIT_HOURS = float(os.getenv("ARIMA_REFIT_HOURS", 168))
+# Re-estimate when the RMS of one-step errors on appended bars exceeds this multiple
+# of the in-sample residual standard deviation
+ARIMA_DRIFT_RATIO = float(os.getenv("ARIMA_DRIFT_RATIO", 2.0))
+# Minimum number of appended bars before drift is judged
+ARIMA_DRIFT_MIN_BARS = 5
+FORECAST_DAYS = 30
+
+
+class ArimaState:
+    """Fitted ARIMA results for one symbol and the data they were filtered on"""
+
+    def __init__(self, results, params: np.ndarray, data_end: pd.Timestamp, last_close: float,
+                 resid_std: float, fitted_at: datetime):
+        self.results = results
+        self.params = params
+        self.data_end = data_end
+        self.last_close = last_close
+        self.resid_std = resid_std
+        self.fitted_at = fitted_at
+        # One-step-ahead errors of the bars appended since the last fit
+        self.new_errors: List[float] = []
+
+    def to_dict(self) -> Dict:
+        return {
+            'order': list(ARIMA_ORDER),
+            'params': self.params.tolist(),
+            'resid_std': self.resid_std,
+            'fitted_at': self.fitted_at.isoformat(),
+        }
+
+
+class ArimaService:
+    """
+    ARIMA(5,1,0) forecasts that reuse fitted parameters.
+
+    Parameters are estimated once and kept per symbol (in memory, and on disk
+    so a restart only re-runs the Kalman filter). New bars are appended to the
+    state-space results without re-optimizing; parameters are re-estimated
+    after refit_hours or when the one-step errors on appended bars drift well
+    above the in-sample residuals.
+    """
+
+    def __init__(self, root: str = ARIMA_MODEL_DIR, refit_hours: float = ARIMA_REFIT_HOURS,
+                 drift_ratio: float = ARIMA_DRIFT_RATIO):
+        self.root = root
+        self.refit_hours = refit_hours
+        self.drift_ratio = drift_ratio
+        self._states: Dict[str, ArimaState] = {}
+        self._lock = threading.Lock()
+        # Held across a symbol's check/refit/append so concurrent callers never filter the same bars twice
+        self._symbol_locks: Dict[str, threading.Lock] = {}
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, symbol: str) -> str:
+        return os.path.join(self.root, f"{symbol}.json")
+
+    def _save(self, symbol: str, state: ArimaState) -> None:
+        path = self._path(symbol)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    def _load_params(self, symbol: str) -> Optional[Tuple[np.ndarray, float, datetime]]:
+        path = self._path(symbol)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path) as f:
+                stored = json.load(f)
+        except Exception as e:
+            logger.error(f"Could not load ARIMA parameters {path}: {e}")
+            return None
+        if tuple(stored['order']) != ARIMA_ORDER:
+            return None
+        return np.array(stored['params']), stored['resid_std'], datetime.fromisoformat(stored['fitted_at'])
+
+    def _fit(self, close: pd.Series, params: Optional[np.ndarray] = None,
+             fitted_at: Optional[datetime] = None, resid_std: Optional[float] = None) -> ArimaState:
+        """Estimate parameters, or only run the filter when params are given"""
+        model = sm.tsa.ARIMA(close.to_numpy(dtype=np.float64), order=ARIMA_ORDER)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            results = model.fit() if params is None else model.filter(params)
+        if resid_std is None:
+            # The first residual is the undifferenced level; skip it
+            resid_std = float(np.std(results.resid[1:]))
+        return ArimaState(results, np.asarray(results.params), close.index[-1], float(close.iloc[-1]),
+                          resid_std, fitted_at or datetime.now())
+
+    def _refit_reason(self, state: ArimaState, close: pd.Series) -> Optional[str]:
+        age_hours = (datetime.now() - state.fitted_at).total_seconds() / 3600
+        if age_hours > self.refit_hours:
+            return f"parameters are {age_hours:.1f}h old"
+        # Revised history cannot be appended to the filtered state
+        if state.data_end not in close.index or float(close.loc[state.data_end]) != state.last_close:
+            return "history changed"
+        if len(state.new_errors) >= ARIMA_DRIFT_MIN_BARS:
+            rms = float(np.sqrt(np.mean(np.square(state.new_errors))))
+            if rms > self.drift_ratio * state.resid_std:
+                return f"residual drift ({rms:.3f} vs {state.resid_std:.3f})"
+        return None
+
+    def get_state(self, symbol: str, close: pd.Series) -> ArimaState:
+        """
+        Up-to-date filtered state for a symbol
+
+        Args:
+            symbol: Stock symbol
+            close: Full closing price history indexed by date
+
+        Returns:
+            ArimaState whose results end at the last bar of close
+        """
+        with self._symbol_lock(symbol):
+            return self._update_state(symbol, close)
+
+    def _symbol_lock(self, symbol: str) -> threading.Lock:
+        with self._lock:
+            return self._symbol_locks.setdefault(symbol, threading.Lock())
+
+    def _update_state(self, symbol: str, close: pd.Series) -> ArimaState:
+        """get_state without locking; callers hold the symbol's lock"""
+        close = close.dropna()
+        with self._lock:
+            state = self._states.get(symbol)
+
+        if state is None:
+            stored = self._load_params(symbol)
+            if stored is not None and (datetime.now() - stored[2]).total_seconds() / 3600 <= self.refit_hours:
+                params, resid_std, fitted_at = stored
+                state = self._fit(close, params, fitted_at, resid_std)
+            else:
+                logger.info(f"Fitting ARIMA{ARIMA_ORDER} for {symbol}")
+                state = self._fit(close)
+                self._save(symbol, state)
+        else:
+            reason = self._refit_reason(state, close)
+            if reason is not None:
+                logger.info(f"Refitting ARIMA{ARIMA_ORDER} for {symbol}: {reason}")
+                state = self._fit(close)
+                self._save(symbol, state)
+            else:
+                new = close[close.index > state.data_end]
+                if len(new):
+                    values = new.to_numpy(dtype=np.float64)
+                    # Filter the new bars with the existing parameters (no optimization)
+                    state.results = state.results.append(values, refit=False)
+                    # Their residuals are one-step-ahead errors, used for drift detection
+                    state.new_errors.extend(float(e) for e in state.results.resid[-len(values):])
+                    state.data_end = new.index[-1]
+                    state.last_close = float(values[-1])
+
+        with self._lock:
+            self._states[symbol] = state
+        return state
+
+    def forecast(self, symbol: str, close: pd.Series, steps: int = FORECAST_DAYS) -> np.ndarray:
+        """
+        Forecast the next `steps` closes from the symbol's cached state
+
+        Args:
+            symbol: Stock symbol
+            close: Closing prices indexed by date
+            steps: Number of days to forecast
+
+        Returns:
+            Forecasted prices, shape (steps,)
+        """
+        # Forecast under the lock too: another caller could append bars to the same state
+        with self._symbol_lock(symbol):
+            return np.asarray(self._update_state(symbol, close).results.forecast(steps=steps))
+
+    def forecast_many(self, closes: Dict[str, pd.Series], steps: int = FORECAST_DAYS) -> Dict[str, np.ndarray]:
+        """Forecast many symbols, reusing each symbol's cached state"""
+        forecasts = {}
+        for symbol, close in closes.items():
+            try:
+                forecasts[symbol] = self.forecast(symbol, close, steps)
+            except Exception as e:
+                logger.error(f"ARIMA forecast error for {symbol}: {e}")
+        return forecasts
+
+
+_service: Optional[ArimaService] = None
+
+
+def get_arima_service() -> ArimaService:
+    """Return the process-wide ARIMA service"""
+    global _service
+    if _service is None:
+        _service = ArimaService()
+    return _service
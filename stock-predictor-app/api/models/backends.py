@@ -0,0 +1,75 @@
+import os
+import time
+import logging
+import importlib
+import resource
+import threading
+from types import ModuleType
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Heavy forecasting backends, imported on first use: name -> service module
+BACKENDS: Dict[str, str] = {
+    "arima": "models.arima_service",      # statsmodels
+    "prophet": "models.prophet_service",  # prophet / cmdstanpy
+    "lstm": "models.lstm_service",        # tensorflow / keras
+}
+
+# Backends to import at startup instead of on the first request (e.g. "arima,lstm")
+PRELOAD_BACKENDS = [name.strip() for name in os.getenv("PRELOAD_BACKENDS", "").split(",") if name.strip()]
+
+# name -> load statistics
+_loaded: Dict[str, Dict[str, Any]] = {}
+# One lock per backend so a slow import does not hold up the others
+_locks: Dict[str, threading.Lock] = {name: threading.Lock() for name in BACKENDS}
+
+
+def rss_mb() -> float:
+    """Current resident set size of this process in MB"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError):
+        # Peak RSS (KB on Linux, bytes on macOS) where /proc is unavailable
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def load_backend(name: str) -> ModuleType:
+    """
+    Import a backend's service module, recording how long it took
+
+    Args:
+        name: Key of BACKENDS
+
+    Returns:
+        The imported module
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend: {name}")
+    with _locks[name]:
+        if name in _loaded:
+            return importlib.import_module(BACKENDS[name])
+        start, rss_before = time.perf_counter(), rss_mb()
+        module = importlib.import_module(BACKENDS[name])
+        _loaded[name] = {
+            "seconds": round(time.perf_counter() - start, 3),
+            "rss_mb": round(rss_mb() - rss_before, 1),
+        }
+    logger.info(f"Loaded {name} backend in {_loaded[name]['seconds']}s (+{_loaded[name]['rss_mb']} MB)")
+    return module
+
+
+def preload_backends(names: Optional[List[str]] = None) -> None:
+    """Import the configured backends ahead of the first request"""
+    for name in (PRELOAD_BACKENDS if names is None else names):
+        try:
+            load_backend(name)
+        except Exception as e:
+            logger.error(f"Could not preload {name} backend: {e}")
+
+
+def backend_status() -> Dict[str, Any]:
+    """Which backends are loaded, with their load time and memory"""
+    return {name: _loaded.get(name) for name in BACKENDS}
@@ -0,0 +1,241 @@
+import os
+import time
+import logging
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from threadpoolctl import threadpool_limits
+
+logger = logging.getLogger(__name__)
+
+# Processes used to run folds x symbols
+BACKTEST_WORKERS = int(os.getenv("BACKTEST_WORKERS", max(1, os.cpu_count() or 1)))
+
+# Recommendation -> position held until the target date
+POSITIONS = {"BUY": 1, "SELL": -1, "HOLD": 0}
+
+
+class BacktestConfig:
+    """
+    Walk-forward settings
+
+    Args:
+        model: A StockPredictor model type or an ml_models forecaster name
+            (models.ensemble.FORECASTERS)
+        horizon: Trading days between the fold's last bar and the evaluated close
+        step: Trading days between consecutive folds
+        min_train: Rows in the first training window
+        train_window: Rows in each training window (None: expanding window)
+        max_folds: Keep only the most recent folds per symbol (None: all)
+    """
+
+    def __init__(self, model: str = "random_forest", horizon: int = 7, step: int = 20, min_train: int = 250,
+                 train_window: Optional[int] = None, max_folds: Optional[int] = None):
+        self.model = model
+        self.horizon = horizon
+        self.step = step
+        self.min_train = min_train
+        self.train_window = train_window
+        self.max_folds = max_folds
+
+    def fold_ends(self, rows: int) -> List[int]:
+        """Positions of each fold's last training row; the target row is end + horizon"""
+        ends = list(range(self.min_train - 1, rows - self.horizon, self.step))
+        return ends[-self.max_folds:] if self.max_folds else ends
+
+    def window_start(self, end: int) -> int:
+        return 0 if self.train_window is None else max(0, end + 1 - self.train_window)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(vars(self))
+
+
+# ---------------------------------------------------------------------------
+# Worker side
+# ---------------------------------------------------------------------------
+
+_worker_predictor = None
+# Registry directory of _worker_predictor; removed when replaced or at process exit
+_worker_registry_dir: Optional[tempfile.TemporaryDirectory] = None
+
+
+def _init_worker() -> None:
+    """One core per task; models are kept in a private throwaway registry"""
+    global _worker_predictor, _worker_registry_dir
+    from models.model_registry import ModelRegistry
+    from models.predictor import StockPredictor
+
+    threadpool_limits(1)
+    _worker_registry_dir = tempfile.TemporaryDirectory(prefix="backtest-models-")
+    registry = ModelRegistry(root=_worker_registry_dir.name, max_new_bars=0)
+    _worker_predictor = StockPredictor(registry=registry, n_jobs=1)
+
+
+def _predict_fold(config: BacktestConfig, symbol: str, prices: pd.DataFrame,
+                  features: Optional[pd.DataFrame]) -> Tuple[float, str]:
+    """Predicted close `horizon` days after the last row of prices, and the recommendation"""
+    from models.predictor import MODEL_TYPES, StockPredictor
+
+    if config.model in MODEL_TYPES:
+        result = _worker_predictor.predict_stock(symbol, config.horizon, config.model, features=features)
+        if "error" in result:
+            raise ValueError(result["error"])
+        return result["prediction"], result["recommendation"]
+
+    from models.ensemble import FORECASTERS
+
+    # No symbol: cached per-symbol state (ARIMA filter, analog index) would see later bars
+    path = np.asarray(FORECASTERS[config.model][0](prices, None), dtype=np.float64).ravel()
+    prediction = float(path[min(config.horizon, len(path)) - 1])
+    last_price = float(prices['Close'].iloc[-1])
+    return prediction, StockPredictor._get_recommendation((prediction - last_price) / last_price * 100)
+
+
+def _run_fold(config: BacktestConfig, symbol: str, fold: int, prices: pd.DataFrame,
+              features: Optional[pd.DataFrame], actual: float) -> Dict[str, Any]:
+    start = time.perf_counter()
+    last_price = float(prices['Close'].iloc[-1])
+    row = {
+        "symbol": symbol,
+        "fold": fold,
+        "train_start": prices.index[0],
+        "train_end": prices.index[-1],
+        "train_rows": len(prices),
+        "last_price": last_price,
+        "actual": actual,
+    }
+    try:
+        prediction, recommendation = _predict_fold(config, symbol, prices, features)
+    except Exception as e:
+        return {**row, "error": str(e), "seconds": time.perf_counter() - start}
+
+    realized_return = actual / last_price - 1
+    position = POSITIONS[recommendation]
+    return {
+        **row,
+        "prediction": prediction,
+        "error": None,
+        "abs_error": abs(prediction - actual),
+        "abs_pct_error": abs(prediction - actual) / actual * 100,
+        "direction_hit": np.sign(prediction - last_price) == np.sign(actual - last_price),
+        "recommendation": recommendation,
+        "position": position,
+        "realized_return": realized_return,
+        "pnl": position * realized_return,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def _run_symbol_folds(config: BacktestConfig, symbol: str, prices: pd.DataFrame,
+                      features: Optional[pd.DataFrame], folds: List[Tuple[int, int]]) -> List[Dict[str, Any]]:
+    """Run a chunk of one symbol's folds; features are computed once for the full history"""
+    rows = []
+    for fold, end in folds:
+        start = config.window_start(end)
+        rows.append(_run_fold(
+            config, symbol, fold,
+            prices.iloc[start:end + 1],
+            features.iloc[start:end + 1] if features is not None else None,
+            float(prices['Close'].iloc[end + config.horizon])
+        ))
+    return rows
+
+
+# ---------------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------------
+
+class BacktestResult:
+    """Per-fold rows and their summaries"""
+
+    def __init__(self, config: BacktestConfig, folds: pd.DataFrame, seconds: float):
+        self.config = config
+        self.folds = folds
+        self.seconds = seconds
+
+    @staticmethod
+    def _summarize(folds: pd.DataFrame) -> Dict[str, Any]:
+        ok = folds[folds["error"].isna()] if "error" in folds else folds
+        trades = ok[ok["position"] != 0] if len(ok) else ok
+        return {
+            "folds": int(len(folds)),
+            "failed": int(len(folds) - len(ok)),
+            "mae": float(ok["abs_error"].mean()) if len(ok) else None,
+            "mape": float(ok["abs_pct_error"].mean()) if len(ok) else None,
+            "direction_accuracy": float(ok["direction_hit"].mean()) if len(ok) else None,
+            "trades": int(len(trades)),
+            "hit_rate": float((trades["pnl"] > 0).mean()) if len(trades) else None,
+            "total_pnl": float(ok["pnl"].sum()) if len(ok) else 0.0,
+            "mean_trade_pnl": float(trades["pnl"].mean()) if len(trades) else None,
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "config": self.config.as_dict(),
+            "seconds": round(self.seconds, 2),
+            **self._summarize(self.folds),
+        }
+
+    def by_symbol(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            symbol: self._summarize(group) for symbol, group in self.folds.groupby("symbol")
+        }).T
+
+
+def run_backtest(frames: Dict[str, pd.DataFrame], config: BacktestConfig,
+                 workers: int = BACKTEST_WORKERS, folds_per_task: int = 4) -> BacktestResult:
+    """
+    Walk-forward backtest of one model over many symbols
+
+    Each fold trains on the rows up to its end (rolling or expanding window),
+    predicts the close `horizon` days later and trades the resulting
+    BUY/SELL/HOLD recommendation until then. StockPredictor features are
+    computed once per symbol for the whole history and sliced per fold; all
+    indicators only look back, so a slice equals the features of the
+    truncated history apart from the back-filled warm-up rows.
+
+    Args:
+        frames: Dictionary mapping symbols to raw OHLCV DataFrames
+        config: Walk-forward settings
+        workers: Process pool size (1 runs in this process)
+        folds_per_task: Folds of one symbol sent to a worker together
+
+    Returns:
+        BacktestResult with one row per (symbol, fold)
+    """
+    from models.panel_features import prepare_feature_frames
+    from models.predictor import MODEL_TYPES
+
+    start = time.perf_counter()
+    # Features are built from the same rows the folds slice, so positions line up
+    frames = {symbol: prices.dropna(subset=['Close']) for symbol, prices in frames.items()}
+    features = prepare_feature_frames(frames) if config.model in MODEL_TYPES else {}
+
+    tasks = []
+    for symbol, prices in frames.items():
+        folds = list(enumerate(config.fold_ends(len(prices))))
+        for i in range(0, len(folds), folds_per_task):
+            tasks.append((config, symbol, prices, features.get(symbol), folds[i:i + folds_per_task]))
+    logger.info(f"Backtesting {config.model} on {len(frames)} symbols: "
+                f"{sum(len(t[4]) for t in tasks)} folds in {len(tasks)} tasks")
+
+    rows: List[Dict[str, Any]] = []
+    if workers <= 1:
+        _init_worker()
+        for task in tasks:
+            rows.extend(_run_symbol_folds(*task))
+    else:
+        # spawn: callers may run threads or an event loop
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_worker) as pool:
+            for future in as_completed([pool.submit(_run_symbol_folds, *task) for task in tasks]):
+                rows.extend(future.result())
+
+    folds = pd.DataFrame(rows)
+    if len(folds):
+        folds = folds.sort_values(["symbol", "fold"]).reset_index(drop=True)
+    return BacktestResult(config, folds, time.perf_counter() - start)
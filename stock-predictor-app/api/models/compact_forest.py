@@ -0,0 +1,143 @@
+import os
+import json
+import shutil
+import logging
+from typing import Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Array files of a saved forest directory
+ARRAYS = ('feature', 'threshold', 'left', 'right', 'value', 'roots')
+
+
+class CompactForest:
+    """
+    Tree ensemble stored as flat node arrays.
+
+    Nodes of all trees are concatenated: feature ids, thresholds, global child
+    offsets and leaf values. Leaves point to themselves with an infinite
+    threshold, so evaluation is `max_depth` rounds of gathers over a
+    (rows, trees) array of node indices without any branching. Several forests
+    can be stacked into one object (roots has one row per forest) so rows of
+    different symbols are scored in one call. Saved forests are directories of
+    .npy files and load memory-mapped.
+    """
+
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray, left: np.ndarray, right: np.ndarray,
+                 value: np.ndarray, roots: np.ndarray, max_depth: int, n_features: int):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        # (nodes, outputs)
+        self.value = value
+        # (forests, trees)
+        self.roots = roots
+        self.max_depth = max_depth
+        self.n_features = n_features
+
+    @property
+    def n_outputs(self) -> int:
+        return self.value.shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in ARRAYS)
+
+    @classmethod
+    def from_sklearn(cls, forest) -> 'CompactForest':
+        """
+        Export a fitted scikit-learn forest regressor (RandomForest or ExtraTrees)
+
+        Args:
+            forest: Fitted ensemble with `estimators_`
+
+        Returns:
+            CompactForest with the same predictions
+        """
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset, max_depth = 0, 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            n = tree.node_count
+            is_leaf = tree.children_left < 0
+            nodes = np.arange(n)
+
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            lefts.append((np.where(is_leaf, nodes, tree.children_left) + offset).astype(np.int32))
+            rights.append((np.where(is_leaf, nodes, tree.children_right) + offset).astype(np.int32))
+            values.append(tree.value[:, :, 0])
+            roots.append(offset)
+            offset += n
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            np.concatenate(features),
+            np.concatenate(thresholds),
+            np.concatenate(lefts),
+            np.concatenate(rights),
+            np.concatenate(values).astype(np.float64),
+            np.array([roots], dtype=np.int32),
+            max_depth,
+            forest.n_features_in_,
+        )
+
+    @classmethod
+    def stack(cls, forests: Sequence['CompactForest']) -> 'CompactForest':
+        """Combine single forests with the same tree count into one multi-forest object"""
+        offsets = np.cumsum([0] + [len(f.feature) for f in forests[:-1]])
+        return cls(
+            np.concatenate([f.feature for f in forests]),
+            np.concatenate([f.threshold for f in forests]),
+            np.concatenate([f.left + o for f, o in zip(forests, offsets)]),
+            np.concatenate([f.right + o for f, o in zip(forests, offsets)]),
+            np.concatenate([f.value for f in forests]),
+            np.concatenate([f.roots + o for f, o in zip(forests, offsets)]),
+            max(f.max_depth for f in forests),
+            forests[0].n_features,
+        )
+
+    def predict(self, X, forest_ids: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Mean of the trees' leaf values for each row
+
+        Args:
+            X: Feature rows, shape (rows, features)
+            forest_ids: Forest used for each row when several are stacked (default: forest 0)
+
+        Returns:
+            Shape (rows,) for single-output forests, (rows, outputs) otherwise
+        """
+        # scikit-learn compares float32 features against the thresholds
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(len(X))[:, None]
+        idx = self.roots[np.zeros(len(X), dtype=np.intp) if forest_ids is None else forest_ids]
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[idx]] <= self.threshold[idx]
+            idx = np.where(go_left, self.left[idx], self.right[idx])
+        prediction = self.value[idx].mean(axis=1)
+        return prediction[:, 0] if self.n_outputs == 1 else prediction
+
+    def save(self, path: str) -> None:
+        """Write the forest as a directory of .npy files (replacing an existing one)"""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        os.makedirs(tmp_path, exist_ok=True)
+        for name in ARRAYS:
+            np.save(os.path.join(tmp_path, f"{name}.npy"), np.ascontiguousarray(getattr(self, name)))
+        with open(os.path.join(tmp_path, "meta.json"), "w") as f:
+            json.dump({'max_depth': int(self.max_depth), 'n_features': int(self.n_features)}, f)
+        if os.path.exists(path):
+            shutil.rmtree(path)
+        os.rename(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> 'CompactForest':
+        """Load a saved forest; arrays are memory-mapped unless mmap is False"""
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r' if mmap else None)
+                  for name in ARRAYS}
+        return cls(**arrays, max_depth=meta['max_depth'], n_features=meta['n_features'])
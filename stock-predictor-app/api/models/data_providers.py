@@ -0,0 +1,317 @@
+import os
+import json
+import zlib
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import pandas as pd
+import finnhub
+from dotenv import load_dotenv
+
+from models.stock_data import download_price_history
+from models.news_client import get_news_client, get_rate_limiter
+from models.price_store import PriceStore, get_price_store, period_start
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# live | store | replay
+MARKET_DATA_PROVIDER = os.getenv("MARKET_DATA_PROVIDER", "store")
+# Directory with recorded replay data (prices/<symbol>.parquet|csv, news/<symbol>.json)
+REPLAY_DATA_DIR = os.getenv(
+    "REPLAY_DATA_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "replay")
+)
+# Last bar date of synthetic replay series
+REPLAY_END_DATE = os.getenv("REPLAY_END_DATE", "2024-12-31")
+REPLAY_SEED = int(os.getenv("REPLAY_SEED", 42))
+
+
+class MarketDataProvider:
+    """Interface for price history and company news sources"""
+
+    name = "base"
+
+    @property
+    def has_news(self) -> bool:
+        """Whether the provider can serve company news"""
+        return True
+
+    def get_history(self, symbols: List[str], period: str = '2y') -> Dict[str, pd.DataFrame]:
+        """
+        Get daily OHLCV history for several symbols
+
+        Args:
+            symbols: Stock symbols (e.g., "AKBNK.IS")
+            period: Time period ('1mo', '3mo', '6mo', '1y', '2y', '5y', 'max')
+
+        Returns:
+            Dictionary mapping symbols to DataFrames. Symbols without data are left out.
+        """
+        raise NotImplementedError
+
+    def get_price_history(self, symbol: str, period: str = '2y') -> pd.DataFrame:
+        """Get daily OHLCV history for one symbol (empty DataFrame if missing)"""
+        return self.get_history([symbol], period).get(symbol, pd.DataFrame())
+
+    def data_version(self, symbol: str) -> str:
+        """
+        Identifier that changes whenever new price data becomes available for a symbol
+
+        Live data can change at any time during the day, so the default is the current date.
+        """
+        return datetime.now().strftime('%Y-%m-%d')
+
+    def get_company_news(self, symbol: str, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        """
+        Get company news articles in Finnhub format
+
+        Args:
+            symbol: Stock symbol without exchange suffix
+            start: Window start
+            end: Window end
+
+        Returns:
+            List of article dicts ('id', 'datetime', 'headline', 'summary', 'source', 'url', ...)
+        """
+        raise NotImplementedError
+
+    async def aget_company_news(self, symbol: str, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        """Async variant of get_company_news (runs the blocking call in a thread by default)"""
+        return await asyncio.to_thread(self.get_company_news, symbol, start, end)
+
+
+class LiveProvider(MarketDataProvider):
+    """Prices from Yahoo Finance and news from Finnhub on every call"""
+
+    name = "live"
+
+    def __init__(self, finnhub_key: Optional[str] = None):
+        self.finnhub_key = finnhub_key or os.getenv("FINNHUB_API_KEY")
+        self.finnhub_client = None
+        if not self.finnhub_key:
+            logger.warning("FINNHUB_API_KEY not found in environment variables. Sentiment analysis will be limited.")
+        else:
+            self.finnhub_client = finnhub.Client(api_key=self.finnhub_key)
+
+    @property
+    def has_news(self) -> bool:
+        return self.finnhub_client is not None
+
+    def get_history(self, symbols: List[str], period: str = '2y') -> Dict[str, pd.DataFrame]:
+        return download_price_history(symbols, period=period)
+
+    def get_company_news(self, symbol: str, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        if self.finnhub_client is None:
+            return []
+        # Shares the API quota with the async client
+        get_rate_limiter().acquire_blocking()
+        return self.finnhub_client.company_news(
+            symbol,
+            _from=start.strftime('%Y-%m-%d'),
+            to=end.strftime('%Y-%m-%d')
+        )
+
+    async def aget_company_news(self, symbol: str, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        if self.finnhub_key is None:
+            return []
+        return await get_news_client(self.finnhub_key).company_news(symbol, start, end)
+
+
+class StoreProvider(LiveProvider):
+    """Prices from the local price store, news from Finnhub"""
+
+    name = "store"
+
+    def __init__(self, store: Optional[PriceStore] = None, finnhub_key: Optional[str] = None):
+        super().__init__(finnhub_key)
+        self.store = store or get_price_store()
+
+    def get_history(self, symbols: List[str], period: str = '2y') -> Dict[str, pd.DataFrame]:
+        return self.store.get_many(symbols, period=period)
+
+    def data_version(self, symbol: str) -> str:
+        stored = self.store.date_range(symbol)
+        if stored is None or not self.store.is_fresh(symbol):
+            # A refresh is pending; the stored version will change after it
+            return f"{stored[1].date() if stored else 'empty'}+{super().data_version(symbol)}"
+        return str(stored[1].date())
+
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Deterministic offline provider for benchmarks and load tests.
+
+    Serves recorded files from `root` when present (prices/<symbol>.parquet or .csv,
+    news/<symbol>.json) and otherwise generates synthetic series seeded by the symbol,
+    so repeated runs see exactly the same data without any network access.
+    """
+
+    name = "replay"
+
+    _POSITIVE_HEADLINES = [
+        "{company} reports strong quarterly profit growth",
+        "{company} wins major new contract",
+        "Analysts upgrade {company} on improving outlook",
+        "{company} announces record exports",
+    ]
+    _NEGATIVE_HEADLINES = [
+        "{company} shares fall after weak earnings",
+        "{company} faces regulatory investigation",
+        "Analysts cut {company} target on poor demand",
+        "{company} warns of higher costs",
+    ]
+    _NEUTRAL_HEADLINES = [
+        "{company} to hold annual general meeting",
+        "{company} announces board changes",
+        "{company} publishes monthly operating data",
+    ]
+
+    def __init__(self, root: str = REPLAY_DATA_DIR, end_date: str = REPLAY_END_DATE, seed: int = REPLAY_SEED):
+        self.root = root
+        self.end_date = pd.Timestamp(end_date)
+        self.seed = seed
+
+    def _rng(self, *parts: Any) -> np.random.Generator:
+        key = "|".join(str(part) for part in parts)
+        return np.random.default_rng([self.seed, zlib.crc32(key.encode())])
+
+    def _load_prices(self, symbol: str) -> pd.DataFrame:
+        parquet_path = os.path.join(self.root, "prices", f"{symbol}.parquet")
+        csv_path = os.path.join(self.root, "prices", f"{symbol}.csv")
+        if os.path.exists(parquet_path):
+            return pd.read_parquet(parquet_path, memory_map=True)
+        if os.path.exists(csv_path):
+            return pd.read_csv(csv_path, index_col=0, parse_dates=True)
+        return self._synthetic_prices(symbol)
+
+    def _synthetic_prices(self, symbol: str, years: int = 5) -> pd.DataFrame:
+        rng = self._rng("prices", symbol)
+        dates = pd.bdate_range(end=self.end_date, periods=252 * years, name='Date')
+        n = len(dates)
+
+        returns = rng.normal(0.0003, 0.02, n)
+        close = rng.uniform(5, 200) * np.exp(np.cumsum(returns))
+        open_ = np.concatenate([[close[0]], close[:-1]]) * (1 + rng.normal(0, 0.005, n))
+        high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.01, n)))
+        low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.01, n)))
+        volume = rng.lognormal(14, 0.5, n).round()
+
+        return pd.DataFrame({
+            'Open': open_,
+            'High': high,
+            'Low': low,
+            'Close': close,
+            'Adj Close': close,
+            'Volume': volume
+        }, index=dates)
+
+    def get_history(self, symbols: List[str], period: str = '2y') -> Dict[str, pd.DataFrame]:
+        frames = {}
+        for symbol in dict.fromkeys(symbols):
+            df = self._load_prices(symbol)
+            if df.empty:
+                continue
+            start = period_start(period, df.index[-1])
+            frames[symbol] = df[df.index >= start] if start is not None else df
+        return frames
+
+    def data_version(self, symbol: str) -> str:
+        return f"replay-{self.seed}-{self.end_date.date()}"
+
+    def get_company_news(self, symbol: str, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        # Recorded news is served as-is, independent of the wall clock
+        news_path = os.path.join(self.root, "news", f"{symbol}.json")
+        if os.path.exists(news_path):
+            with open(news_path) as f:
+                return json.load(f)
+        return self._synthetic_news(symbol, start, end)
+
+    def _synthetic_news(self, symbol: str, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        # Articles are generated per calendar day, so overlapping windows see the same articles
+        templates = self._POSITIVE_HEADLINES + self._NEGATIVE_HEADLINES + self._NEUTRAL_HEADLINES
+        start_ts, end_ts = int(start.timestamp()), int(end.timestamp())
+
+        articles = []
+        for day in pd.date_range(start.date(), end.date(), freq='D'):
+            rng = self._rng("news", symbol, day.date().isoformat())
+            day_ts = int(datetime.combine(day.date(), datetime.min.time()).timestamp())
+            for i in range(int(rng.integers(0, 2))):
+                headline = templates[int(rng.integers(len(templates)))].format(company=symbol)
+                published = day_ts + int(rng.integers(0, 86400))
+                if not start_ts <= published <= end_ts:
+                    continue
+                article_id = zlib.crc32(f"{symbol}|{day.date()}|{i}".encode())
+                articles.append({
+                    'category': 'company',
+                    'datetime': published,
+                    'headline': headline,
+                    'id': article_id,
+                    'image': '',
+                    'related': symbol,
+                    'source': 'replay',
+                    'summary': f"{headline}. Further details are expected in the coming days.",
+                    'url': f"https://replay.local/{symbol}/{article_id}"
+                })
+
+        # Finnhub returns the newest articles first
+        articles.sort(key=lambda article: article['datetime'], reverse=True)
+        return articles
+
+    def record(self, provider: MarketDataProvider, symbols: List[str], period: str = '2y',
+               news_days: int = 30) -> None:
+        """
+        Record prices and news from another provider into the replay directory
+
+        Args:
+            provider: Source provider (typically live or store)
+            symbols: Stock symbols to record
+            period: Price history to record
+            news_days: Number of days of news to record
+        """
+        os.makedirs(os.path.join(self.root, "prices"), exist_ok=True)
+        os.makedirs(os.path.join(self.root, "news"), exist_ok=True)
+
+        for symbol, df in provider.get_history(symbols, period).items():
+            df.to_parquet(os.path.join(self.root, "prices", f"{symbol}.parquet"))
+
+        if provider.has_news:
+            end = datetime.now()
+            start = end - pd.Timedelta(days=news_days)
+            for symbol in symbols:
+                clean_symbol = symbol.replace('.IS', '')
+                articles = provider.get_company_news(clean_symbol, start, end)
+                with open(os.path.join(self.root, "news", f"{clean_symbol}.json"), "w") as f:
+                    json.dump(articles, f)
+
+
+_PROVIDERS = {
+    "live": LiveProvider,
+    "store": StoreProvider,
+    "replay": ReplayProvider,
+}
+
+_provider: Optional[MarketDataProvider] = None
+
+
+def get_provider() -> MarketDataProvider:
+    """Return the process-wide provider selected by MARKET_DATA_PROVIDER"""
+    global _provider
+    if _provider is None:
+        provider_cls = _PROVIDERS.get(MARKET_DATA_PROVIDER)
+        if provider_cls is None:
+            logger.warning(f"Unknown MARKET_DATA_PROVIDER '{MARKET_DATA_PROVIDER}', using 'store'")
+            provider_cls = StoreProvider
+        _provider = provider_cls()
+        logger.info(f"Using {_provider.name} market data provider")
+    return _provider
+
+
+def set_provider(provider: MarketDataProvider) -> None:
+    """Replace the process-wide provider (e.g. a ReplayProvider in benchmarks)"""
+    global _provider
+    _provider = provider
@@ -0,0 +1,121 @@
+import os
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from models.ml_models import (
+    moving_average_forecast,
+    linear_regression_forecast,
+    knn_forecast,
+    auto_arima_forecast,
+    prophet_forecast,
+    lstm_forecast
+)
+
+logger = logging.getLogger(__name__)
+
+FORECAST_DAYS = 30
+# Threads shared by all ensemble requests; a model that misses its deadline keeps
+# its thread until it finishes, so this also bounds abandoned work
+ENSEMBLE_WORKERS = int(os.getenv("ENSEMBLE_WORKERS", 8))
+
+
+def _moving_average(data: pd.DataFrame, symbol: str) -> np.ndarray:
+    # The moving average has no dynamics; project its last value forward
+    return np.full(FORECAST_DAYS, moving_average_forecast(data).iloc[-1])
+
+
+def _prophet(data: pd.DataFrame, symbol: str) -> np.ndarray:
+    return np.asarray(prophet_forecast(data, symbol=symbol)['forecast'])
+
+
+# name -> (forecaster returning FORECAST_DAYS prices, default deadline in seconds)
+FORECASTERS: Dict[str, tuple] = {
+    "moving_average": (_moving_average, 0.5),
+    "linear_regression": (lambda data, symbol: linear_regression_forecast(data), 1.0),
+    "knn": (lambda data, symbol: knn_forecast(data, symbol=symbol), 1.0),
+    "arima": (lambda data, symbol: auto_arima_forecast(data, symbol=symbol), 5.0),
+    "prophet": (_prophet, 15.0),
+    "lstm": (lambda data, symbol: lstm_forecast(data, symbol=symbol), 30.0),
+}
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=ENSEMBLE_WORKERS, thread_name_prefix="ensemble")
+    return _executor
+
+
+async def _run_model(name: str, fn: Callable, data: pd.DataFrame, symbol: str, deadline: float) -> Dict[str, Any]:
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    try:
+        values = await asyncio.wait_for(loop.run_in_executor(_get_executor(), fn, data, symbol), deadline)
+        values = np.asarray(values, dtype=np.float64).ravel()[:FORECAST_DAYS]
+        if len(values) < FORECAST_DAYS or not np.isfinite(values).all():
+            raise ValueError("invalid forecast")
+        result = {"status": "ok", "forecast": values.tolist()}
+    except asyncio.TimeoutError:
+        result = {"status": "timeout"}
+    except Exception as e:
+        logger.error(f"Ensemble model {name} failed for {symbol}: {e}")
+        result = {"status": "error", "error": str(e)}
+    result["elapsed"] = round(time.perf_counter() - start, 4)
+    result["deadline"] = deadline
+    return result
+
+
+async def run_ensemble(data: pd.DataFrame, symbol: str, models: Optional[List[str]] = None,
+                       deadlines: Optional[Dict[str, float]] = None,
+                       weights: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """
+    Run forecasters concurrently on one price series and combine those that finish in time
+
+    Args:
+        data: Price history shared by all models
+        symbol: Stock symbol (lets the models reuse their cached state)
+        models: Forecaster names (default: all of FORECASTERS)
+        deadlines: Per-model deadlines in seconds, overriding the defaults
+        weights: Per-model weights (default 1); renormalized over the models that made it
+
+    Returns:
+        Dictionary with the ensemble curve, the included models and per-model results
+    """
+    models = models or list(FORECASTERS)
+    unknown = [name for name in models if name not in FORECASTERS]
+    if unknown:
+        raise ValueError(f"Unknown models: {', '.join(unknown)}")
+    deadlines = deadlines or {}
+    weights = weights or {}
+
+    results = await asyncio.gather(*(
+        _run_model(name, FORECASTERS[name][0], data, symbol, deadlines.get(name, FORECASTERS[name][1]))
+        for name in models
+    ))
+    per_model = dict(zip(models, results))
+
+    included = [name for name in models if per_model[name]["status"] == "ok" and weights.get(name, 1.0) > 0]
+    ensemble = None
+    if included:
+        w = np.array([weights.get(name, 1.0) for name in included])
+        curves = np.array([per_model[name]["forecast"] for name in included])
+        ensemble = ((w / w.sum())[:, None] * curves).sum(axis=0).tolist()
+        for name, weight in zip(included, w / w.sum()):
+            per_model[name]["weight"] = float(weight)
+
+    return {
+        "symbol": symbol,
+        "last_price": float(data['Close'].iloc[-1]),
+        "ensemble": ensemble,
+        "included": included,
+        "excluded": [name for name in models if name not in included],
+        "models": per_model,
+    }
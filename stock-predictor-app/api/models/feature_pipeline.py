@@ -0,0 +1,311 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+
+logger = logging.getLogger(__name__)
+
+# Raw price columns that features can use as inputs
+RAW_INPUTS = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+# Number of (symbol, feature set, last bar) results kept by the default pipeline
+FEATURE_CACHE_SIZE = 512
+
+
+# ---------------------------------------------------------------------------
+# Array primitives. All inputs are (dates, symbols) float arrays.
+# ---------------------------------------------------------------------------
+
+def ffill(values: np.ndarray) -> np.ndarray:
+    """Forward fill NaNs along the time axis (axis 0) of a 2D array"""
+    mask = np.isnan(values)
+    if not mask.any():
+        return values
+    idx = np.where(mask, 0, np.arange(values.shape[0])[:, None])
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    # Leading NaNs have no earlier value and stay NaN
+    return values[idx, np.arange(values.shape[1])[None, :]]
+
+
+def bfill(values: np.ndarray) -> np.ndarray:
+    """Backward fill NaNs along the time axis (axis 0) of a 2D array"""
+    return ffill(values[::-1])[::-1]
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Rolling mean over `window` rows; NaN until the window is full (pandas semantics)"""
+    out = np.full(values.shape, np.nan)
+    if values.shape[0] >= window:
+        out[window - 1:] = sliding_window_view(values, window, axis=0).mean(axis=-1)
+    return out
+
+
+def rolling_std(values: np.ndarray, window: int, mean: Optional[np.ndarray] = None) -> np.ndarray:
+    """Rolling sample standard deviation, reusing a precomputed rolling mean when given"""
+    out = np.full(values.shape, np.nan)
+    if values.shape[0] >= window:
+        windows = sliding_window_view(values, window, axis=0)
+        window_mean = mean[window - 1:] if mean is not None else windows.mean(axis=-1)
+        deviations = windows - window_mean[..., None]
+        out[window - 1:] = np.sqrt((deviations * deviations).sum(axis=-1) / (window - 1))
+    return out
+
+
+def ewm_mean(values: np.ndarray, span: int) -> np.ndarray:
+    """
+    Exponentially weighted mean with adjust=False along axis 0
+
+    Each column starts at its first valid value, matching pandas for series
+    with leading NaNs.
+    """
+    alpha = 2.0 / (span + 1.0)
+    leading = np.isnan(values)
+    seeded = bfill(values)
+    # Columns that are entirely NaN have nothing to seed with
+    seeded = np.where(np.isnan(seeded), 0.0, seeded)
+    zi = (1 - alpha) * seeded[:1]
+    out, _ = lfilter([alpha], [1.0, alpha - 1.0], seeded, axis=0, zi=zi)
+    out[np.maximum.accumulate(~leading, axis=0) == 0] = np.nan
+    return out
+
+
+def shift(values: np.ndarray, periods: int) -> np.ndarray:
+    """Shift rows down by `periods` (up when negative), filling with NaN"""
+    out = np.full(values.shape, np.nan)
+    if abs(periods) >= values.shape[0]:
+        return out
+    if periods >= 0:
+        out[periods:] = values[:values.shape[0] - periods]
+    else:
+        out[:periods] = values[-periods:]
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Feature registry
+# ---------------------------------------------------------------------------
+
+class FeatureSpec:
+    """A named feature or intermediate computed from other registered nodes"""
+
+    def __init__(self, name: str, inputs: Sequence[str], fn: Callable[..., np.ndarray],
+                 window: Optional[int] = None):
+        self.name = name
+        self.inputs = tuple(inputs)
+        self.fn = fn
+        self.window = window
+
+    def __repr__(self) -> str:
+        return f"FeatureSpec({self.name!r}, inputs={self.inputs}, window={self.window})"
+
+
+FEATURE_REGISTRY: Dict[str, FeatureSpec] = {}
+
+
+def register_feature(name: str, inputs: Sequence[str], fn: Callable[..., np.ndarray],
+                     window: Optional[int] = None) -> FeatureSpec:
+    """
+    Register a feature node
+
+    Args:
+        name: Unique node name
+        inputs: Names of raw inputs or other registered nodes
+        fn: Function called with the input arrays in order
+        window: Look-back window, for documentation and warm-up checks
+
+    Returns:
+        The registered FeatureSpec
+    """
+    spec = FeatureSpec(name, inputs, fn, window)
+    FEATURE_REGISTRY[name] = spec
+    return spec
+
+
+def _alias(name: str, target: str) -> None:
+    register_feature(name, (target,), lambda values: values)
+
+
+# Shared intermediates
+for _window in (5, 10, 20, 50, 200):
+    register_feature(f'mean_{_window}', ('Close',), lambda c, w=_window: rolling_mean(c, w), _window)
+for _window in (10, 20):
+    register_feature(f'std_{_window}', ('Close', f'mean_{_window}'),
+                     lambda c, m, w=_window: rolling_std(c, w, m), _window)
+for _span in (12, 26):
+    register_feature(f'ema_{_span}', ('Close',), lambda c, s=_span: ewm_mean(c, s), _span)
+
+register_feature('delta', ('Close',), lambda c: c - shift(c, 1), 1)
+# NaN deltas count as zero gain/loss, as with pandas Series.where
+register_feature('gain', ('delta',), lambda d: np.where(d > 0, d, 0.0))
+register_feature('loss', ('delta',), lambda d: np.where(d < 0, -d, 0.0))
+register_feature('avg_gain_14', ('gain',), lambda g: rolling_mean(g, 14), 14)
+register_feature('avg_loss_14', ('loss',), lambda l: rolling_mean(l, 14), 14)
+
+# Model features
+register_feature('RSI', ('avg_gain_14', 'avg_loss_14'), lambda g, l: 100 - (100 / (1 + g / l)), 14)
+register_feature('MACD', ('ema_12', 'ema_26'), lambda fast, slow: fast - slow, 26)
+register_feature('MACD_Signal', ('MACD',), lambda macd: ewm_mean(macd, 9), 9)
+register_feature('BB_Upper', ('mean_20', 'std_20'), lambda m, s: m + 2 * s, 20)
+register_feature('BB_Lower', ('mean_20', 'std_20'), lambda m, s: m - 2 * s, 20)
+register_feature('Price_Change', ('Close',), lambda c: c / shift(c, 1) - 1, 1)
+register_feature('Price_Momentum', ('Close',), lambda c: c / shift(c, 20), 20)
+
+for _name, _target in (('MA5', 'mean_5'), ('MA10', 'mean_10'), ('MA20', 'mean_20'), ('MA50', 'mean_50'),
+                       ('SMA20', 'mean_20'), ('SMA50', 'mean_50'), ('SMA200', 'mean_200'),
+                       ('Volatility', 'std_10'), ('BB_Middle', 'mean_20'), ('Signal_Line', 'MACD_Signal')):
+    _alias(_name, _target)
+
+# Named feature sets requested by the models
+FEATURE_SETS: Dict[str, List[str]] = {
+    # StockPredictor (random forest) indicators
+    'predictor': [
+        'MA5', 'MA10', 'MA20', 'MA50', 'Volatility', 'RSI',
+        'MACD', 'MACD_Signal', 'BB_Middle', 'BB_Upper', 'BB_Lower'
+    ],
+    # stock_data.prepare_data feature columns
+    'classic': [
+        'Open', 'High', 'Low', 'Close', 'Volume',
+        'SMA20', 'SMA50', 'SMA200', 'RSI', 'MACD',
+        'Signal_Line', 'BB_Middle', 'BB_Upper', 'BB_Lower',
+        'Price_Change', 'Price_Momentum'
+    ],
+}
+
+
+def resolve_features(features) -> List[str]:
+    """Accept a feature set name or an explicit list of feature names"""
+    if isinstance(features, str):
+        if features not in FEATURE_SETS:
+            raise ValueError(f"Unknown feature set: {features}")
+        return list(FEATURE_SETS[features])
+    return list(features)
+
+
+def plan_features(names: Iterable[str]) -> List[str]:
+    """
+    Order every node needed for `names` so each one is computed exactly once
+
+    Args:
+        names: Requested feature names
+
+    Returns:
+        Node names in dependency order (raw inputs excluded)
+    """
+    order: List[str] = []
+    visiting = set()
+    done = set(RAW_INPUTS)
+
+    def visit(name: str) -> None:
+        if name in done:
+            return
+        if name not in FEATURE_REGISTRY:
+            raise ValueError(f"Unknown feature: {name}")
+        if name in visiting:
+            raise ValueError(f"Cyclic feature dependency at {name}")
+        visiting.add(name)
+        for dependency in FEATURE_REGISTRY[name].inputs:
+            visit(dependency)
+        visiting.discard(name)
+        done.add(name)
+        order.append(name)
+
+    for name in names:
+        visit(name)
+    return order
+
+
+def evaluate_features(features, inputs: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Compute features on (dates, symbols) arrays, sharing intermediates
+
+    Args:
+        features: Feature set name or list of feature names
+        inputs: Raw input arrays by column name (at least 'Close')
+
+    Returns:
+        Dictionary with the requested features as (dates, symbols) arrays
+    """
+    names = resolve_features(features)
+    values: Dict[str, np.ndarray] = {name: np.asarray(array, dtype=np.float64)
+                                     for name, array in inputs.items()}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for name in plan_features(names):
+            spec = FEATURE_REGISTRY[name]
+            values[name] = spec.fn(*(values[dependency] for dependency in spec.inputs))
+    return {name: values[name] for name in names}
+
+
+# ---------------------------------------------------------------------------
+# Cached per-symbol frames
+# ---------------------------------------------------------------------------
+
+class FeaturePipeline:
+    """
+    Computes named feature sets for DataFrames and caches results per
+    (symbol, feature set, last bar).
+    """
+
+    def __init__(self, cache_size: int = FEATURE_CACHE_SIZE):
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Hashable, pd.DataFrame]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def cache_key(symbol: str, df: pd.DataFrame, feature_set: str) -> Tuple:
+        last_close = float(df['Close'].iloc[-1]) if 'Close' in df and len(df) else None
+        last_date = df.index[-1] if len(df) else None
+        return (symbol, feature_set, last_date, len(df), last_close)
+
+    def get_cached(self, key: Hashable) -> Optional[pd.DataFrame]:
+        with self._lock:
+            frame = self._cache.get(key)
+            if frame is not None:
+                self._cache.move_to_end(key)
+            return frame
+
+    def put_cached(self, key: Hashable, frame: pd.DataFrame) -> None:
+        with self._lock:
+            self._cache[key] = frame
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def compute(self, df: pd.DataFrame, feature_set: str, symbol: Optional[str] = None) -> pd.DataFrame:
+        """
+        Compute a named feature set for one symbol's OHLCV frame
+
+        Args:
+            df: OHLCV DataFrame
+            feature_set: Name in FEATURE_SETS
+            symbol: Cache the result under this symbol when given
+
+        Returns:
+            DataFrame with the feature columns (NaN during warm-up)
+        """
+        key = self.cache_key(symbol, df, feature_set) if symbol else None
+        if key is not None:
+            cached = self.get_cached(key)
+            if cached is not None:
+                return cached
+
+        inputs = {column: df[column].to_numpy(dtype=np.float64)[:, None]
+                  for column in RAW_INPUTS if column in df}
+        values = evaluate_features(feature_set, inputs)
+        frame = pd.DataFrame({name: array[:, 0] for name, array in values.items()}, index=df.index)
+
+        if key is not None:
+            self.put_cached(key, frame)
+        return frame
+
+
+_pipeline = FeaturePipeline()
+
+
+def get_feature_pipeline() -> FeaturePipeline:
+    """Return the process-wide feature pipeline"""
+    return _pipeline
@@ -0,0 +1,141 @@
+import os
+import logging
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+LINEAR_MODEL_TYPE = "linear_regression"
+# L2 penalty on the standardized coefficients (0 gives ordinary least squares)
+RIDGE_ALPHA = float(os.getenv("RIDGE_ALPHA", 1.0))
+HOLDOUT_DAYS = 30
+
+
+class Standardizer:
+    """Per-feature standardization with the StandardScaler.transform interface"""
+
+    def __init__(self, mean: np.ndarray, scale: np.ndarray):
+        self.mean_ = mean
+        self.scale_ = scale
+
+    def transform(self, X) -> np.ndarray:
+        return (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+
+
+class RidgeModel:
+    """Linear model on standardized features with the estimator predict interface"""
+
+    def __init__(self, coef: np.ndarray, intercept: float):
+        self.coef_ = coef
+        self.intercept_ = intercept
+
+    def predict(self, X) -> np.ndarray:
+        return np.asarray(X, dtype=np.float64) @ self.coef_ + self.intercept_
+
+
+def fit_ridge_batch(X: np.ndarray, y: np.ndarray, mask: np.ndarray,
+                    alpha: float = RIDGE_ALPHA) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Solve one ridge regression per symbol with a single batched solve
+
+    Args:
+        X: Features, shape (symbols, rows, features); padded rows may hold any finite value
+        y: Targets, shape (symbols, rows)
+        mask: True for real rows, shape (symbols, rows)
+        alpha: L2 penalty on the standardized coefficients
+
+    Returns:
+        Tuple of (feature means, feature scales, coefficients, intercepts); the first
+        three have shape (symbols, features) and intercepts shape (symbols,)
+    """
+    weights = mask.astype(np.float64)
+    counts = np.maximum(weights.sum(axis=1), 1.0)
+
+    # Masked per-symbol mean and population std, as StandardScaler computes them
+    mean = np.einsum('nt,ntf->nf', weights, X) / counts[:, None]
+    centered = (X - mean[:, None, :]) * weights[:, :, None]
+    scale = np.sqrt(np.einsum('ntf,ntf->nf', centered, centered) / counts[:, None])
+    scale[scale == 0] = 1.0
+    Z = centered / scale[:, None, :]
+
+    y_mean = (weights * y).sum(axis=1) / counts
+    y_centered = (y - y_mean[:, None]) * weights
+
+    # Normal equations (Z'Z + alpha I) w = Z'y for every symbol at once
+    n_features = X.shape[2]
+    gram = np.einsum('ntf,ntg->nfg', Z, Z) + alpha * np.eye(n_features)
+    moment = np.einsum('ntf,nt->nf', Z, y_centered)
+    try:
+        coef = np.linalg.solve(gram, moment[:, :, None])[:, :, 0]
+    except np.linalg.LinAlgError:
+        # Only possible with alpha=0 and collinear features
+        coef = np.einsum('nfg,ng->nf', np.linalg.pinv(gram), moment)
+    return mean, scale, coef, y_mean
+
+
+def stack_frames(frames: Dict[str, pd.DataFrame], feature_columns: List[str],
+                 target_column: str = 'Close') -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Stack per-symbol frames into a right-aligned (symbols, rows, features) tensor
+
+    Shorter histories are padded at the start so every symbol's last row sits
+    in the last position.
+
+    Returns:
+        Tuple of (X, y, mask)
+    """
+    length = max(len(df) for df in frames.values())
+    X = np.zeros((len(frames), length, len(feature_columns)))
+    y = np.zeros((len(frames), length))
+    mask = np.zeros((len(frames), length), dtype=bool)
+    for i, df in enumerate(frames.values()):
+        offset = length - len(df)
+        X[i, offset:] = df[feature_columns].to_numpy(dtype=np.float64)
+        y[i, offset:] = df[target_column].to_numpy(dtype=np.float64)
+        mask[i, offset:] = True
+    return X, y, mask
+
+
+def fit_linear_models(frames: Dict[str, pd.DataFrame], feature_columns: List[str],
+                      alpha: float = RIDGE_ALPHA,
+                      holdout: int = HOLDOUT_DAYS) -> Dict[str, Tuple[RidgeModel, Standardizer, Dict[str, float], pd.Timestamp]]:
+    """
+    Train the linear model of every symbol, holding out each symbol's last rows
+
+    Args:
+        frames: Dictionary mapping symbols to prepared StockPredictor frames
+        feature_columns: Model input columns
+        alpha: L2 penalty on the standardized coefficients
+        holdout: Number of trailing rows used for evaluation only
+
+    Returns:
+        Dictionary mapping symbols to (model, scaler, metrics, last training date);
+        symbols with no more rows than the holdout are skipped
+    """
+    frames = {symbol: df for symbol, df in frames.items() if len(df) > holdout}
+    if not frames:
+        return {}
+
+    X, y, mask = stack_frames(frames, feature_columns)
+    train_mask = mask.copy()
+    train_mask[:, -holdout:] = False
+
+    mean, scale, coef, intercept = fit_ridge_batch(X, y, train_mask, alpha)
+
+    # Holdout predictions for all symbols in one contraction
+    Z_test = (X[:, -holdout:] - mean[:, None, :]) / scale[:, None, :]
+    y_pred = np.einsum('ntf,nf->nt', Z_test, coef) + intercept[:, None]
+    mae = np.abs(y_pred - y[:, -holdout:]).mean(axis=1)
+
+    results = {}
+    for i, (symbol, df) in enumerate(frames.items()):
+        accuracy = 1 - mae[i] / df['Close'].mean()
+        results[symbol] = (
+            RidgeModel(coef[i], float(intercept[i])),
+            Standardizer(mean[i], scale[i]),
+            {"mae": float(mae[i]), "accuracy": float(accuracy)},
+            df.index[-holdout - 1],
+        )
+    return results
@@ -0,0 +1,284 @@
+import os
+import json
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+import tensorflow as tf
+from tensorflow.keras.models import Sequential
+from tensorflow.keras.layers import LSTM, Dense, Dropout, Input
+
+from models.model_registry import MODEL_MAX_AGE_HOURS, MODEL_MAX_NEW_BARS
+
+logger = logging.getLogger(__name__)
+
+# Directory holding one weights file and one metadata file per symbol
+LSTM_MODEL_DIR = os.getenv(
+    "LSTM_MODEL_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "lstm")
+)
+LSTM_LOOK_BACK = int(os.getenv("LSTM_LOOK_BACK", 60))
+LSTM_EPOCHS = int(os.getenv("LSTM_EPOCHS", 5))
+FORECAST_DAYS = 30
+
+# Key of the model trained on the windows of all symbols, used for batched rollouts
+UNIVERSE_KEY = "_universe"
+
+
+def _use_cpu_only() -> None:
+    """Hide GPUs from TensorFlow; small LSTM inference is faster on the CPU"""
+    try:
+        tf.config.set_visible_devices([], 'GPU')
+    except RuntimeError:
+        # Devices were already initialized by an earlier TensorFlow call
+        logger.debug("TensorFlow devices already initialized, GPU visibility unchanged")
+
+
+def build_model(look_back: int = LSTM_LOOK_BACK, compile: bool = True) -> Sequential:
+    """Same architecture as ml_models.lstm_forecast (compile=False for inference-only models)"""
+    model = Sequential([
+        Input(shape=(look_back, 1)),
+        LSTM(units=50, return_sequences=True),
+        Dropout(0.2),
+        LSTM(units=50, return_sequences=False),
+        Dropout(0.2),
+        Dense(units=1),
+    ])
+    if compile:
+        model.compile(optimizer='adam', loss='mean_squared_error')
+    return model
+
+
+def make_windows(scaled: np.ndarray, look_back: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Training windows of `look_back` values and the value following each one"""
+    X = sliding_window_view(scaled[:-1], look_back)
+    y = scaled[look_back:]
+    return X[:, :, None].astype(np.float32), y.astype(np.float32)
+
+
+class LSTMEntry:
+    """A trained LSTM with its compiled inference step and scaling metadata"""
+
+    def __init__(self, model: Sequential, metadata: Dict[str, Any]):
+        self.model = model
+        self.metadata = metadata
+        # Traced once per batch size; each call is a single graph execution
+        self.step = tf.function(lambda window: model(window, training=False), reduce_retracing=True)
+
+    @property
+    def data_end(self) -> pd.Timestamp:
+        return pd.Timestamp(self.metadata['data_end'])
+
+    @property
+    def trained_at(self) -> datetime:
+        return datetime.fromisoformat(self.metadata['trained_at'])
+
+
+class LSTMService:
+    """
+    Keeps trained LSTM weights per symbol and serves fast recursive forecasts.
+
+    Weights are stored on disk and kept in memory, so a cached model answers
+    without retraining. Rollouts run a traced inference function over a
+    preallocated buffer instead of calling model.predict and np.append once
+    per step, and forecast_many rolls out all symbols together with one
+    forward pass per step through a model trained on every symbol's windows.
+    """
+
+    def __init__(self, root: str = LSTM_MODEL_DIR, look_back: int = LSTM_LOOK_BACK, epochs: int = LSTM_EPOCHS,
+                 max_age_hours: float = MODEL_MAX_AGE_HOURS, max_new_bars: int = MODEL_MAX_NEW_BARS):
+        _use_cpu_only()
+        self.root = root
+        self.look_back = look_back
+        self.epochs = epochs
+        self.max_age_hours = max_age_hours
+        self.max_new_bars = max_new_bars
+        self._entries: Dict[str, LSTMEntry] = {}
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def _paths(self, key: str) -> Tuple[str, str]:
+        base = os.path.join(self.root, key)
+        return f"{base}.weights.h5", f"{base}.json"
+
+    def _load(self, key: str) -> Optional[LSTMEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None:
+            return entry
+
+        weights_path, metadata_path = self._paths(key)
+        if not (os.path.exists(weights_path) and os.path.exists(metadata_path)):
+            return None
+        try:
+            with open(metadata_path) as f:
+                metadata = json.load(f)
+            # Restored models only run inference, so the optimizer state in the file is not needed
+            model = build_model(metadata['look_back'], compile=False)
+            model.load_weights(weights_path)
+        except Exception as e:
+            logger.error(f"Could not load LSTM weights for {key}: {e}")
+            return None
+
+        entry = LSTMEntry(model, metadata)
+        with self._lock:
+            self._entries[key] = entry
+        return entry
+
+    def _stale_reason(self, entry: Optional[LSTMEntry], index: pd.DatetimeIndex) -> Optional[str]:
+        if entry is None:
+            return "no stored model"
+        if entry.metadata['look_back'] != self.look_back:
+            return "look-back changed"
+        age_hours = (datetime.now() - entry.trained_at).total_seconds() / 3600
+        if age_hours > self.max_age_hours:
+            return f"model is {age_hours:.1f}h old"
+        new_bars = int((index > entry.data_end).sum())
+        if new_bars > self.max_new_bars:
+            return f"{new_bars} new bars since training"
+        return None
+
+    def _train(self, key: Optional[str], series: List[np.ndarray], data_end: pd.Timestamp,
+               scaling: Dict[str, Any]) -> LSTMEntry:
+        """Train on the windows of the given standardized series and store the weights under key"""
+        windows = [make_windows(values, self.look_back) for values in series if len(values) > self.look_back]
+        if not windows:
+            raise ValueError(f"Need more than {self.look_back} prices to train the LSTM")
+        X = np.concatenate([w[0] for w in windows])
+        y = np.concatenate([w[1] for w in windows])
+
+        model = build_model(self.look_back)
+        model.fit(X, y, epochs=self.epochs, batch_size=32, verbose=0)
+
+        metadata = {
+            'look_back': self.look_back,
+            'data_end': pd.Timestamp(data_end).isoformat(),
+            'trained_at': datetime.now().isoformat(),
+            'scaling': scaling,
+        }
+        entry = LSTMEntry(model, metadata)
+        if key is None:
+            return entry
+
+        weights_path, metadata_path = self._paths(key)
+        model.save_weights(weights_path)
+        tmp_path = f"{metadata_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(metadata, f)
+        os.replace(tmp_path, metadata_path)
+
+        with self._lock:
+            self._entries[key] = entry
+        return entry
+
+    def rollout(self, entry: LSTMEntry, windows: np.ndarray, steps: int = FORECAST_DAYS) -> np.ndarray:
+        """
+        Recursive forecast for a batch of standardized windows
+
+        Args:
+            entry: Trained model
+            windows: Last `look_back` standardized values per series, shape (batch, look_back)
+            steps: Number of days to forecast
+
+        Returns:
+            Standardized forecasts, shape (batch, steps)
+        """
+        batch, look_back = windows.shape
+        # Each step reads a view of the buffer and writes one column; nothing is reallocated
+        buffer = np.empty((batch, look_back + steps, 1), dtype=np.float32)
+        buffer[:, :look_back, 0] = windows
+        for k in range(steps):
+            buffer[:, look_back + k] = entry.step(buffer[:, k:k + look_back]).numpy()
+        return buffer[:, look_back:, 0]
+
+    def forecast(self, symbol: Optional[str], close: pd.Series, steps: int = FORECAST_DAYS) -> np.ndarray:
+        """
+        Forecast one symbol with its own model, training it only when stale
+
+        Args:
+            symbol: Stock symbol the weights are stored under (None: train a throwaway model)
+            close: Closing prices indexed by date
+            steps: Number of days to forecast
+
+        Returns:
+            Forecasted prices, shape (steps,)
+        """
+        close = close.dropna()
+        values = close.to_numpy(dtype=np.float64)
+
+        entry = self._load(symbol) if symbol else None
+        reason = self._stale_reason(entry, close.index)
+        if reason is not None:
+            logger.info(f"Training LSTM for {symbol}: {reason}")
+            mean, scale = float(values.mean()), float(values.std() or 1.0)
+            entry = self._train(symbol, [(values - mean) / scale], close.index[-1],
+                                {'mean': [mean], 'scale': [scale]})
+
+        mean, scale = entry.metadata['scaling']['mean'][0], entry.metadata['scaling']['scale'][0]
+        window = ((values[-self.look_back:] - mean) / scale)[None, :]
+        return self.rollout(entry, window, steps)[0] * scale + mean
+
+    def forecast_many(self, closes: Dict[str, pd.Series], steps: int = FORECAST_DAYS) -> Dict[str, np.ndarray]:
+        """
+        Forecast many symbols in one batched rollout
+
+        All symbols share one model trained on their standardized windows, so
+        each forecast step is a single forward pass for the whole batch.
+        Inference windows are standardized with the per-symbol mean and scale
+        stored at training time.
+
+        Args:
+            closes: Dictionary mapping symbols to closing prices
+            steps: Number of days to forecast
+
+        Returns:
+            Dictionary mapping symbols to forecasted prices
+        """
+        closes = {symbol: close.dropna() for symbol, close in closes.items()}
+        closes = {symbol: close for symbol, close in closes.items() if len(close) >= self.look_back}
+        if not closes:
+            return {}
+
+        symbols = list(closes)
+        index = max((closes[s].index for s in symbols), key=lambda idx: idx[-1])
+
+        entry = self._load(UNIVERSE_KEY)
+        reason = self._stale_reason(entry, index)
+        if reason is None and 'mean' not in entry.metadata['scaling']:
+            reason = "training scaling not stored"
+        if reason is None and not set(symbols) <= set(entry.metadata['scaling'].get('symbols', [])):
+            reason = "new symbols"
+        if reason is not None:
+            logger.info(f"Training universe LSTM on {len(symbols)} symbols: {reason}")
+            means = [float(closes[s].mean()) for s in symbols]
+            scales = [float(closes[s].std(ddof=0) or 1.0) for s in symbols]
+            series = [(closes[s].to_numpy(dtype=np.float64) - m) / sc for s, m, sc in zip(symbols, means, scales)]
+            entry = self._train(UNIVERSE_KEY, series, index[-1],
+                                {'symbols': symbols, 'mean': means, 'scale': scales})
+
+        scaling = entry.metadata['scaling']
+        position = {symbol: i for i, symbol in enumerate(scaling['symbols'])}
+        means = np.array([scaling['mean'][position[s]] for s in symbols])
+        scales = np.array([scaling['scale'][position[s]] for s in symbols])
+        windows = np.stack([
+            (closes[s].to_numpy(dtype=np.float64)[-self.look_back:] - m) / sc
+            for s, m, sc in zip(symbols, means, scales)
+        ])
+        forecasts = self.rollout(entry, windows, steps) * scales[:, None] + means[:, None]
+        return dict(zip(symbols, forecasts))
+
+
+_service: Optional[LSTMService] = None
+
+
+def get_lstm_service() -> LSTMService:
+    """Return the process-wide LSTM service"""
+    global _service
+    if _service is None:
+        _service = LSTMService()
+    return _service
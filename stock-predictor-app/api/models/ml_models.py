@@ -1,13 +1,11 @@
 import pandas as pd
 import numpy as np
 from sklearn.linear_model import LinearRegression
-from sklearn.neighbors import KNeighborsRegressor
-import statsmodels.api as sm
-from prophet import Prophet
-from sklearn.preprocessing import StandardScaler
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import LSTM, Dense, Dropout
-from typing import Union, Dict, List
+from typing import Union, Dict, List, Optional
+
+from models.analog_index import ANALOG_NEIGHBORS, AnalogIndex, get_analog_index
+# statsmodels, Prophet and TensorFlow are imported on first use (models.backends)
+from models.backends import load_backend
 
 def moving_average_forecast(data: pd.DataFrame, window_size: int = 50) -> pd.Series:
     """
@@ -53,47 +51,52 @@ def linear_regression_forecast(data: pd.DataFrame) -> np.ndarray:
     
     return forecast
 
-def knn_forecast(data: pd.DataFrame, n_neighbors: int = 5) -> np.ndarray:
+def knn_forecast(data: pd.DataFrame, n_neighbors: int = ANALOG_NEIGHBORS, symbol: Optional[str] = None) -> np.ndarray:
     """
-    k-Nearest Neighbors (KNN) forecast for stock prices
+    Historical analog (nearest neighbour) forecast for stock prices
+    
+    The latest window of returns is matched against z-normalized historical
+    windows and the paths that followed the best matches are averaged.
     
     Args:
         data: DataFrame with stock data
-        n_neighbors: Number of neighbors
+        n_neighbors: Number of matching windows
+        symbol: Stock symbol; when given, the data is added to the shared
+            analog index and matched against every indexed symbol
     
     Returns:
         Array with forecasted values
     """
-    # Prepare data
-    X = np.arange(len(data)).reshape(-1, 1)
-    y = data['Close'].values
-    
-    # Train model
-    model = KNeighborsRegressor(n_neighbors=n_neighbors)
-    model.fit(X, y)
-    
-    # Forecast
-    last_idx = len(data) - 1
-    future_idx = np.array(range(last_idx + 1, last_idx + 31))
-    forecast = model.predict(future_idx.reshape(-1, 1))
-    
-    return forecast
+    if symbol:
+        index = get_analog_index()
+        index.update(symbol, data['Close'])
+    else:
+        index = AnalogIndex()
+        index.update("_", data['Close'])
+    
+    return index.forecast(data['Close'], n_neighbors)
 
-def auto_arima_forecast(data: pd.DataFrame) -> np.ndarray:
+def auto_arima_forecast(data: pd.DataFrame, symbol: Optional[str] = None) -> np.ndarray:
     """
     ARIMA forecast for stock prices
     
     Args:
         data: DataFrame with stock data
+        symbol: Stock symbol; when given, fitted parameters are cached and new
+            bars are appended to the filter state instead of refitting
     
     Returns:
         Array with forecasted values
     """
+    arima_service = load_backend("arima")
+    if symbol:
+        return arima_service.get_arima_service().forecast(symbol, data['Close'])
+    
     # Prepare data
     y = data['Close'].values
     
-    # Fit ARIMA model
-    model = sm.tsa.ARIMA(y, order=(5, 1, 0))
+    # Fit ARIMA model (statsmodels as imported by the loaded backend)
+    model = arima_service.sm.tsa.ARIMA(y, order=(5, 1, 0))
     model_fit = model.fit()
     
     # Forecast
@@ -101,22 +104,28 @@ def auto_arima_forecast(data: pd.DataFrame) -> np.ndarray:
     
     return forecast
 
-def prophet_forecast(data: pd.DataFrame) -> Dict[str, List]:
+def prophet_forecast(data: pd.DataFrame, symbol: Optional[str] = None) -> Dict[str, List]:
     """
     Facebook Prophet forecast for stock prices
     
     Args:
         data: DataFrame with stock data
+        symbol: Stock symbol; when given, the fitted model is stored, reused
+            while fresh and warm-started on refits
     
     Returns:
         Dictionary with forecasted values and dates
     """
+    prophet_service = load_backend("prophet")
+    if symbol:
+        return prophet_service.get_prophet_service().forecast(symbol, data['Close'])
+    
     # Prepare data
     df = data.reset_index()[['Date', 'Close']]
     df.columns = ['ds', 'y']
     
-    # Train model
-    model = Prophet(daily_seasonality=True)
+    # Train model (Prophet as imported by the loaded backend)
+    model = prophet_service.Prophet(daily_seasonality=True)
     model.fit(df)
     
     # Create future dataframe
@@ -133,59 +142,21 @@ def prophet_forecast(data: pd.DataFrame) -> Dict[str, List]:
         'upper_bound': forecast['yhat_upper'][-30:].tolist()
     }
 
-def lstm_forecast(data: pd.DataFrame, look_back: int = 60) -> np.ndarray:
+def lstm_forecast(data: pd.DataFrame, look_back: int = 60, symbol: Optional[str] = None) -> np.ndarray:
     """
     LSTM forecast for stock prices
     
     Args:
         data: DataFrame with stock data
         look_back: Number of previous days to use for prediction
+        symbol: Stock symbol; when given, trained weights are stored and reused
     
     Returns:
         Array with forecasted values
     """
-    # Prepare data
-    df = data.copy()
-    dataset = df['Close'].values.reshape(-1, 1)
-    
-    scaler = StandardScaler()
-    scaled_data = scaler.fit_transform(dataset)
-    
-    # Create sequences
-    X, y = [], []
-    for i in range(look_back, len(scaled_data)):
-        X.append(scaled_data[i-look_back:i, 0])
-        y.append(scaled_data[i, 0])
-    
-    X, y = np.array(X), np.array(y)
-    X = np.reshape(X, (X.shape[0], X.shape[1], 1))
-    
-    # Build LSTM model
-    model = Sequential()
-    model.add(LSTM(units=50, return_sequences=True, input_shape=(X.shape[1], 1)))
-    model.add(Dropout(0.2))
-    model.add(LSTM(units=50, return_sequences=False))
-    model.add(Dropout(0.2))
-    model.add(Dense(units=1))
-    
-    # Compile and fit
-    model.compile(optimizer='adam', loss='mean_squared_error')
-    model.fit(X, y, epochs=5, batch_size=32, verbose=0)
-    
-    # Generate future predictions
-    last_sequence = scaled_data[-look_back:].reshape(1, look_back, 1)
-    forecasts = []
-    
-    for _ in range(30):  # Predict 30 days ahead
-        next_pred = model.predict(last_sequence)[0]
-        forecasts.append(next_pred)
-        # Update sequence for next prediction
-        last_sequence = np.append(last_sequence[:, 1:, :], 
-                                  np.array([[[next_pred]]]), 
-                                  axis=1)
-    
-    # Inverse transform
-    forecasts = np.array(forecasts).reshape(-1, 1)
-    forecasts = scaler.inverse_transform(forecasts)
-    
-    return forecasts.flatten() 
\ No newline at end of file
+    lstm_service = load_backend("lstm")
+    if look_back == lstm_service.LSTM_LOOK_BACK:
+        service = lstm_service.get_lstm_service()
+    else:
+        service = lstm_service.LSTMService(look_back=look_back)
+    return service.forecast(symbol, data['Close'])
@@ -0,0 +1,229 @@
+import os
+import glob
+import fcntl
+import shutil
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from models.compact_forest import CompactForest
+
+logger = logging.getLogger(__name__)
+
+# Directory holding one joblib file per (symbol, model type)
+MODEL_REGISTRY_DIR = os.getenv(
+    "MODEL_REGISTRY_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "models")
+)
+# Retrain when the model is older than this many hours
+MODEL_MAX_AGE_HOURS = float(os.getenv("MODEL_MAX_AGE_HOURS", 24))
+# Retrain when more than this many bars arrived after the data a model was trained on
+MODEL_MAX_NEW_BARS = int(os.getenv("MODEL_MAX_NEW_BARS", 5))
+# Store tree ensembles as memory-mapped flat arrays instead of pickled estimators
+COMPACT_FORESTS = os.getenv("COMPACT_FORESTS", "1") == "1"
+
+
+def data_fingerprint(df: pd.DataFrame, columns: Optional[List[str]] = None) -> str:
+    """Hash of the given columns' values, used to detect revised training data"""
+    values = df[columns] if columns else df
+    digest = hashlib.sha1(np.ascontiguousarray(values.to_numpy(dtype=np.float64)).tobytes())
+    digest.update(str(len(values)).encode())
+    return digest.hexdigest()
+
+
+class ModelRecord:
+    """A trained model with its scaler and training metadata"""
+
+    def __init__(self, model: Any, scaler: Any, metadata: Dict[str, Any]):
+        self.model = model
+        self.scaler = scaler
+        self.metadata = metadata
+
+    @property
+    def feature_columns(self) -> List[str]:
+        return self.metadata['feature_columns']
+
+    @property
+    def train_end(self) -> pd.Timestamp:
+        return pd.Timestamp(self.metadata['train_end'])
+
+    @property
+    def data_end(self) -> pd.Timestamp:
+        return pd.Timestamp(self.metadata['data_end'])
+
+    @property
+    def trained_at(self) -> datetime:
+        return datetime.fromisoformat(self.metadata['trained_at'])
+
+
+class ModelRegistry:
+    """
+    Persists trained models to disk and decides when they can be reused.
+
+    A stored model is reused while its feature schema matches, it is younger
+    than max_age_hours, no more than max_new_bars bars arrived after the data
+    it was trained on and the training window's prices are unchanged.
+    """
+
+    FINGERPRINT_COLUMNS = ['Close']
+
+    def __init__(self, root: str = MODEL_REGISTRY_DIR, max_age_hours: float = MODEL_MAX_AGE_HOURS,
+                 max_new_bars: int = MODEL_MAX_NEW_BARS):
+        self.root = root
+        self.max_age_hours = max_age_hours
+        self.max_new_bars = max_new_bars
+        # (symbol, model_type) -> (file mtime, record)
+        self._records: Dict[Tuple[str, str], Tuple[float, ModelRecord]] = {}
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, symbol: str, model_type: str) -> str:
+        return os.path.join(self.root, f"{symbol}__{model_type}.joblib")
+
+    def _forest_dirs(self, symbol: str, model_type: str) -> List[str]:
+        return glob.glob(os.path.join(self.root, f"{symbol}__{model_type}.*.forest"))
+
+    @contextmanager
+    def _save_lock(self, symbol: str, model_type: str) -> Iterator[None]:
+        """Serialize saves of one model across threads and processes (training pool workers)"""
+        with open(f"{self._path(symbol, model_type)}.lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    @staticmethod
+    def _is_forest(model: Any) -> bool:
+        estimators = getattr(model, 'estimators_', None)
+        return bool(estimators) and hasattr(estimators[0], 'tree_')
+
+    def training_fingerprint(self, df: pd.DataFrame, train_end: pd.Timestamp) -> str:
+        """Fingerprint of the rows up to and including train_end"""
+        return data_fingerprint(df[df.index <= train_end], self.FINGERPRINT_COLUMNS)
+
+    def save(self, symbol: str, model_type: str, model: Any, scaler: Any, df: pd.DataFrame,
+             feature_columns: List[str], train_end: pd.Timestamp, metrics: Dict[str, float],
+             extra: Optional[Dict[str, Any]] = None) -> ModelRecord:
+        """
+        Store a trained model
+
+        Args:
+            symbol: Stock symbol
+            model_type: Model type name
+            model: Fitted estimator (tree ensembles are stored as a CompactForest)
+            scaler: Fitted feature scaler
+            df: Prepared data the model was trained from
+            feature_columns: Feature columns in model input order
+            train_end: Last date of the training window
+            metrics: Holdout metrics (e.g. mae, accuracy)
+            extra: Additional model-specific metadata (e.g. forecast horizons)
+
+        Returns:
+            The stored ModelRecord
+        """
+        metadata = {
+            'symbol': symbol,
+            'model_type': model_type,
+            'feature_columns': list(feature_columns),
+            'train_end': pd.Timestamp(train_end).isoformat(),
+            'data_end': pd.Timestamp(df.index[-1]).isoformat(),
+            'train_rows': int((df.index <= train_end).sum()),
+            'fingerprint': self.training_fingerprint(df, train_end),
+            'metrics': {name: float(value) for name, value in metrics.items()},
+            'trained_at': datetime.now().isoformat(),
+            **(extra or {}),
+        }
+        path = self._path(symbol, model_type)
+
+        # Another saver could otherwise delete this save's forest as one of its old forests
+        with self._save_lock(symbol, model_type):
+            # Versioned array directory: readers of the previous joblib keep a valid forest
+            old_forests = self._forest_dirs(symbol, model_type)
+            if COMPACT_FORESTS and self._is_forest(model):
+                forest_dir = f"{symbol}__{model_type}.{datetime.now():%Y%m%d%H%M%S%f}-{os.getpid()}.forest"
+                CompactForest.from_sklearn(model).save(os.path.join(self.root, forest_dir))
+                metadata['compact_forest'] = forest_dir
+                model = CompactForest.load(os.path.join(self.root, forest_dir))
+            record = ModelRecord(model, scaler, metadata)
+
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            stored_model = None if 'compact_forest' in metadata else model
+            joblib.dump({'model': stored_model, 'scaler': scaler, 'metadata': metadata}, tmp_path)
+            os.replace(tmp_path, path)
+            for old_forest in old_forests:
+                shutil.rmtree(old_forest, ignore_errors=True)
+            mtime = os.path.getmtime(path)
+
+        with self._lock:
+            self._records[(symbol, model_type)] = (mtime, record)
+        return record
+
+    def load(self, symbol: str, model_type: str) -> Optional[ModelRecord]:
+        """Load a stored model (from memory unless the file changed on disk)"""
+        path = self._path(symbol, model_type)
+        if not os.path.exists(path):
+            return None
+
+        mtime = os.path.getmtime(path)
+        with self._lock:
+            cached = self._records.get((symbol, model_type))
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        try:
+            payload = joblib.load(path)
+            model = payload['model']
+            if 'compact_forest' in payload['metadata']:
+                model = CompactForest.load(os.path.join(self.root, payload['metadata']['compact_forest']))
+        except Exception as e:
+            logger.error(f"Could not load model {path}: {e}")
+            return None
+
+        record = ModelRecord(model, payload['scaler'], payload['metadata'])
+        with self._lock:
+            self._records[(symbol, model_type)] = (mtime, record)
+        return record
+
+    def stale_reason(self, record: ModelRecord, df: pd.DataFrame, feature_columns: List[str]) -> Optional[str]:
+        """
+        Check the retraining policy for a stored model
+
+        Args:
+            record: Stored model
+            df: Current prepared data
+            feature_columns: Current feature columns
+
+        Returns:
+            Reason to retrain, or None if the model can be reused
+        """
+        if record.feature_columns != list(feature_columns):
+            return "feature schema changed"
+
+        age_hours = (datetime.now() - record.trained_at).total_seconds() / 3600
+        if age_hours > self.max_age_hours:
+            return f"model is {age_hours:.1f}h old"
+
+        new_bars = int((df.index > record.data_end).sum())
+        if new_bars > self.max_new_bars:
+            return f"{new_bars} new bars since training"
+
+        if self.training_fingerprint(df, record.train_end) != record.metadata['fingerprint']:
+            return "training data changed"
+
+        return None
+
+
+_registry: Optional[ModelRegistry] = None
+
+
+def get_model_registry() -> ModelRegistry:
+    """Return the process-wide model registry"""
+    global _registry
+    if _registry is None:
+        _registry = ModelRegistry()
+    return _registry
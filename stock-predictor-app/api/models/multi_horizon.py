@@ -0,0 +1,102 @@
+import os
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.preprocessing import StandardScaler
+
+logger = logging.getLogger(__name__)
+
+MULTI_HORIZON_MODEL_TYPE = "multi_horizon"
+# Trading-day horizons predicted by one multi-output fit
+FORECAST_HORIZONS = [int(h) for h in os.getenv("FORECAST_HORIZONS", "1,5,7,10,30").split(",")]
+HOLDOUT_DAYS = 30
+
+
+def horizon_targets(close: np.ndarray, horizons: List[int]) -> np.ndarray:
+    """
+    Future closes for every row and horizon
+
+    Args:
+        close: Closing prices, shape (rows,)
+        horizons: Horizons in rows (trading days)
+
+    Returns:
+        Array of shape (rows, horizons); NaN where the future close is not known yet
+    """
+    targets = np.full((len(close), len(horizons)), np.nan)
+    for j, horizon in enumerate(horizons):
+        if horizon < len(close):
+            targets[:len(close) - horizon, j] = close[horizon:]
+    return targets
+
+
+def fit_multi_horizon(features: pd.DataFrame, close: pd.Series, horizons: List[int] = FORECAST_HORIZONS,
+                      n_jobs: Optional[int] = None,
+                      holdout: int = HOLDOUT_DAYS) -> Tuple[RandomForestRegressor, StandardScaler, Dict[str, float], pd.Timestamp]:
+    """
+    Train one multi-output forest on the closes `horizons` days ahead
+
+    Only rows whose targets are known for every horizon are used; the last
+    `holdout` of them are kept for evaluation.
+
+    Args:
+        features: Model input columns
+        close: Closing prices aligned with features
+        horizons: Forecast horizons in trading days
+        n_jobs: Forest n_jobs
+        holdout: Number of labelled rows used for evaluation only
+
+    Returns:
+        Tuple of (model, scaler, metrics, date of the last close used as a training target)
+    """
+    horizons = sorted(horizons)
+    targets = horizon_targets(close.to_numpy(dtype=np.float64), horizons)
+    labelled = len(close) - horizons[-1]
+    if labelled <= holdout:
+        raise ValueError(f"Not enough data for a {horizons[-1]}-day horizon")
+
+    n_train = labelled - holdout
+    X_train, X_test = features.iloc[:n_train], features.iloc[n_train:labelled]
+    y_train, y_test = targets[:n_train], targets[n_train:labelled]
+
+    scaler = StandardScaler()
+    X_train_scaled = scaler.fit_transform(X_train)
+
+    # RandomForestRegressor fits all outputs with the same trees
+    model = RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=n_jobs)
+    model.fit(X_train_scaled, y_train)
+
+    errors = np.abs(model.predict(scaler.transform(X_test)) - y_test).mean(axis=0)
+    mean_close = close.mean()
+    metrics = {f"mae_{h}": float(mae) for h, mae in zip(horizons, errors)}
+    metrics["mae"] = float(errors.mean())
+    metrics["accuracy"] = float(1 - errors.mean() / mean_close)
+    for h, mae in zip(horizons, errors):
+        metrics[f"accuracy_{h}"] = float(1 - mae / mean_close)
+
+    return model, scaler, metrics, close.index[n_train - 1 + horizons[-1]]
+
+
+def interpolate_horizon(curve: Dict[Any, float], last_price: float, time_horizon: int) -> float:
+    """
+    Price for any horizon from a predicted horizon curve
+
+    Horizons between curve points are linearly interpolated (day 0 is the last
+    price); horizons beyond the curve use its last point.
+    """
+    points = sorted((int(h), float(price)) for h, price in curve.items())
+    days = [0] + [h for h, _ in points]
+    prices = [float(last_price)] + [price for _, price in points]
+    return float(np.interp(time_horizon, days, prices))
+
+
+def curve_accuracy(metrics: Dict[str, float], time_horizon: int) -> float:
+    """Holdout accuracy of the curve point nearest to the requested horizon"""
+    horizons = [int(name.split("_")[1]) for name in metrics if name.startswith("accuracy_")]
+    if not horizons:
+        return metrics["accuracy"]
+    nearest = min(horizons, key=lambda h: abs(h - time_horizon))
+    return metrics[f"accuracy_{nearest}"]
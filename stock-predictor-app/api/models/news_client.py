@@ -0,0 +1,204 @@
+import os
+import time
+import random
+import asyncio
+import logging
+import threading
+import weakref
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+FINNHUB_BASE_URL = os.getenv("FINNHUB_BASE_URL", "https://finnhub.io/api/v1")
+# Finnhub API quota (free tier: 60 calls per minute)
+FINNHUB_CALLS_PER_MINUTE = int(os.getenv("FINNHUB_CALLS_PER_MINUTE", 60))
+# Calls allowed back to back before the limiter starts spacing them
+FINNHUB_BURST = int(os.getenv("FINNHUB_BURST", 10))
+# Requests in flight at once (also the connection pool size)
+NEWS_MAX_CONCURRENCY = int(os.getenv("NEWS_MAX_CONCURRENCY", 8))
+# Attempts after the first one for throttled, 5xx or failed requests
+NEWS_MAX_RETRIES = int(os.getenv("NEWS_MAX_RETRIES", 4))
+NEWS_TIMEOUT_SECONDS = float(os.getenv("NEWS_TIMEOUT_SECONDS", 10))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 30.0
+
+
+class RateLimiter:
+    """
+    Token bucket shared by the async and blocking Finnhub call paths.
+
+    Callers reserve a token and wait out the returned delay, so the bucket is
+    never held while sleeping and one instance works across threads and event
+    loops. The refill rate is (quota - burst) per minute: a full burst plus a
+    minute of refill stays within the per-minute quota.
+    """
+
+    def __init__(self, calls_per_minute: int = FINNHUB_CALLS_PER_MINUTE, burst: int = FINNHUB_BURST,
+                 clock: Callable[[], float] = time.monotonic):
+        self.capacity = max(1, min(burst, calls_per_minute - 1))
+        self.rate = (calls_per_minute - self.capacity) / 60.0
+        self.clock = clock
+        self._tokens = float(self.capacity)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        """Take a token; returns the seconds to wait before using it"""
+        with self._lock:
+            self._refill()
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller for at least `seconds` (e.g. after HTTP 429)"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, -seconds * self.rate)
+
+    async def acquire(self) -> None:
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def acquire_blocking(self) -> None:
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff for the given retry attempt (0-based)"""
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+
+class NewsClient:
+    """
+    Async Finnhub company-news client.
+
+    Keeps one pooled httpx.AsyncClient per event loop, limits requests in
+    flight with a semaphore and spends calls from the shared RateLimiter.
+    Throttled (429), 5xx and transport failures are retried with jittered
+    backoff; a 429 also pauses the limiter so concurrent requests back off
+    together instead of each being throttled in turn.
+    """
+
+    def __init__(self, api_key: str, limiter: Optional[RateLimiter] = None,
+                 max_concurrency: int = NEWS_MAX_CONCURRENCY, max_retries: int = NEWS_MAX_RETRIES,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.api_key = api_key
+        self.limiter = limiter or get_rate_limiter()
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        # HTTP transport of the pooled clients (default: httpx's connection pool)
+        self.transport = transport
+        # event loop -> (http client, semaphore)
+        self._sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple[httpx.AsyncClient, asyncio.Semaphore]]" = \
+            weakref.WeakKeyDictionary()
+
+    def _session(self) -> Tuple[httpx.AsyncClient, asyncio.Semaphore]:
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None:
+            client = httpx.AsyncClient(
+                base_url=FINNHUB_BASE_URL,
+                headers={"X-Finnhub-Token": self.api_key},
+                timeout=NEWS_TIMEOUT_SECONDS,
+                limits=httpx.Limits(max_connections=self.max_concurrency,
+                                    max_keepalive_connections=self.max_concurrency),
+                transport=self.transport,
+            )
+            session = (client, asyncio.Semaphore(self.max_concurrency))
+            self._sessions[loop] = session
+        return session
+
+    async def _get(self, path: str, params: Dict[str, Any]) -> Any:
+        client, semaphore = self._session()
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.acquire()
+            try:
+                async with semaphore:
+                    response = await client.get(path, params=params)
+            except httpx.TransportError as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = backoff_delay(attempt)
+                logger.warning(f"Finnhub {path} failed ({e!r}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+
+            if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                response.raise_for_status()
+                return response.json()
+
+            delay = backoff_delay(attempt)
+            if response.status_code == 429:
+                retry_after = response.headers.get("Retry-After")
+                if retry_after and retry_after.isdigit():
+                    delay = max(delay, float(retry_after))
+                self.limiter.pause(delay)
+            logger.warning(f"Finnhub {path} returned {response.status_code}, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    async def company_news(self, symbol: str, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        """
+        Company news articles in Finnhub format
+
+        Args:
+            symbol: Finnhub symbol (without the .IS suffix)
+            start: First day to include
+            end: Last day to include
+
+        Returns:
+            List of article dicts
+        """
+        articles = await self._get("/company-news", {
+            "symbol": symbol,
+            "from": start.strftime('%Y-%m-%d'),
+            "to": end.strftime('%Y-%m-%d'),
+        })
+        return articles if isinstance(articles, list) else []
+
+    async def aclose(self) -> None:
+        """Close the connection pool of the running event loop"""
+        session = self._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await session[0].aclose()
+
+
+_limiter: Optional[RateLimiter] = None
+_clients: Dict[str, NewsClient] = {}
+_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Return the process-wide Finnhub rate limiter"""
+    global _limiter
+    with _lock:
+        if _limiter is None:
+            _limiter = RateLimiter()
+        return _limiter
+
+
+def get_news_client(api_key: str) -> NewsClient:
+    """Return the process-wide news client for an API key"""
+    limiter = get_rate_limiter()
+    with _lock:
+        if api_key not in _clients:
+            _clients[api_key] = NewsClient(api_key, limiter)
+        return _clients[api_key]
+
+
+async def close_news_clients() -> None:
+    """Close the connection pools opened on the running event loop"""
+    for client in list(_clients.values()):
+        await client.aclose()
@@ -0,0 +1,183 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Directory holding one SQLite article database per market data provider
+NEWS_STORE_DIR = os.getenv(
+    "NEWS_STORE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "news")
+)
+# Articles older than this are deleted
+NEWS_STORE_RETENTION_DAYS = int(os.getenv("NEWS_STORE_RETENTION_DAYS", 90))
+# Refetch this far before the last fetch to catch late-indexed articles
+NEWS_FETCH_OVERLAP_HOURS = float(os.getenv("NEWS_FETCH_OVERLAP_HOURS", 24))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    symbol TEXT NOT NULL,
+    article_key TEXT NOT NULL,
+    published INTEGER NOT NULL,
+    headline TEXT,
+    summary TEXT,
+    source TEXT,
+    url TEXT,
+    polarity REAL,
+    PRIMARY KEY (symbol, article_key)
+);
+CREATE INDEX IF NOT EXISTS articles_by_time ON articles (symbol, published);
+CREATE TABLE IF NOT EXISTS symbols (
+    symbol TEXT PRIMARY KEY,
+    last_fetched INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sentiment_state (
+    symbol TEXT PRIMARY KEY,
+    state TEXT NOT NULL
+);
+"""
+
+
+def article_key(article: Dict[str, Any]) -> str:
+    """Finnhub article id, or a content hash for articles without one"""
+    if article.get('id'):
+        return str(article['id'])
+    content = f"{article.get('datetime', '')}|{article.get('headline', '')}|{article.get('summary', '')}"
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+class NewsStore:
+    """
+    SQLite store of scored news articles per symbol.
+
+    Articles are keyed by (symbol, article id or content hash) together with
+    their polarity, and each symbol remembers when it was last fetched. A
+    refresh only requests news since then (minus a small overlap) and scores
+    the articles not seen before. The symbol's decayed sentiment aggregates
+    (models/sentiment_stream.py) are saved in the same transaction.
+    """
+
+    def __init__(self, path: str, retention_days: int = NEWS_STORE_RETENTION_DAYS,
+                 overlap_hours: float = NEWS_FETCH_OVERLAP_HOURS):
+        self.path = path
+        self.retention_days = retention_days
+        self.overlap_hours = overlap_hours
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def fetch_start(self, symbol: str, window_start: datetime) -> datetime:
+        """
+        Start of the next news request for a symbol
+
+        Args:
+            symbol: Stock symbol
+            window_start: Start of the analysis window
+
+        Returns:
+            window_start for a new symbol, otherwise the last fetch minus the overlap
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT last_fetched FROM symbols WHERE symbol = ?", (symbol,)).fetchone()
+        if row is None:
+            return window_start
+        return max(window_start, datetime.fromtimestamp(row[0]) - timedelta(hours=self.overlap_hours))
+
+    def unseen(self, symbol: str, articles: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Articles not stored yet for a symbol (duplicates within the batch removed)"""
+        by_key = {article_key(article): article for article in articles}
+        if not by_key:
+            return []
+        keys = list(by_key)
+        with self._lock:
+            # Stay below SQLite's bound parameter limit
+            stored = set()
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                stored.update(row[0] for row in self._conn.execute(
+                    f"SELECT article_key FROM articles WHERE symbol = ? AND article_key IN ({','.join('?' * len(chunk))})",
+                    (symbol, *chunk)
+                ))
+        return [article for key, article in by_key.items() if key not in stored]
+
+    def add(self, symbol: str, articles: Sequence[Dict[str, Any]], polarities: Sequence[Optional[float]],
+            fetched_at: datetime, stream_state: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Store scored articles and record the fetch
+
+        Args:
+            symbol: Stock symbol
+            articles: Articles in Finnhub format
+            polarities: Score per article (None for articles without text)
+            fetched_at: Time the articles were requested
+            stream_state: Symbol's decayed sentiment aggregates including these articles
+        """
+        rows = [
+            (symbol, article_key(article), int(article.get('datetime') or 0), article.get('headline', ''),
+             article.get('summary', ''), article.get('source', ''), article.get('url', ''), polarity)
+            for article, polarity in zip(articles, polarities)
+        ]
+        cutoff = int(time.time() - self.retention_days * 86400)
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR IGNORE INTO articles VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._conn.execute(
+                "INSERT INTO symbols VALUES (?, ?) ON CONFLICT(symbol) DO UPDATE SET last_fetched = excluded.last_fetched",
+                (symbol, int(fetched_at.timestamp()))
+            )
+            self._conn.execute("DELETE FROM articles WHERE symbol = ? AND published < ?", (symbol, cutoff))
+            if stream_state is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO sentiment_state VALUES (?, ?)", (symbol, json.dumps(stream_state))
+                )
+
+    def stream_state(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Persisted decayed sentiment aggregates of a symbol"""
+        with self._lock:
+            row = self._conn.execute("SELECT state FROM sentiment_state WHERE symbol = ?", (symbol,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def count(self, symbol: str, since: datetime) -> int:
+        """Number of scored articles of a symbol published since the given time"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM articles WHERE symbol = ? AND published >= ? AND polarity IS NOT NULL",
+                (symbol, int(since.timestamp()))
+            ).fetchone()[0]
+
+    def articles(self, symbol: str, since: datetime, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Stored articles of a symbol published since the given time, newest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT article_key, published, headline, summary, source, url, polarity FROM articles "
+                "WHERE symbol = ? AND published >= ? ORDER BY published DESC LIMIT ?",
+                (symbol, int(since.timestamp()), -1 if limit is None else limit)
+            ).fetchall()
+        return [
+            {'id': key, 'datetime': published, 'headline': headline, 'summary': summary,
+             'source': source, 'url': url, 'polarity': polarity}
+            for key, published, headline, summary, source, url, polarity in rows
+        ]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_stores: Dict[str, NewsStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_news_store(name: str) -> NewsStore:
+    """Return the process-wide article store for a provider name"""
+    with _stores_lock:
+        if name not in _stores:
+            _stores[name] = NewsStore(os.path.join(NEWS_STORE_DIR, f"{name}.sqlite"))
+        return _stores[name]
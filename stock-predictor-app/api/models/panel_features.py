@@ -0,0 +1,110 @@
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from models.feature_pipeline import (
+    FEATURE_SETS,
+    FeaturePipeline,
+    bfill,
+    evaluate_features,
+    ffill,
+    get_feature_pipeline,
+)
+
+logger = logging.getLogger(__name__)
+
+# Technical indicator columns produced for StockPredictor, in model feature order
+CALENDAR_COLUMNS = ['Day', 'Month', 'Year', 'DayOfWeek']
+INDICATOR_COLUMNS = FEATURE_SETS['predictor']
+
+# Cache namespace for fully prepared StockPredictor frames
+PREDICTOR_FRAME_SET = 'predictor_frame'
+
+
+def compute_panel_features(close: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Compute StockPredictor indicators for a date x symbol close panel in one pass
+
+    Args:
+        close: Forward-filled closing prices, shape (dates, symbols)
+
+    Returns:
+        Dictionary mapping indicator column names to (dates, symbols) arrays
+    """
+    return evaluate_features('predictor', {'Close': np.ascontiguousarray(close, dtype=np.float64)})
+
+
+def _calendar_groups(frames: Dict[str, pd.DataFrame]) -> List[List[str]]:
+    """Group symbols whose frames share the same dates and columns"""
+    groups: Dict[Tuple, List[str]] = {}
+    for symbol, df in frames.items():
+        key = (tuple(df.columns), len(df.index), df.index.asi8.tobytes())
+        groups.setdefault(key, []).append(symbol)
+    return list(groups.values())
+
+
+def prepare_feature_frames(frames: Dict[str, pd.DataFrame],
+                           pipeline: Optional[FeaturePipeline] = None,
+                           use_cache: bool = True) -> Dict[str, pd.DataFrame]:
+    """
+    Build StockPredictor feature frames for many symbols at once
+
+    Symbols sharing a trading calendar are stacked into one (dates, symbols, columns)
+    array and featurized together, so the work is a fixed number of array operations
+    per calendar group instead of per symbol. Output matches
+    StockPredictor._prepare_features: raw columns forward filled, calendar and
+    indicator columns appended, remaining gaps back filled and then set to 0.
+    Results are cached per (symbol, last bar) in the feature pipeline.
+
+    Args:
+        frames: Dictionary mapping symbols to raw OHLCV DataFrames
+        pipeline: Feature pipeline holding the cache (default: process-wide pipeline)
+        use_cache: Read and write the per-symbol cache
+
+    Returns:
+        Dictionary mapping symbols to feature DataFrames
+    """
+    pipeline = pipeline or get_feature_pipeline()
+    results: Dict[str, pd.DataFrame] = {}
+    pending: Dict[str, pd.DataFrame] = {}
+
+    for symbol, df in frames.items():
+        if df.empty:
+            continue
+        cached = pipeline.get_cached(pipeline.cache_key(symbol, df, PREDICTOR_FRAME_SET)) if use_cache else None
+        if cached is not None:
+            results[symbol] = cached
+        else:
+            pending[symbol] = df
+
+    for symbols in _calendar_groups(pending):
+        first = pending[symbols[0]]
+        index = first.index
+        raw_columns = list(first.columns)
+        n_dates, n_symbols, n_raw = len(index), len(symbols), len(raw_columns)
+
+        # (dates, symbols * raw columns) so fills run once for the whole group
+        raw = np.stack([pending[s].to_numpy(dtype=np.float64) for s in symbols], axis=1)
+        raw = ffill(raw.reshape(n_dates, n_symbols * n_raw)).reshape(n_dates, n_symbols, n_raw)
+
+        indicators = compute_panel_features(raw[:, :, raw_columns.index('Close')])
+        indicator_block = np.stack([indicators[name] for name in INDICATOR_COLUMNS], axis=2)
+
+        calendar = np.column_stack([index.day, index.month, index.year, index.dayofweek]).astype(np.float64)
+        calendar_block = np.broadcast_to(calendar[:, None, :], (n_dates, n_symbols, len(CALENDAR_COLUMNS)))
+
+        block = np.concatenate([raw, calendar_block, indicator_block], axis=2)
+        width = block.shape[2]
+        block = bfill(block.reshape(n_dates, n_symbols * width))
+        block = np.nan_to_num(block, nan=0.0, posinf=np.inf, neginf=-np.inf).reshape(n_dates, n_symbols, width)
+
+        columns = raw_columns + CALENDAR_COLUMNS + INDICATOR_COLUMNS
+        for i, symbol in enumerate(symbols):
+            results[symbol] = pd.DataFrame(block[:, i, :], index=index, columns=columns)
+            if use_cache:
+                pipeline.put_cached(pipeline.cache_key(symbol, pending[symbol], PREDICTOR_FRAME_SET),
+                                    results[symbol])
+
+    return results
@@ -0,0 +1,185 @@
+import os
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_absolute_error
+
+from models.panel_features import CALENDAR_COLUMNS, INDICATOR_COLUMNS
+from models.model_registry import MODEL_REGISTRY_DIR, MODEL_MAX_AGE_HOURS, MODEL_MAX_NEW_BARS
+
+logger = logging.getLogger(__name__)
+
+POOLED_MODEL_TYPE = "pooled_forest"
+
+# Price-denominated features, expressed relative to the 20-day average so that
+# rows from stocks with very different price levels are comparable
+PRICE_SCALED_COLUMNS = [
+    'MA5', 'MA10', 'MA20', 'MA50', 'Volatility',
+    'MACD', 'MACD_Signal', 'BB_Middle', 'BB_Upper', 'BB_Lower'
+]
+NORMALIZER_COLUMN = 'MA20'
+HOLDOUT_DAYS = 30
+# Fraction of the stacked panel each tree's bootstrap sample draws (None: all rows)
+POOLED_MAX_SAMPLES = float(os.getenv("POOLED_MAX_SAMPLES", 0.25)) or None
+
+
+def normalize_features(features: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Scale-free model inputs for one symbol
+
+    Args:
+        features: StockPredictor feature frame (raw, calendar and indicator columns)
+
+    Returns:
+        Tuple of (feature matrix, Close / MA20 target, MA20 normalizer)
+    """
+    normalizer = features[NORMALIZER_COLUMN].to_numpy(dtype=np.float64)
+    normalizer = np.where(normalizer > 0, normalizer, features['Close'].to_numpy(dtype=np.float64))
+
+    columns = []
+    for name in CALENDAR_COLUMNS + INDICATOR_COLUMNS:
+        values = features[name].to_numpy(dtype=np.float64)
+        columns.append(values / normalizer if name in PRICE_SCALED_COLUMNS else values)
+
+    target = features['Close'].to_numpy(dtype=np.float64) / normalizer
+    return np.column_stack(columns), target, normalizer
+
+
+class PooledModel:
+    """
+    One random forest trained on the stacked rows of every symbol.
+
+    Features are normalized by each row's 20-day average and a one-hot symbol
+    encoding is appended, so a single fit replaces one forest per symbol and
+    the latest rows of all symbols are scored with one predict call.
+    """
+
+    def __init__(self, n_estimators: int = 100, max_samples: Optional[float] = POOLED_MAX_SAMPLES,
+                 n_jobs: Optional[int] = None):
+        self.n_estimators = n_estimators
+        self.max_samples = max_samples
+        self.n_jobs = n_jobs
+        self.symbols: List[str] = []
+        self.model: Optional[RandomForestRegressor] = None
+        self.metrics: Dict[str, float] = {}
+        self.symbol_accuracy: Dict[str, float] = {}
+        self.data_end: Optional[pd.Timestamp] = None
+        self.trained_at: Optional[datetime] = None
+
+    def _encode(self, symbol: str, rows: int) -> np.ndarray:
+        encoding = np.zeros((rows, len(self.symbols)))
+        encoding[:, self.symbols.index(symbol)] = 1.0
+        return encoding
+
+    def fit(self, feature_frames: Dict[str, pd.DataFrame]) -> Dict[str, float]:
+        """
+        Train on all symbols, holding out each symbol's last 30 rows for evaluation
+
+        Args:
+            feature_frames: Dictionary mapping symbols to StockPredictor feature frames
+
+        Returns:
+            Holdout metrics (mae in price units, accuracy and per-symbol accuracy mean)
+        """
+        self.symbols = sorted(symbol for symbol, df in feature_frames.items() if len(df) > HOLDOUT_DAYS)
+        if not self.symbols:
+            raise ValueError("Not enough data to train the pooled model")
+
+        X_train, y_train, X_test, y_test, test_normalizers = [], [], [], [], []
+        for symbol in self.symbols:
+            X, y, normalizer = normalize_features(feature_frames[symbol])
+            X = np.hstack([X, self._encode(symbol, len(X))])
+            X_train.append(X[:-HOLDOUT_DAYS])
+            y_train.append(y[:-HOLDOUT_DAYS])
+            X_test.append(X[-HOLDOUT_DAYS:])
+            y_test.append(y[-HOLDOUT_DAYS:] * normalizer[-HOLDOUT_DAYS:])
+            test_normalizers.append(normalizer[-HOLDOUT_DAYS:])
+
+        self.model = RandomForestRegressor(n_estimators=self.n_estimators, max_samples=self.max_samples,
+                                           random_state=42, n_jobs=self.n_jobs)
+        self.model.fit(np.vstack(X_train), np.concatenate(y_train))
+
+        y_true = np.concatenate(y_test)
+        y_pred = self.model.predict(np.vstack(X_test)) * np.concatenate(test_normalizers)
+
+        # Same accuracy definition as the per-symbol model, per symbol then averaged
+        accuracies = {}
+        for i, symbol in enumerate(self.symbols):
+            window = slice(i * HOLDOUT_DAYS, (i + 1) * HOLDOUT_DAYS)
+            mae = mean_absolute_error(y_true[window], y_pred[window])
+            accuracies[symbol] = 1 - mae / feature_frames[symbol]['Close'].mean()
+
+        self.metrics = {
+            'mae': float(mean_absolute_error(y_true, y_pred)),
+            'accuracy': float(np.mean(list(accuracies.values()))),
+        }
+        self.symbol_accuracy = accuracies
+        self.data_end = max(feature_frames[symbol].index[-1] for symbol in self.symbols)
+        self.trained_at = datetime.now()
+        return self.metrics
+
+    def predict_latest(self, feature_frames: Dict[str, pd.DataFrame]) -> Dict[str, float]:
+        """
+        Predict the latest close of every known symbol with one batched call
+
+        Args:
+            feature_frames: Dictionary mapping symbols to feature frames
+
+        Returns:
+            Dictionary mapping symbols to predicted prices (unknown symbols are skipped)
+        """
+        symbols = [symbol for symbol in feature_frames if symbol in self.symbols]
+        if not symbols:
+            return {}
+
+        rows, normalizers = [], []
+        for symbol in symbols:
+            X, _, normalizer = normalize_features(feature_frames[symbol].iloc[-1:])
+            rows.append(np.hstack([X, self._encode(symbol, 1)]))
+            normalizers.append(normalizer[0])
+
+        predictions = self.model.predict(np.vstack(rows)) * np.array(normalizers)
+        return dict(zip(symbols, predictions.tolist()))
+
+    def stale_reason(self, feature_frames: Dict[str, pd.DataFrame]) -> Optional[str]:
+        """Retraining policy, shared with the per-symbol model registry settings"""
+        if self.model is None:
+            return "not trained"
+        missing = [symbol for symbol in feature_frames if symbol not in self.symbols]
+        if missing:
+            return f"{len(missing)} symbols not in the pooled model"
+        age_hours = (datetime.now() - self.trained_at).total_seconds() / 3600
+        if age_hours > MODEL_MAX_AGE_HOURS:
+            return f"model is {age_hours:.1f}h old"
+        latest = max(df.index[-1] for df in feature_frames.values())
+        new_bars = max(int((df.index > self.data_end).sum()) for df in feature_frames.values())
+        if latest > self.data_end and new_bars > MODEL_MAX_NEW_BARS:
+            return f"{new_bars} new bars since training"
+        return None
+
+    @staticmethod
+    def path(root: str = MODEL_REGISTRY_DIR) -> str:
+        return os.path.join(root, f"{POOLED_MODEL_TYPE}.joblib")
+
+    def save(self, root: str = MODEL_REGISTRY_DIR) -> None:
+        os.makedirs(root, exist_ok=True)
+        path = self.path(root)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        joblib.dump(self, tmp_path)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, root: str = MODEL_REGISTRY_DIR) -> Optional['PooledModel']:
+        path = cls.path(root)
+        if not os.path.exists(path):
+            return None
+        try:
+            return joblib.load(path)
+        except Exception as e:
+            logger.error(f"Could not load pooled model {path}: {e}")
+            return None
@@ -4,20 +4,58 @@ from sklearn.ensemble import RandomForestRegressor
 from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_absolute_error
-from typing import Dict, Any, Tuple, Optional
+from typing import Dict, Any, Tuple, Optional, List
+import os
 import logging
-import yfinance as yf
+
+from models.data_providers import MarketDataProvider, get_provider
+from models.panel_features import CALENDAR_COLUMNS, INDICATOR_COLUMNS, prepare_feature_frames
+from models.streaming_indicators import get_indicator_engine
+from models.model_registry import ModelRecord, ModelRegistry, get_model_registry
+from models.compact_forest import CompactForest
+from models.pooled_model import POOLED_MODEL_TYPE, PooledModel
+from models.linear_models import LINEAR_MODEL_TYPE, fit_linear_models
+from models.multi_horizon import (
+    MULTI_HORIZON_MODEL_TYPE,
+    FORECAST_HORIZONS,
+    curve_accuracy,
+    fit_multi_horizon,
+    interpolate_horizon,
+)
 
 logger = logging.getLogger(__name__)
 
+# Desteklenen model tipleri
+MODEL_TYPES = ["random_forest", LINEAR_MODEL_TYPE, POOLED_MODEL_TYPE, MULTI_HORIZON_MODEL_TYPE]
+# Tüm hisseler için tek seferde eğitilebilen model tipleri (predict_stocks)
+BATCH_MODEL_TYPES = [LINEAR_MODEL_TYPE, POOLED_MODEL_TYPE]
+
+# Fiyat sütunları; geri kalan sütunlar model özellikleridir
+RAW_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']
+
 class StockPredictor:
     """Hisse senedi fiyat tahmini için kullanılan sınıf"""
     
-    def __init__(self):
+    def __init__(self, provider: Optional[MarketDataProvider] = None, registry: Optional[ModelRegistry] = None,
+                 n_jobs: Optional[int] = None, universe: Optional[List[str]] = None):
         self.models = {}
         self.scalers = {}
+        # Havuzlanmış (tüm hisseler için tek) model ve eğitildiği hisse evreni
+        self.universe = list(universe or [])
+        self.pooled_model: Optional[PooledModel] = None
+        self._pooled_model_mtime: Optional[float] = None
+        # Model eğitiminde kullanılacak çekirdek sayısı (None: scikit-learn varsayılanı)
+        self.n_jobs = n_jobs
+        # Verilmezse MARKET_DATA_PROVIDER ile seçilen sağlayıcı kullanılır
+        self.provider = provider
+        # Eğitilmiş modeller diskte saklanır ve taze oldukları sürece yeniden kullanılır
+        self.registry = registry or get_model_registry()
+        # Özellik sayısı ve ağaç sayısı -> (orman dizinleri, üst üste yığılmış orman)
+        self._stacked_forests: Dict[Tuple[int, int], Tuple[Tuple[str, ...], CompactForest]] = {}
         
-    def predict_stock(self, symbol: str, time_horizon: int = 7, model_type: str = "random_forest") -> Dict[str, Any]:
+    def predict_stock(self, symbol: str, time_horizon: int = 7, model_type: str = "random_forest",
+                      data: Optional[pd.DataFrame] = None,
+                      features: Optional[pd.DataFrame] = None) -> Dict[str, Any]:
         """
         Verilen sembol için hisse senedi fiyat tahmini yapar.
         
@@ -25,55 +63,378 @@ class StockPredictor:
             symbol: Hisse senedi sembolü
             time_horizon: Tahmin yapılacak gün sayısı
             model_type: Kullanılacak model tipi
+            data: Önceden çekilmiş fiyat verisi (verilmezse sembol için ayrıca çekilir)
+            features: Önceden hazırlanmış özellikler (toplu taramada panel motorundan gelir)
             
         Returns:
             Tahmin sonuçlarını içeren sözlük
         """
+        if model_type == POOLED_MODEL_TYPE:
+            frames = {self._ticker(symbol): features} if features is not None else None
+            return self.predict_stocks([symbol], time_horizon, model_type, frames)[symbol]
+        
+        # Model tipi kontrolü
+        if model_type not in MODEL_TYPES:
+            model_type = "random_forest"  # Varsayılan model
+        
         try:
-            # Veriyi çek
-            df = self._get_stock_data(symbol)
+            if features is not None:
+                df = features
+            else:
+                # Veriyi çek (toplu indirmeden gelmediyse)
+                df = data if data is not None else self._get_stock_data(symbol)
+                
+                if df.empty:
+                    return {"error": "Veri bulunamadı"}
+                
+                # Taze kayıtlı model varsa yalnızca son satır akış motorundan hesaplanır
+                result = self._predict_latest(df, symbol, time_horizon, model_type)
+                if result is not None:
+                    return result
+                    
+                # Özellikleri hazırla
+                df = self._prepare_features(df, symbol)
             
             if df.empty:
                 return {"error": "Veri bulunamadı"}
-                
-            # Özellikleri hazırla
-            df = self._prepare_features(df)
             
-            # Model tipi kontrolü
-            if model_type not in ["random_forest", "linear_regression"]:
-                model_type = "random_forest"  # Varsayılan model
+            if model_type == MULTI_HORIZON_MODEL_TYPE:
+                return self._predict_horizons(df, symbol, time_horizon)
                 
             # Model eğitimi ve tahmin
             prediction, confidence, last_price, historical_data = self._train_and_predict(
                 df, symbol, model_type
             )
             
-            # Değişim yüzdesini hesapla
-            change_percent = ((prediction - last_price) / last_price) * 100
+            return self._build_result(
+                symbol, prediction, last_price, confidence, historical_data, model_type, time_horizon
+            )
             
-            # Tavsiye belirle
-            recommendation = self._get_recommendation(change_percent)
+        except Exception as e:
+            logger.error(f"Prediction error for {symbol}: {e}")
+            return {"error": str(e), "symbol": symbol}
+    
+    def predict_stocks(self, symbols: List[str], time_horizon: int = 7, model_type: str = "random_forest",
+                       feature_frames: Optional[Dict[str, pd.DataFrame]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Birden çok hisse için tahmin yapar. Havuzlanmış modelde tüm hisseler
+        tek bir modelle ve tek bir toplu predict çağrısıyla tahmin edilir.
+        
+        Args:
+            symbols: Hisse senedi sembolleri
+            time_horizon: Tahmin yapılacak gün sayısı
+            model_type: Kullanılacak model tipi
+            feature_frames: Önceden hazırlanmış özellikler (sembol -> DataFrame)
             
+        Returns:
+            Sembol -> tahmin sonucu sözlüğü
+        """
+        feature_frames = feature_frames or {}
+        if model_type == LINEAR_MODEL_TYPE:
+            return self._predict_linear(symbols, time_horizon, feature_frames)
+        if model_type != POOLED_MODEL_TYPE:
             return {
-                "symbol": symbol,
-                "company_name": symbol,  # Daha sonra şirket adı eklenebilir
-                "prediction": float(prediction),
-                "last_price": float(last_price),
-                "change": float(change_percent),
-                "confidence": float(confidence),
-                "recommendation": recommendation,
-                "historical_data": historical_data,
-                "model_type": model_type,
-                "time_horizon": time_horizon
+                symbol: self.predict_stock(
+                    symbol, time_horizon, model_type, features=feature_frames.get(self._ticker(symbol))
+                )
+                for symbol in symbols
             }
-            
+        
+        try:
+            frames = self._universe_features(symbols, feature_frames)
+            model = self._get_pooled_model(frames)
+            predictions = model.predict_latest(
+                {self._ticker(symbol): frames[self._ticker(symbol)] for symbol in symbols if self._ticker(symbol) in frames}
+            )
         except Exception as e:
-            logger.error(f"Prediction error for {symbol}: {e}")
-            return {"error": str(e), "symbol": symbol}
+            logger.error(f"Pooled prediction error: {e}")
+            return {symbol: {"error": str(e), "symbol": symbol} for symbol in symbols}
+        
+        results = {}
+        for symbol in symbols:
+            ticker = self._ticker(symbol)
+            if ticker not in predictions:
+                results[symbol] = {"error": "Veri bulunamadı", "symbol": symbol}
+                continue
+            df = frames[ticker]
+            results[symbol] = self._build_result(
+                symbol,
+                predictions[ticker],
+                df['Close'].iloc[-1],
+                model.symbol_accuracy.get(ticker, model.metrics['accuracy']),
+                df['Close'].tail(90).to_dict(),
+                model_type,
+                time_horizon
+            )
+        return results
+    
+    def predict_latest(self, frames: Dict[str, pd.DataFrame], time_horizon: int = 7,
+                       model_type: str = "random_forest") -> Dict[str, Dict[str, Any]]:
+        """
+        Taze kayıtlı modeli olan hisseleri yalnızca son satırla tahmin eder (akış motoru)
+        
+        Args:
+            frames: Sembol -> işlenmemiş fiyat verisi
+            time_horizon: Tahmin yapılacak gün sayısı
+            model_type: Kullanılacak model tipi
+            
+        Returns:
+            Sembol -> tahmin sonucu; modeli eğitilmesi gereken hisseler sonuçta yer almaz
+        """
+        results = {}
+        # Sıkıştırılmış ormanı olan hisseler sonda tek çağrıda tahmin edilir
+        stacked = {}
+        for symbol, df in frames.items():
+            if df.empty:
+                continue
+            try:
+                inputs = self._latest_inputs(df, symbol, model_type)
+                if inputs is None:
+                    continue
+                if model_type != MULTI_HORIZON_MODEL_TYPE and isinstance(inputs[0].model, CompactForest):
+                    stacked[symbol] = inputs
+                else:
+                    results[symbol] = self._latest_result(inputs, symbol, time_horizon, model_type)
+            except Exception as e:
+                logger.error(f"Latest-row prediction error for {symbol}: {e}")
+        if stacked:
+            try:
+                results.update(self._predict_stacked(stacked, time_horizon, model_type))
+            except Exception as e:
+                logger.error(f"Stacked forest prediction error: {e}")
+        return results
+    
+    def _predict_stacked(self, inputs: Dict[str, Tuple[ModelRecord, pd.DataFrame, pd.DataFrame]],
+                         time_horizon: int, model_type: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Sıkıştırılmış ormanların son satırlarını üst üste yığılmış ormanla tek çağrıda tahmin eder.
+        Yığın, ormanlar değişmedikçe taramalar arasında yeniden kullanılır.
+        """
+        groups: Dict[Tuple[int, int], List[str]] = {}
+        for symbol, (record, _, _) in inputs.items():
+            groups.setdefault((len(record.feature_columns), record.model.roots.shape[1]), []).append(symbol)
+        
+        results = {}
+        for group, symbols in groups.items():
+            records = [inputs[symbol][0] for symbol in symbols]
+            key = tuple(record.metadata['compact_forest'] for record in records)
+            cached = self._stacked_forests.get(group)
+            if cached is None or cached[0] != key:
+                cached = self._stacked_forests[group] = (key, CompactForest.stack([r.model for r in records]))
+            
+            X = np.vstack([record.scaler.transform(inputs[symbol][1][record.feature_columns])
+                           for symbol, record in zip(symbols, records)])
+            predictions = cached[1].predict(X, forest_ids=np.arange(len(symbols)))
+            for symbol, prediction in zip(symbols, predictions):
+                record, latest, prices = inputs[symbol]
+                prediction, confidence, last_price, historical_data = self._score_latest(
+                    record, latest, prices, symbol, prediction
+                )
+                results[symbol] = self._build_result(
+                    symbol, prediction, last_price, confidence, historical_data, model_type, time_horizon
+                )
+        return results
+    
+    def _predict_linear(self, symbols: List[str], time_horizon: int,
+                        feature_frames: Dict[str, pd.DataFrame]) -> Dict[str, Dict[str, Any]]:
+        """
+        Doğrusal modelde eskimiş tüm hisseleri tek bir toplu en küçük kareler
+        çözümüyle yeniden eğitir, ardından her hisseyi kayıtlı modeliyle tahmin eder
+        """
+        frames = {}
+        missing = [symbol for symbol in symbols if self._ticker(symbol) not in feature_frames]
+        if missing:
+            provider = self.provider or get_provider()
+            feature_frames = {
+                **feature_frames,
+                **prepare_feature_frames(provider.get_history([self._ticker(s) for s in missing], "2y"))
+            }
+        for symbol in symbols:
+            df = feature_frames.get(self._ticker(symbol))
+            if df is not None and not df.empty:
+                frames[symbol] = df
+        
+        stale = {}
+        for symbol, df in frames.items():
+            feature_columns = self._feature_columns(df)
+            record = self.registry.load(symbol, LINEAR_MODEL_TYPE)
+            reason = "no stored model" if record is None else self.registry.stale_reason(record, df, feature_columns)
+            if reason is not None:
+                stale[symbol] = df
+        if stale:
+            logger.info(f"Training {LINEAR_MODEL_TYPE} models for {len(stale)} symbols in one batch")
+            self._train_linear_models(stale)
+        
+        return {
+            symbol: self.predict_stock(symbol, time_horizon, LINEAR_MODEL_TYPE, features=frames.get(symbol))
+            if symbol in frames else {"error": "Veri bulunamadı", "symbol": symbol}
+            for symbol in symbols
+        }
+    
+    def _train_linear_models(self, frames: Dict[str, pd.DataFrame]) -> Dict[str, ModelRecord]:
+        """Aynı özellik şemasına sahip hisselerin doğrusal modellerini birlikte eğitir ve kaydeder"""
+        groups: Dict[Tuple[str, ...], Dict[str, pd.DataFrame]] = {}
+        for symbol, df in frames.items():
+            groups.setdefault(tuple(self._feature_columns(df)), {})[symbol] = df
+        
+        records = {}
+        for feature_columns, group in groups.items():
+            fitted = fit_linear_models(group, list(feature_columns))
+            for symbol, (model, scaler, metrics, train_end) in fitted.items():
+                records[symbol] = self.registry.save(
+                    symbol, LINEAR_MODEL_TYPE, model, scaler, group[symbol],
+                    list(feature_columns), train_end, metrics
+                )
+        return records
+    
+    @staticmethod
+    def _feature_columns(df: pd.DataFrame) -> List[str]:
+        return [column for column in df.columns if column not in RAW_COLUMNS]
+    
+    def _predict_horizons(self, df: pd.DataFrame, symbol: str, time_horizon: int) -> Dict[str, Any]:
+        """
+        Tek bir çok çıktılı modelle tüm ufukların (FORECAST_HORIZONS) tahmin eğrisini
+        hesaplar; istenen ufuk bu eğriden türetilir
+        """
+        feature_columns = self._feature_columns(df)
+        features = df[feature_columns]
+        
+        record, reason = self._stored_model(symbol, MULTI_HORIZON_MODEL_TYPE, df, feature_columns)
+        if reason is not None:
+            logger.info(f"Training {MULTI_HORIZON_MODEL_TYPE} model for {symbol}: {reason}")
+            model, scaler, metrics, train_end = fit_multi_horizon(features, df['Close'], n_jobs=self.n_jobs)
+            record = self.registry.save(
+                symbol, MULTI_HORIZON_MODEL_TYPE, model, scaler, df, feature_columns, train_end, metrics,
+                extra={'horizons': sorted(FORECAST_HORIZONS)}
+            )
+        
+        return self._horizon_result(record, features.iloc[-1:], df, symbol, time_horizon)
+    
+    def _horizon_result(self, record: ModelRecord, latest: pd.DataFrame, df: pd.DataFrame,
+                        symbol: str, time_horizon: int) -> Dict[str, Any]:
+        """Çok ufuklu modelin son satır tahmininden sonuç eğrisini oluşturur"""
+        horizons = record.metadata['horizons']
+        predictions = record.model.predict(record.scaler.transform(latest[record.feature_columns]))[0]
+        metrics = record.metadata['metrics']
+        
+        result = self._build_result(
+            symbol, 0.0, df['Close'].iloc[-1], 0.0, df['Close'].tail(90).to_dict(),
+            MULTI_HORIZON_MODEL_TYPE, time_horizon
+        )
+        result["horizon_curve"] = {h: float(price) for h, price in zip(horizons, predictions)}
+        result["horizon_confidence"] = {h: float(curve_accuracy(metrics, h)) for h in horizons}
+        return self.result_for_horizon(result, time_horizon)
+    
+    @classmethod
+    def result_for_horizon(cls, result: Dict[str, Any], time_horizon: int) -> Dict[str, Any]:
+        """
+        Tahmin eğrisi içeren bir sonucu istenen ufka uyarlar (önbellekten her ufuk sunulabilir)
+        
+        Args:
+            result: predict_stock sonucu
+            time_horizon: İstenen gün sayısı
+            
+        Returns:
+            Eğri varsa istenen ufka göre güncellenmiş sonuç, yoksa sonucun kendisi
+        """
+        curve = result.get("horizon_curve")
+        if not curve:
+            return result
+        
+        confidence = result["horizon_confidence"]
+        nearest = min(confidence, key=lambda h: abs(int(h) - time_horizon))
+        updated = cls._build_result(
+            result["symbol"],
+            interpolate_horizon(curve, result["last_price"], time_horizon),
+            result["last_price"],
+            confidence[nearest],
+            result["historical_data"],
+            result["model_type"],
+            time_horizon
+        )
+        return {**result, **updated}
+    
+    @classmethod
+    def _build_result(cls, symbol: str, prediction: float, last_price: float, confidence: float,
+                      historical_data: Dict, model_type: str, time_horizon: int) -> Dict[str, Any]:
+        """Tahmin sonucunu API yanıt biçiminde hazırlar"""
+        # Değişim yüzdesini hesapla
+        change_percent = ((prediction - last_price) / last_price) * 100
+        
+        # Tavsiye belirle
+        recommendation = cls._get_recommendation(change_percent)
+        
+        return {
+            "symbol": symbol,
+            "company_name": symbol,  # Daha sonra şirket adı eklenebilir
+            "prediction": float(prediction),
+            "last_price": float(last_price),
+            "change": float(change_percent),
+            "confidence": float(confidence),
+            "recommendation": recommendation,
+            "historical_data": historical_data,
+            "model_type": model_type,
+            "time_horizon": time_horizon
+        }
+    
+    def _universe_features(self, symbols: List[str],
+                           feature_frames: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """Havuzlanmış model için evrendeki ve istenen tüm hisselerin özelliklerini toplar"""
+        tickers = list(dict.fromkeys([self._ticker(symbol) for symbol in self.universe + list(symbols)]))
+        frames = {ticker: feature_frames[ticker] for ticker in tickers if ticker in feature_frames}
+        
+        missing = [ticker for ticker in tickers if ticker not in frames]
+        if missing:
+            provider = self.provider or get_provider()
+            frames.update(prepare_feature_frames(provider.get_history(missing, "2y")))
+        return frames
+    
+    def _load_pooled_model(self) -> Optional[PooledModel]:
+        """Başka bir süreç (ör. eğitim havuzu) daha yeni bir model kaydetmişse onu yükler"""
+        path = PooledModel.path(self.registry.root)
+        mtime = os.path.getmtime(path) if os.path.exists(path) else None
+        if mtime is not None and mtime != self._pooled_model_mtime:
+            self.pooled_model = PooledModel.load(self.registry.root)
+            self._pooled_model_mtime = mtime
+        return self.pooled_model
+    
+    def pooled_stale_reason(self, symbols: List[str]) -> Optional[str]:
+        """
+        Havuzlanmış modelin evren ve istenen hisseler için yeniden eğitilme nedeni
+        
+        Args:
+            symbols: Tahmin istenen hisseler
+            
+        Returns:
+            Neden, model taze ise None
+        """
+        frames = self._universe_features(symbols, {})
+        model = self._load_pooled_model()
+        return "not trained" if model is None else model.stale_reason(frames)
+    
+    def train_pooled_model(self, symbols: List[str]) -> Dict[str, float]:
+        """Havuzlanmış modeli gerekiyorsa evren ve verilen hisseler üzerinde eğitir (eğitim havuzu görevi)"""
+        return self._get_pooled_model(self._universe_features(symbols, {})).metrics
+    
+    def _get_pooled_model(self, frames: Dict[str, pd.DataFrame]) -> PooledModel:
+        """Taze havuzlanmış modeli döndürür; gerekirse diskten yükler veya yeniden eğitir"""
+        path = PooledModel.path(self.registry.root)
+        self._load_pooled_model()
+        
+        reason = "not trained" if self.pooled_model is None else self.pooled_model.stale_reason(frames)
+        if reason is not None:
+            logger.info(f"Training pooled model on {len(frames)} symbols: {reason}")
+            model = PooledModel(n_jobs=self.n_jobs)
+            model.fit(frames)
+            model.save(self.registry.root)
+            self.pooled_model = model
+            self._pooled_model_mtime = os.path.getmtime(path)
+        return self.pooled_model
     
     def _get_stock_data(self, symbol: str) -> pd.DataFrame:
         """
-        Yahoo Finance'ten hisse senedi verisini çeker
+        Hisse senedi verisini piyasa verisi sağlayıcısından çeker
+        (canlı, yerel fiyat deposu veya çevrimdışı tekrar oynatma).
         
         Args:
             symbol: Hisse senedi sembolü
@@ -81,15 +442,12 @@ class StockPredictor:
         Returns:
             Hisse senedi verisini içeren DataFrame
         """
-        # BIST hisseleri için .IS eklenmeli
-        if not symbol.endswith('.IS'):
-            ticker = f"{symbol}.IS"
-        else:
-            ticker = symbol
+        ticker = self._ticker(symbol)
             
         try:
-            # Son 2 yıllık veriyi çek
-            df = yf.download(ticker, period="2y")
+            # Son 2 yıllık veri
+            provider = self.provider or get_provider()
+            df = provider.get_price_history(ticker, period="2y")
             
             if df.empty:
                 logger.warning(f"No data found for {ticker}")
@@ -100,67 +458,106 @@ class StockPredictor:
             logger.error(f"Error fetching data for {ticker}: {e}")
             return pd.DataFrame()
     
-    def _prepare_features(self, df: pd.DataFrame) -> pd.DataFrame:
+    @staticmethod
+    def _ticker(symbol: str) -> str:
+        """BIST hisseleri için .IS eklenmeli"""
+        return symbol if symbol.endswith('.IS') else f"{symbol}.IS"
+    
+    def _prepare_features(self, df: pd.DataFrame, symbol: Optional[str] = None) -> pd.DataFrame:
         """
-        Tahmin için özellikleri hazırlar
+        Tahmin için özellikleri hazırlar (tarih özellikleri ve özellik kayıt defterindeki
+        'predictor' seti: hareketli ortalamalar, volatilite, RSI, MACD ve Bollinger bantları)
         
         Args:
             df: İşlenmemiş hisse senedi verisi
+            symbol: Verilirse sonuç (sembol, son bar) anahtarıyla önbelleğe alınır
             
         Returns:
             Özellikler eklenmiş DataFrame
         """
-        # DataFrame'in kopyasını al
-        df_copy = df.copy()
-        
-        # NaN değerlerini doldur
-        df_copy = df_copy.fillna(method='ffill')
-        
-        # Tarih özelliklerini ekle
-        df_copy['Day'] = df_copy.index.day
-        df_copy['Month'] = df_copy.index.month
-        df_copy['Year'] = df_copy.index.year
-        df_copy['DayOfWeek'] = df_copy.index.dayofweek
-        
-        # Teknik göstergeleri hesapla
-        # Hareketli ortalamalar
-        df_copy['MA5'] = df_copy['Close'].rolling(window=5).mean()
-        df_copy['MA10'] = df_copy['Close'].rolling(window=10).mean()
-        df_copy['MA20'] = df_copy['Close'].rolling(window=20).mean()
-        df_copy['MA50'] = df_copy['Close'].rolling(window=50).mean()
-        
-        # Volatilite
-        df_copy['Volatility'] = df_copy['Close'].rolling(window=10).std()
-        
-        # RSI (Relative Strength Index)
-        delta = df_copy['Close'].diff()
-        gain = delta.where(delta > 0, 0)
-        loss = -delta.where(delta < 0, 0)
-        avg_gain = gain.rolling(window=14).mean()
-        avg_loss = loss.rolling(window=14).mean()
-        rs = avg_gain / avg_loss
-        df_copy['RSI'] = 100 - (100 / (1 + rs))
-        
-        # MACD (Moving Average Convergence Divergence)
-        ema12 = df_copy['Close'].ewm(span=12, adjust=False).mean()
-        ema26 = df_copy['Close'].ewm(span=26, adjust=False).mean()
-        df_copy['MACD'] = ema12 - ema26
-        df_copy['MACD_Signal'] = df_copy['MACD'].ewm(span=9, adjust=False).mean()
-        
-        # Bollinger Bantları
-        df_copy['BB_Middle'] = df_copy['Close'].rolling(window=20).mean()
-        df_copy['BB_Upper'] = df_copy['BB_Middle'] + 2 * df_copy['Close'].rolling(window=20).std()
-        df_copy['BB_Lower'] = df_copy['BB_Middle'] - 2 * df_copy['Close'].rolling(window=20).std()
-        
-        # NaN değerlerini doldur
-        df_copy = df_copy.fillna(method='bfill')
-        df_copy = df_copy.fillna(0)  # Kalan NaN değerlerini 0 yap
-        
-        return df_copy
+        # Toplu tarama ile aynı vektörel motor (tek sembollük panel)
+        key = symbol or "_"
+        return prepare_feature_frames({key: df}, use_cache=symbol is not None)[key]
+    
+    def _stored_model(self, symbol: str, model_type: str, df: pd.DataFrame,
+                      feature_columns: List[str]) -> Tuple[Optional[ModelRecord], Optional[str]]:
+        """
+        Kayıtlı modeli ve yeniden eğitim gerekiyorsa nedenini döndürür
+        
+        Args:
+            symbol: Hisse senedi sembolü
+            model_type: Model tipi
+            df: Güncel veri (Close sütunu ve tarih indeksi yeterlidir)
+            feature_columns: Güncel özellik sütunları
+            
+        Returns:
+            (kayıt, neden); neden None ise kayıt yeniden kullanılabilir
+        """
+        record = self.registry.load(symbol, model_type)
+        reason = "no stored model" if record is None else self.registry.stale_reason(record, df, feature_columns)
+        if reason is None and model_type == MULTI_HORIZON_MODEL_TYPE \
+                and record.metadata.get('horizons') != sorted(FORECAST_HORIZONS):
+            reason = "forecast horizons changed"
+        return record, reason
+    
+    def _latest_inputs(self, df: pd.DataFrame, symbol: str,
+                       model_type: str) -> Optional[Tuple[ModelRecord, pd.DataFrame, pd.DataFrame]]:
+        """
+        Taze kayıtlı model, son satırın özellikleri ve doldurulmuş fiyatlar.
+        Son satırın göstergeleri akış motorunda (streaming_indicators) yalnızca yeni
+        barlar eklenerek güncellenir.
+        
+        Args:
+            df: İşlenmemiş fiyat verisi
+            symbol: Hisse senedi sembolü
+            model_type: Model tipi
+            
+        Returns:
+            (kayıt, son satır, fiyatlar), model eğitilmesi gerekiyorsa None
+        """
+        # Toplu çerçevedeki fiyat sütunları gibi: ileri, ardından geri doldurulur, kalan boşluklar 0
+        prices = df.ffill().bfill().fillna(0.0)
+        feature_columns = self._feature_columns(df) + CALENDAR_COLUMNS + INDICATOR_COLUMNS
+        record, reason = self._stored_model(symbol, model_type, prices, feature_columns)
+        if reason is not None:
+            return None
+        
+        latest = get_indicator_engine().latest_features(self._ticker(symbol), df)
+        return record, latest, prices
+    
+    def _latest_result(self, inputs: Tuple[ModelRecord, pd.DataFrame, pd.DataFrame], symbol: str,
+                       time_horizon: int, model_type: str) -> Dict[str, Any]:
+        """_latest_inputs çıktısından tahmin sonucu"""
+        record, latest, prices = inputs
+        if model_type == MULTI_HORIZON_MODEL_TYPE:
+            return self._horizon_result(record, latest, prices, symbol, time_horizon)
+        prediction, confidence, last_price, historical_data = self._score_latest(record, latest, prices, symbol)
+        return self._build_result(
+            symbol, prediction, last_price, confidence, historical_data, model_type, time_horizon
+        )
+    
+    def _predict_latest(self, df: pd.DataFrame, symbol: str, time_horizon: int,
+                        model_type: str) -> Optional[Dict[str, Any]]:
+        """
+        Taze kayıtlı modeli olan hissede tüm özellik çerçevesini hesaplamadan tahmin yapar.
+        
+        Args:
+            df: İşlenmemiş fiyat verisi
+            symbol: Hisse senedi sembolü
+            time_horizon: Tahmin yapılacak gün sayısı
+            model_type: Model tipi
+            
+        Returns:
+            Tahmin sonucu, model eğitilmesi gerekiyorsa None
+        """
+        inputs = self._latest_inputs(df, symbol, model_type)
+        if inputs is None:
+            return None
+        return self._latest_result(inputs, symbol, time_horizon, model_type)
     
     def _train_and_predict(self, df: pd.DataFrame, symbol: str, model_type: str) -> Tuple[float, float, float, Dict[str, float]]:
         """
-        Model eğitimi ve tahmin yapma
+        Kayıtlı modeli yeniden kullanarak (gerekirse yeniden eğiterek) tahmin yapma
         
         Args:
             df: Hazırlanmış veri
@@ -170,8 +567,58 @@ class StockPredictor:
         Returns:
             Tahmin, güven seviyesi, son fiyat ve geçmiş veri
         """
-        # Hedef değişken ve özellikler
-        features = df.drop(['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume'], axis=1)
+        # Özellikler
+        features = df[self._feature_columns(df)]
+        
+        # Kayıtlı model taze ise yeniden kullan, değilse eğit
+        record, reason = self._stored_model(symbol, model_type, df, list(features.columns))
+        if reason is not None:
+            logger.info(f"Training {model_type} model for {symbol}: {reason}")
+            record = self._train_model(df, features, symbol, model_type)
+        
+        return self._score_latest(record, features.iloc[-1:], df, symbol)
+    
+    def _score_latest(self, record: ModelRecord, latest: pd.DataFrame, df: pd.DataFrame, symbol: str,
+                      prediction: Optional[float] = None) -> Tuple[float, float, float, Dict[str, float]]:
+        """Kayıtlı modelle son satırı tahmin eder (tahmin verilmişse yalnızca sonucu tamamlar)"""
+        # Modeli ve ölçekleyiciyi sakla
+        self.models[symbol] = record.model
+        self.scalers[symbol] = record.scaler
+        
+        # Yalnızca son veri noktasını tahmin et
+        if prediction is None:
+            last_data_scaled = record.scaler.transform(latest[record.feature_columns])
+            prediction = record.model.predict(last_data_scaled)[0]
+        accuracy = record.metadata['metrics']['accuracy']
+        
+        # Son fiyat
+        last_price = df['Close'].iloc[-1]
+        
+        # Geçmiş veri - son 90 gün
+        historical_data = df['Close'].tail(90).to_dict()
+        
+        return prediction, accuracy, last_price, historical_data
+    
+    def _train_model(self, df: pd.DataFrame, features: pd.DataFrame, symbol: str, model_type: str) -> ModelRecord:
+        """
+        Model eğitimi, son 30 gün üzerinde değerlendirme ve kayıt defterine kaydetme
+        
+        Args:
+            df: Hazırlanmış veri
+            features: Model özellikleri
+            symbol: Hisse senedi sembolü
+            model_type: Kullanılacak model tipi
+            
+        Returns:
+            Kaydedilen model kaydı
+        """
+        if model_type == LINEAR_MODEL_TYPE:
+            # Kapalı form ridge çözümü (tek hisselik toplu çözüm)
+            record = self._train_linear_models({symbol: df}).get(symbol)
+            if record is None:
+                raise ValueError("Doğrusal model için yeterli veri yok")
+            return record
+        
         target = df['Close']
         
         # Eğitim ve test setlerini ayır - son 30 gün test için
@@ -186,37 +633,28 @@ class StockPredictor:
         X_test_scaled = scaler.transform(X_test)
         
         # Model eğitimi
-        if model_type == "random_forest":
-            model = RandomForestRegressor(n_estimators=100, random_state=42)
-        else:
-            # Varsayılan olarak Random Forest kullanılır
-            model = RandomForestRegressor(n_estimators=100, random_state=42)
-            
-        model.fit(X_train_scaled, y_train)
+        model = RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=self.n_jobs)
         
-        # Modeli ve ölçekleyiciyi sakla
-        self.models[symbol] = model
-        self.scalers[symbol] = scaler
+        model.fit(X_train_scaled, y_train)
         
         # Test verisinde performans değerlendirme
         y_pred = model.predict(X_test_scaled)
         mae = mean_absolute_error(y_test, y_pred)
         accuracy = 1 - (mae / df['Close'].mean())
         
-        # Son veri noktasını tahmin et
-        last_data = features.iloc[-1:].values
-        last_data_scaled = scaler.transform(last_data)
-        prediction = model.predict(last_data_scaled)[0]
-        
-        # Son fiyat
-        last_price = df['Close'].iloc[-1]
-        
-        # Geçmiş veri - son 90 gün
-        historical_data = df['Close'].tail(90).to_dict()
-        
-        return prediction, accuracy, last_price, historical_data
+        return self.registry.save(
+            symbol,
+            model_type,
+            model,
+            scaler,
+            df,
+            list(features.columns),
+            X_train.index[-1],
+            {"mae": mae, "accuracy": accuracy}
+        )
     
-    def _get_recommendation(self, change_percent: float) -> str:
+    @staticmethod
+    def _get_recommendation(change_percent: float) -> str:
         """
         Fiyat değişimi yüzdesine göre tavsiye belirler
         
@@ -0,0 +1,276 @@
+import os
+import time
+import logging
+import threading
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from models.stock_data import download_price_history
+
+logger = logging.getLogger(__name__)
+
+# Directory holding one Parquet file per symbol
+PRICE_STORE_DIR = os.getenv(
+    "PRICE_STORE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "prices")
+)
+# Seconds after which a stored symbol is checked again for new bars
+PRICE_STORE_MAX_AGE = int(os.getenv("PRICE_STORE_MAX_AGE", 60 * 60))
+# Relative close difference on an already stored bar that counts as a revision
+PRICE_REVISION_TOLERANCE = 1e-6
+
+_PERIOD_OFFSETS = {
+    '1d': pd.DateOffset(days=1),
+    '5d': pd.DateOffset(days=5),
+    '1mo': pd.DateOffset(months=1),
+    '3mo': pd.DateOffset(months=3),
+    '6mo': pd.DateOffset(months=6),
+    '1y': pd.DateOffset(years=1),
+    '2y': pd.DateOffset(years=2),
+    '5y': pd.DateOffset(years=5),
+    '10y': pd.DateOffset(years=10),
+}
+
+
+def period_start(period: str, end: Optional[pd.Timestamp] = None) -> Optional[pd.Timestamp]:
+    """
+    Convert a yfinance style period string into a start date
+
+    Args:
+        period: Time period ('1mo', '1y', '2y', 'ytd', 'max', ...)
+        end: Reference date (defaults to today)
+
+    Returns:
+        First date covered by the period, or None for 'max'
+    """
+    end = pd.Timestamp(end if end is not None else pd.Timestamp.now().normalize())
+    if period == 'max':
+        return None
+    if period == 'ytd':
+        return pd.Timestamp(year=end.year, month=1, day=1)
+    return end - _PERIOD_OFFSETS.get(period, _PERIOD_OFFSETS['2y'])
+
+
+class PriceStore:
+    """
+    On-disk daily OHLCV store with one Parquet file per symbol.
+
+    A refresh only requests the bars after the last stored date and appends them,
+    so after the first download a symbol costs one small request per refresh window
+    and every read is local, memory-mapped I/O.
+
+    Prices are split and dividend adjusted, so a new corporate action rewrites
+    the whole history. Each incremental request therefore starts one completed
+    bar early; when that bar's close differs from the stored one the symbol is
+    downloaded again in full.
+    """
+
+    def __init__(self, root: str = PRICE_STORE_DIR, max_age: int = PRICE_STORE_MAX_AGE,
+                 fetch: Callable[..., Dict[str, pd.DataFrame]] = download_price_history):
+        self.root = root
+        self.max_age = max_age
+        self.fetch = fetch
+        self._lock = threading.RLock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, symbol: str) -> str:
+        return os.path.join(self.root, f"{symbol}.parquet")
+
+    def read(self, symbol: str, period: Optional[str] = None) -> pd.DataFrame:
+        """
+        Read stored history for a symbol
+
+        Args:
+            symbol: Stock symbol
+            period: Optional period to slice from the end of the history
+
+        Returns:
+            DataFrame with stored bars or empty DataFrame if nothing is stored
+        """
+        path = self._path(symbol)
+        if not os.path.exists(path):
+            return pd.DataFrame()
+
+        df = pd.read_parquet(path, memory_map=True)
+        if period and not df.empty:
+            start = period_start(period, df.index[-1])
+            if start is not None:
+                df = df[df.index >= start]
+        return df
+
+    def date_range(self, symbol: str) -> Optional[tuple]:
+        """Return (first_date, last_date) of the stored history or None"""
+        index = self._index(symbol)
+        if index is None or len(index) == 0:
+            return None
+        return index[0], index[-1]
+
+    def _index(self, symbol: str) -> Optional[pd.DatetimeIndex]:
+        path = self._path(symbol)
+        if not os.path.exists(path):
+            return None
+        # Only the index column is loaded
+        return pd.read_parquet(path, columns=[]).index
+
+    def is_adjusted(self, symbol: str) -> bool:
+        """Whether the stored file holds adjusted prices (unadjusted downloads carry an 'Adj Close' column)"""
+        return 'Adj Close' not in pq.read_schema(self._path(symbol)).names
+
+    def is_revised(self, symbol: str, df: Optional[pd.DataFrame]) -> bool:
+        """
+        Whether fetched bars disagree with stored closes on completed dates
+
+        The last stored bar is skipped since it may have been written while the
+        session was still open.
+        """
+        if df is None or df.empty:
+            return False
+        existing = self.read(symbol)
+        if len(existing) < 2:
+            return False
+        stored = existing['Close'].iloc[:-1]
+        overlap = stored.index.intersection(df.index)
+        if overlap.empty:
+            return False
+        old = stored.loc[overlap].to_numpy(dtype=float)
+        new = df.loc[overlap, 'Close'].to_numpy(dtype=float)
+        return not np.allclose(new, old, rtol=PRICE_REVISION_TOLERANCE, atol=0.0, equal_nan=True)
+
+    def write(self, symbol: str, df: pd.DataFrame) -> None:
+        """Replace a symbol's stored history"""
+        with self._lock:
+            path = self._path(symbol)
+            df = df[~df.index.duplicated(keep='last')].sort_index()
+            # Atomic replace so readers never see a half-written file
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            df.to_parquet(tmp_path)
+            os.replace(tmp_path, path)
+
+    def is_fresh(self, symbol: str) -> bool:
+        """Whether the symbol was checked for new bars within max_age seconds"""
+        path = self._path(symbol)
+        return os.path.exists(path) and time.time() - os.path.getmtime(path) < self.max_age
+
+    def append(self, symbol: str, df: pd.DataFrame) -> int:
+        """
+        Append bars that are newer than the stored history
+
+        The last stored bar is replaced when the new data contains the same date,
+        since it may have been written while the session was still open.
+
+        Args:
+            symbol: Stock symbol
+            df: Newly fetched bars
+
+        Returns:
+            Number of bars added after the previously stored last date
+        """
+        with self._lock:
+            path = self._path(symbol)
+            existing = self.read(symbol)
+
+            if df is None or df.empty:
+                if os.path.exists(path):
+                    os.utime(path)
+                return 0
+
+            if existing.empty:
+                combined = df
+                added = len(df)
+            else:
+                last_date = existing.index[-1]
+                new = df[df.index >= last_date]
+                added = int((new.index > last_date).sum())
+                combined = pd.concat([existing[existing.index < last_date], new]) if not new.empty else existing
+
+            self.write(symbol, combined)
+            return added
+
+    def refresh(self, symbols: List[str], period: str = '2y', force: bool = False) -> Dict[str, int]:
+        """
+        Bring stored history up to date for the given symbols
+
+        Symbols without stored data (or whose history is shorter than `period`
+        or unadjusted) are downloaded in full; the rest only fetch bars from
+        the completed bar before their last stored date onwards, batched by
+        start date into multi-ticker requests. Symbols whose history was
+        revised (split, dividend) are then downloaded in full again.
+
+        Args:
+            symbols: Stock symbols
+            period: History that must be covered by the store
+            force: Ignore max_age and check every symbol
+
+        Returns:
+            Dictionary mapping refreshed symbols to the number of new bars
+        """
+        required_start = period_start(period)
+        cold: List[str] = []
+        incremental: Dict[str, List[str]] = {}
+
+        for symbol in dict.fromkeys(symbols):
+            index = self._index(symbol)
+            if (index is None or len(index) == 0 or not self.is_adjusted(symbol)
+                    or (required_start is not None and index[0] > required_start + pd.Timedelta(days=7))):
+                cold.append(symbol)
+            elif force or not self.is_fresh(symbol):
+                start = index[max(len(index) - 2, 0)].strftime('%Y-%m-%d')
+                incremental.setdefault(start, []).append(symbol)
+
+        added: Dict[str, int] = {}
+        revised: List[str] = []
+
+        for start, group in incremental.items():
+            frames = self.fetch(group, start=start)
+            for symbol in group:
+                if self.is_revised(symbol, frames.get(symbol)):
+                    revised.append(symbol)
+                else:
+                    added[symbol] = self.append(symbol, frames.get(symbol))
+
+        if revised:
+            logger.info(f"Price store history revised for {len(revised)} symbols")
+            frames = self.fetch(revised, period=period)
+            for symbol in revised:
+                if symbol in frames:
+                    self.write(symbol, frames[symbol])
+                    added[symbol] = 0
+
+        if cold:
+            logger.info(f"Price store cold fetch for {len(cold)} symbols")
+            frames = self.fetch(cold, period=period)
+            for symbol in cold:
+                if symbol in frames:
+                    self.write(symbol, frames[symbol])
+                    added[symbol] = len(frames[symbol])
+
+        return added
+
+    def get(self, symbol: str, period: str = '2y') -> pd.DataFrame:
+        """Refresh a symbol if needed and return its stored history"""
+        self.refresh([symbol], period=period)
+        return self.read(symbol, period)
+
+    def get_many(self, symbols: List[str], period: str = '2y') -> Dict[str, pd.DataFrame]:
+        """Refresh several symbols at once and return their stored histories"""
+        self.refresh(symbols, period=period)
+        frames = {}
+        for symbol in symbols:
+            df = self.read(symbol, period)
+            if not df.empty:
+                frames[symbol] = df
+        return frames
+
+
+_price_store: Optional[PriceStore] = None
+
+
+def get_price_store() -> PriceStore:
+    """Return the process-wide price store"""
+    global _price_store
+    if _price_store is None:
+        _price_store = PriceStore()
+    return _price_store
@@ -0,0 +1,226 @@
+import os
+import json
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from prophet import Prophet
+from prophet.serialize import model_from_json, model_to_json
+
+from models.model_registry import MODEL_MAX_AGE_HOURS, MODEL_MAX_NEW_BARS
+
+logger = logging.getLogger(__name__)
+
+# Directory holding one JSON file (serialized model and metadata) per symbol
+PROPHET_MODEL_DIR = os.getenv(
+    "PROPHET_MODEL_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "prophet")
+)
+# Number of processes used by forecast_many
+PROPHET_WORKERS = int(os.getenv("PROPHET_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+FORECAST_DAYS = 30
+
+
+def stan_init(model: Prophet) -> Dict[str, Any]:
+    """Fitted parameters of a model, usable as the init of the next fit (warm start)"""
+    init = {}
+    for name in ['k', 'm', 'sigma_obs']:
+        init[name] = model.params[name][0][0]
+    for name in ['delta', 'beta']:
+        init[name] = model.params[name][0]
+    return init
+
+
+def to_prophet_frame(close: pd.Series) -> pd.DataFrame:
+    close = close.dropna()
+    index = pd.DatetimeIndex(close.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return pd.DataFrame({'ds': index, 'y': close.to_numpy(dtype=np.float64)})
+
+
+class ProphetService:
+    """
+    Prophet forecasts with persisted models and warm-started refits.
+
+    A stored model is reused while it is younger than max_age_hours and no
+    more than max_new_bars bars arrived after its data. Refits start from the
+    previous model's parameters, so Stan converges in far fewer iterations,
+    and forecasts only evaluate the future window rather than the whole history.
+    """
+
+    def __init__(self, root: str = PROPHET_MODEL_DIR, max_age_hours: float = MODEL_MAX_AGE_HOURS,
+                 max_new_bars: int = MODEL_MAX_NEW_BARS, workers: int = PROPHET_WORKERS):
+        self.root = root
+        self.max_age_hours = max_age_hours
+        self.max_new_bars = max_new_bars
+        self.workers = workers
+        # symbol -> (file mtime, model, metadata)
+        self._models: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, symbol: str) -> str:
+        return os.path.join(self.root, f"{symbol}.json")
+
+    def _load(self, symbol: str) -> Optional[tuple]:
+        """Stored (model, metadata), from memory unless another process rewrote the file"""
+        path = self._path(symbol)
+        if not os.path.exists(path):
+            return None
+
+        mtime = os.path.getmtime(path)
+        with self._lock:
+            cached = self._models.get(symbol)
+        if cached is not None and cached[0] == mtime:
+            return cached[1:]
+
+        try:
+            with open(path) as f:
+                stored = json.load(f)
+            model = model_from_json(stored['model'])
+        except Exception as e:
+            logger.error(f"Could not load Prophet model {path}: {e}")
+            return None
+
+        with self._lock:
+            self._models[symbol] = (mtime, model, stored['metadata'])
+        return model, stored['metadata']
+
+    def _save(self, symbol: str, model: Prophet, metadata: Dict[str, Any]) -> None:
+        path = self._path(symbol)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({'model': model_to_json(model), 'metadata': metadata}, f)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._models[symbol] = (os.path.getmtime(path), model, metadata)
+
+    def _stale_reason(self, metadata: Dict[str, Any], frame: pd.DataFrame) -> Optional[str]:
+        age_hours = (datetime.now() - datetime.fromisoformat(metadata['fitted_at'])).total_seconds() / 3600
+        if age_hours > self.max_age_hours:
+            return f"model is {age_hours:.1f}h old"
+        new_bars = int((frame['ds'] > pd.Timestamp(metadata['data_end'])).sum())
+        if new_bars > self.max_new_bars:
+            return f"{new_bars} new bars since training"
+        return None
+
+    def get_model(self, symbol: str, close: pd.Series) -> Prophet:
+        """
+        Fitted model for a symbol, refitting (warm-started when possible) only when stale
+
+        Args:
+            symbol: Stock symbol
+            close: Closing prices indexed by date
+
+        Returns:
+            Fitted Prophet model
+        """
+        frame = to_prophet_frame(close)
+        cached = self._load(symbol)
+        reason = "no stored model" if cached is None else self._stale_reason(cached[1], frame)
+        if reason is None:
+            return cached[0]
+
+        logger.info(f"Fitting Prophet for {symbol}: {reason}")
+        model = Prophet(daily_seasonality=True)
+        if cached is not None:
+            model.fit(frame, init=stan_init(cached[0]))
+        else:
+            model.fit(frame)
+        self._save(symbol, model, {
+            'data_end': frame['ds'].iloc[-1].isoformat(),
+            'fitted_at': datetime.now().isoformat(),
+        })
+        return model
+
+    def forecast(self, symbol: str, close: pd.Series, periods: int = FORECAST_DAYS) -> Dict[str, List]:
+        """
+        Forecast the `periods` days after the last price
+
+        Args:
+            symbol: Stock symbol
+            close: Closing prices indexed by date
+            periods: Number of days to forecast
+
+        Returns:
+            Dictionary with forecast dates, values and bounds (ml_models.prophet_forecast format)
+        """
+        model = self.get_model(symbol, close)
+        last_date = to_prophet_frame(close)['ds'].iloc[-1]
+        # Only the future window is evaluated, not the whole history
+        future = pd.DataFrame({'ds': pd.date_range(last_date + pd.Timedelta(days=1), periods=periods, freq='D')})
+        forecast = model.predict(future)
+        return {
+            'dates': forecast['ds'].dt.strftime('%Y-%m-%d').tolist(),
+            'forecast': forecast['yhat'].tolist(),
+            'lower_bound': forecast['yhat_lower'].tolist(),
+            'upper_bound': forecast['yhat_upper'].tolist()
+        }
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: the API process runs an event loop and threads
+            self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                             mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def forecast_many(self, closes: Dict[str, pd.Series], periods: int = FORECAST_DAYS) -> Dict[str, Dict[str, List]]:
+        """
+        Forecast many symbols across the process pool
+
+        Workers share the models stored on disk, so warm starts and reuse work
+        the same way as in forecast.
+
+        Args:
+            closes: Dictionary mapping symbols to closing prices
+            periods: Number of days to forecast
+
+        Returns:
+            Dictionary mapping symbols to forecasts (failed symbols are skipped)
+        """
+        pool = self._get_pool()
+        futures = {
+            symbol: pool.submit(_forecast_task, self.root, symbol, close, periods)
+            for symbol, close in closes.items()
+        }
+        results = {}
+        for symbol, future in futures.items():
+            try:
+                results[symbol] = future.result()
+            except Exception as e:
+                logger.error(f"Prophet forecast error for {symbol}: {e}")
+        return results
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+# Per-process services of pool workers, by model directory
+_worker_services: Dict[str, ProphetService] = {}
+
+
+def _forecast_task(root: str, symbol: str, close: pd.Series, periods: int) -> Dict[str, List]:
+    service = _worker_services.get(root)
+    if service is None:
+        service = _worker_services[root] = ProphetService(root, workers=1)
+    return service.forecast(symbol, close, periods)
+
+
+_service: Optional[ProphetService] = None
+
+
+def get_prophet_service() -> ProphetService:
+    """Return the process-wide Prophet service"""
+    global _service
+    if _service is None:
+        _service = ProphetService()
+    return _service
@@ -0,0 +1,161 @@
+import os
+import math
+import time
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Polling interval bounds for one symbol
+SENTIMENT_REFRESH_MIN_SECONDS = float(os.getenv("SENTIMENT_REFRESH_MIN_SECONDS", 5 * 60))
+SENTIMENT_REFRESH_MAX_SECONDS = float(os.getenv("SENTIMENT_REFRESH_MAX_SECONDS", 6 * 60 * 60))
+# News API calls per minute the scheduler may spend (leaves the rest of the quota to requests)
+SENTIMENT_REFRESH_CALLS_PER_MINUTE = float(os.getenv("SENTIMENT_REFRESH_CALLS_PER_MINUTE", 20))
+# Seconds between scheduling rounds
+SENTIMENT_REFRESH_TICK_SECONDS = float(os.getenv("SENTIMENT_REFRESH_TICK_SECONDS", 30))
+# News arrival rate (articles per hour) that doubles a symbol's polling frequency
+SENTIMENT_NEWS_RATE_SCALE = float(os.getenv("SENTIMENT_NEWS_RATE_SCALE", 0.25))
+# Polling frequency multiplier for symbols with WebSocket subscribers
+SENTIMENT_SUBSCRIBER_BOOST = float(os.getenv("SENTIMENT_SUBSCRIBER_BOOST", 8))
+# Half-life of the news arrival rate estimate
+NEWS_RATE_HALF_LIFE_HOURS = 6.0
+
+
+class SymbolSchedule:
+    """Polling state of one symbol"""
+
+    __slots__ = ('symbol', 'news_rate', 'last_polled', 'polls')
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        # Smoothed new articles per hour
+        self.news_rate = 0.0
+        self.last_polled: Optional[float] = None
+        self.polls = 0
+
+
+class RefreshScheduler:
+    """
+    Adaptive per-symbol sentiment refresh.
+
+    Each symbol's polling interval shrinks with its smoothed news arrival
+    rate and with subscriber interest, between min_interval and max_interval.
+    When the planned polling rate of all symbols exceeds calls_per_minute,
+    every interval is stretched by the same factor; a token bucket caps the
+    calls actually made. Due symbols are polled most-overdue first.
+    """
+
+    def __init__(self, symbols: List[str], subscribers: Callable[[], Dict[str, int]] = dict,
+                 calls_per_minute: float = SENTIMENT_REFRESH_CALLS_PER_MINUTE,
+                 min_interval: float = SENTIMENT_REFRESH_MIN_SECONDS,
+                 max_interval: float = SENTIMENT_REFRESH_MAX_SECONDS,
+                 tick_seconds: float = SENTIMENT_REFRESH_TICK_SECONDS):
+        self.schedules = {symbol: SymbolSchedule(symbol) for symbol in symbols}
+        self.subscribers = subscribers
+        self.calls_per_minute = calls_per_minute
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.tick_seconds = tick_seconds
+        self._tokens = calls_per_minute
+        self._refilled = time.monotonic()
+
+    def interval(self, schedule: SymbolSchedule, subscribers: int) -> float:
+        """Polling interval of a symbol before the budget stretch"""
+        heat = 1 + schedule.news_rate / SENTIMENT_NEWS_RATE_SCALE
+        if subscribers > 0:
+            heat *= SENTIMENT_SUBSCRIBER_BOOST
+        return min(self.max_interval, max(self.min_interval, self.max_interval / heat))
+
+    def _intervals(self) -> Dict[str, float]:
+        subscribers = self.subscribers()
+        intervals = {symbol: self.interval(schedule, subscribers.get(symbol, 0))
+                     for symbol, schedule in self.schedules.items()}
+        # Stretch every interval when the planned call rate is over budget
+        planned_per_minute = sum(60.0 / interval for interval in intervals.values())
+        stretch = max(1.0, planned_per_minute / self.calls_per_minute)
+        return {symbol: interval * stretch for symbol, interval in intervals.items()}
+
+    def due(self, now: Optional[float] = None) -> List[str]:
+        """
+        Symbols to poll now, most overdue first, limited by the call budget
+
+        Args:
+            now: Unix time (default: now)
+
+        Returns:
+            Symbols to refresh; each one spends a budget token
+        """
+        now = time.time() if now is None else now
+        monotonic = time.monotonic()
+        self._tokens = min(self.calls_per_minute,
+                           self._tokens + (monotonic - self._refilled) * self.calls_per_minute / 60.0)
+        self._refilled = monotonic
+
+        overdue = []
+        for symbol, interval in self._intervals().items():
+            last_polled = self.schedules[symbol].last_polled
+            ratio = math.inf if last_polled is None else (now - last_polled) / interval
+            if ratio >= 1:
+                overdue.append((ratio, symbol))
+        overdue.sort(reverse=True)
+
+        batch = [symbol for _, symbol in overdue[:int(self._tokens)]]
+        self._tokens -= len(batch)
+        return batch
+
+    def record(self, symbol: str, new_articles: int, now: Optional[float] = None) -> None:
+        """Update a symbol's news arrival rate after a poll that found new_articles"""
+        schedule = self.schedules.get(symbol)
+        if schedule is None:
+            return
+        now = time.time() if now is None else now
+        if schedule.last_polled is not None:
+            hours = max((now - schedule.last_polled) / 3600, 1 / 60)
+            alpha = 1 - math.pow(2.0, -hours / NEWS_RATE_HALF_LIFE_HOURS)
+            schedule.news_rate += alpha * (new_articles / hours - schedule.news_rate)
+        schedule.last_polled = now
+        schedule.polls += 1
+
+    def record_results(self, results: Dict[str, Dict[str, Any]], now: Optional[float] = None) -> None:
+        """Record a refresh's per-symbol results ('new_articles' field)"""
+        for symbol, data in results.items():
+            self.record(symbol, int(data.get('new_articles') or 0), now)
+
+    async def run(self, refresh: Callable[[List[str]], Awaitable[Dict[str, Dict[str, Any]]]]) -> None:
+        """
+        Poll due symbols forever
+
+        Args:
+            refresh: Coroutine refreshing the given symbols and returning their results
+        """
+        while True:
+            batch = self.due()
+            if batch:
+                try:
+                    self.record_results(await refresh(batch))
+                except Exception as e:
+                    logger.error(f"Sentiment refresh of {len(batch)} symbols failed: {e}")
+            await asyncio.sleep(self.tick_seconds)
+
+    def status(self) -> Dict[str, Any]:
+        """Current intervals and news rates, hottest symbols first"""
+        now = time.time()
+        intervals = self._intervals()
+        symbols = [
+            {
+                "symbol": symbol,
+                "interval_seconds": round(intervals[symbol]),
+                "news_rate_per_hour": round(schedule.news_rate, 3),
+                "next_poll_in_seconds": 0 if schedule.last_polled is None
+                else max(0, round(schedule.last_polled + intervals[symbol] - now)),
+                "polls": schedule.polls,
+            }
+            for symbol, schedule in self.schedules.items()
+        ]
+        symbols.sort(key=lambda item: item["interval_seconds"])
+        return {
+            "calls_per_minute_budget": self.calls_per_minute,
+            "planned_calls_per_minute": round(sum(60.0 / interval for interval in intervals.values()), 2),
+            "symbols": symbols,
+        }
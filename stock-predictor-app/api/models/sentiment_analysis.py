@@ -1,12 +1,15 @@
-import os
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, List, Tuple
-from textblob import TextBlob
-import requests
-import finnhub
+from typing import Dict, Any, Optional, List
+import asyncio
+import threading
 from dotenv import load_dotenv
-import concurrent.futures
+
+from models.data_providers import MarketDataProvider, get_provider
+from models.news_client import close_news_clients
+from models.news_store import NewsStore, get_news_store
+from models.sentiment_scorer import get_sentiment_scorer
+from models.sentiment_stream import SENTIMENT_HALF_LIFE, SentimentStream, get_sentiment_stream
 
 # Load environment variables
 load_dotenv()
@@ -18,12 +21,25 @@ logger = logging.getLogger(__name__)
 class SentimentAnalyzer:
     """Class for analyzing news sentiment for stocks"""
     
-    def __init__(self):
-        self.finnhub_key = os.getenv("FINNHUB_API_KEY")
-        if not self.finnhub_key:
-            logger.warning("FINNHUB_API_KEY not found in environment variables. Sentiment analysis will be limited.")
-        else:
-            self.finnhub_client = finnhub.Client(api_key=self.finnhub_key)
+    def __init__(self, provider: Optional[MarketDataProvider] = None, store: Optional[NewsStore] = None):
+        # Defaults to the provider selected by MARKET_DATA_PROVIDER
+        self.provider = provider
+        # Defaults to the provider's article store
+        self.store = store
+        # Serializes ingestion per symbol so concurrent refreshes do not count articles twice
+        self._ingest_locks: Dict[str, threading.Lock] = {}
+    
+    @property
+    def news_provider(self) -> MarketDataProvider:
+        return self.provider or get_provider()
+    
+    @property
+    def news_store(self) -> NewsStore:
+        return self.store or get_news_store(self.news_provider.name)
+    
+    @property
+    def sentiment_stream(self) -> SentimentStream:
+        return get_sentiment_stream(self.news_store.path)
     
     def get_news_sentiment(self, stock_symbol: str, days: int = 30) -> Optional[Dict[str, Any]]:
         """
@@ -36,8 +52,9 @@ class SentimentAnalyzer:
         Returns:
             Dictionary with sentiment score and details, or None if no news found
         """
-        if not self.finnhub_key:
-            logger.warning(f"Skipping sentiment analysis for {stock_symbol} - no API key")
+        provider = self.news_provider
+        if not provider.has_news:
+            logger.warning(f"Skipping sentiment analysis for {stock_symbol} - no news source")
             return None
             
         end_date = datetime.now()
@@ -47,79 +64,159 @@ class SentimentAnalyzer:
             # Remove .IS suffix if present (for BIST stocks)
             clean_symbol = stock_symbol.replace('.IS', '')
             
-            # Get news from Finnhub
-            finnhub_articles = self.finnhub_client.company_news(
-                clean_symbol, 
-                _from=start_date.strftime('%Y-%m-%d'), 
-                to=end_date.strftime('%Y-%m-%d')
-            )
-            
-            if not finnhub_articles:
-                logger.warning(f"No news found for {stock_symbol}")
-                return None
-                
-            logger.info(f"Found {len(finnhub_articles)} news articles for {stock_symbol}")
-            
-            # Analyze sentiment and return more detailed information
-            sentiment_score, articles_analyzed = self._analyze_sentiment(finnhub_articles)
-            sentiment_explanation = get_sentiment_explanation(sentiment_score)
-            
-            # Generate recommendation based on sentiment
-            recommendation = self._generate_recommendation_from_sentiment(sentiment_score)
-            
-            # Extract top headlines
-            top_headlines = self._extract_top_headlines(finnhub_articles[:5])
-            
-            return {
-                'symbol': stock_symbol,
-                'sentiment': sentiment_score,
-                'sentiment_explanation': sentiment_explanation,
-                'recommendation': recommendation,
-                'articles_analyzed': articles_analyzed,
-                'top_headlines': top_headlines,
-                'analysis_date': datetime.now().isoformat()
-            }
+            # Get only the news since the last refresh from the provider (Finnhub when live)
+            fetch_start = self.news_store.fetch_start(stock_symbol, start_date)
+            finnhub_articles = provider.get_company_news(clean_symbol, fetch_start, end_date)
+            return self._ingest_and_summarize(stock_symbol, finnhub_articles, start_date, end_date)
             
         except Exception as e:
             logger.error(f"Error getting news for {stock_symbol}: {e}")
             return None
     
-    def _analyze_sentiment(self, articles: list) -> Tuple[float, int]:
+    async def aget_news_sentiment(self, stock_symbol: str, days: int = 30) -> Optional[Dict[str, Any]]:
         """
-        Analyze sentiment from a list of news articles
+        Async variant of get_news_sentiment
+        
+        News is fetched through the provider's async client (pooled connections,
+        shared rate limit) and scoring runs in a worker thread, so the event loop
+        is never blocked.
         
         Args:
-            articles: List of articles (dicts with 'headline' and 'summary' keys)
+            stock_symbol: Stock symbol
+            days: Number of days to look back for news
             
         Returns:
-            Tuple of (sentiment_score, number_of_articles_analyzed)
+            Dictionary with sentiment score and details, or None if no news found
+        """
+        provider = self.news_provider
+        if not provider.has_news:
+            logger.warning(f"Skipping sentiment analysis for {stock_symbol} - no news source")
+            return None
+        
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=days)
+        
+        try:
+            clean_symbol = stock_symbol.replace('.IS', '')
+            fetch_start = self.news_store.fetch_start(stock_symbol, start_date)
+            finnhub_articles = await provider.aget_company_news(clean_symbol, fetch_start, end_date)
+            return await asyncio.to_thread(
+                self._ingest_and_summarize, stock_symbol, finnhub_articles, start_date, end_date
+            )
+        except Exception as e:
+            logger.error(f"Error getting news for {stock_symbol}: {e}")
+            return None
+    
+    async def analyze_many(self, symbols: List[str], days: int = 30) -> Dict[str, Dict[str, Any]]:
         """
-        sentiments = []
-        articles_analyzed = 0
+        Analyze sentiment for many stocks concurrently
         
-        for article in articles:
-            # Combine headline and summary with more weight on the headline
-            headline = article.get('headline', '')
-            summary = article.get('summary', '')
+        All symbols are requested at once; the news client's concurrency limit
+        and rate limiter decide how fast they actually go out.
+        
+        Args:
+            symbols: Stock symbols
+            days: Number of days to look back for news
             
-            # Skip empty articles
-            if not headline.strip() and not summary.strip():
-                continue
-                
-            # Calculate sentiment with TextBlob (giving headline 2x weight)
-            headline_blob = TextBlob(headline)
-            summary_blob = TextBlob(summary) if summary else TextBlob("")
+        Returns:
+            Dictionary with stock symbols as keys and sentiment data as values
+        """
+        sentiments = await asyncio.gather(
+            *(self.aget_news_sentiment(symbol, days) for symbol in symbols),
+            return_exceptions=True
+        )
+        
+        results = {}
+        for symbol, sentiment_data in zip(symbols, sentiments):
+            if isinstance(sentiment_data, Exception):
+                logger.error(f"Error analyzing sentiment for {symbol}: {sentiment_data}")
+                results[symbol] = empty_result(symbol, 'Error')
+            elif sentiment_data is None:
+                results[symbol] = empty_result(symbol, 'No data')
+            else:
+                results[symbol] = sentiment_data
+        return results
+    
+    def _ingest_and_summarize(self, stock_symbol: str, finnhub_articles: list, start_date: datetime,
+                              fetched_at: datetime) -> Optional[Dict[str, Any]]:
+        """
+        Score and store the articles not seen before, fold them into the
+        symbol's decayed sentiment aggregates and build the result from those
+        
+        Args:
+            stock_symbol: Stock symbol
+            finnhub_articles: Articles returned by the latest fetch
+            start_date: Start of the analysis window
+            fetched_at: Time of the fetch
             
-            headline_sentiment = headline_blob.sentiment.polarity * 2
-            summary_sentiment = summary_blob.sentiment.polarity
+        Returns:
+            Dictionary with sentiment score and details, or None if no news found
+        """
+        store = self.news_store
+        with self._ingest_locks.setdefault(stock_symbol, threading.Lock()):
+            stream = self._load_stream(stock_symbol)
+            new_articles = store.unseen(stock_symbol, finnhub_articles)
+            scores = get_sentiment_scorer().score_articles(new_articles)
+            state = stream.updated(stock_symbol, [article.get('datetime') or 0 for article in new_articles], scores)
+            store.add(stock_symbol, new_articles, scores, fetched_at, state)
+            # Committed only once stored: a failed write must not fold the articles in twice
+            stream.restore(stock_symbol, state)
+        
+        articles_analyzed = store.count(stock_symbol, start_date)
+        if not articles_analyzed:
+            logger.warning(f"No news found for {stock_symbol}")
+            return None
             
-            # Calculate weighted average
-            sentiment = (headline_sentiment + summary_sentiment) / 3
-            sentiments.append(sentiment)
-            articles_analyzed += 1
+        logger.info(f"Found {articles_analyzed} news articles for {stock_symbol} ({len(new_articles)} new)")
+        
+        # Time-decayed sentiment for every half-life; the default one drives the recommendation
+        horizons = {
+            half_life: {
+                'sentiment': stats['sentiment'],
+                'sentiment_explanation': get_sentiment_explanation(stats['sentiment']),
+                'recommendation': self._generate_recommendation_from_sentiment(stats['sentiment']),
+                'articles': round(stats['articles'], 2),
+                'volatility': stats['volatility'],
+            }
+            for half_life, stats in stream.query(stock_symbol, fetched_at.timestamp()).items()
+        }
+        default = horizons.get(SENTIMENT_HALF_LIFE) or next(iter(horizons.values()))
+        
+        # Extract top headlines (newest first)
+        top_headlines = self._extract_top_headlines(store.articles(stock_symbol, start_date, limit=5))
         
-        # Return average sentiment and count of articles analyzed
-        return (sum(sentiments) / len(sentiments) if sentiments else 0, articles_analyzed)
+        return {
+            'symbol': stock_symbol,
+            'sentiment': default['sentiment'],
+            'sentiment_explanation': default['sentiment_explanation'],
+            'recommendation': default['recommendation'],
+            'sentiment_horizons': horizons,
+            'articles_analyzed': articles_analyzed,
+            'new_articles': len(new_articles),
+            'top_headlines': top_headlines,
+            'analysis_date': datetime.now().isoformat()
+        }
+    
+    def _load_stream(self, stock_symbol: str) -> SentimentStream:
+        """
+        Sentiment stream with the symbol's aggregates loaded
+        
+        Restores the persisted state, or rebuilds it once from the stored
+        article scores when none matches the configured half-lives.
+        """
+        stream = self.sentiment_stream
+        if stock_symbol in stream:
+            return stream
+        
+        state = self.news_store.stream_state(stock_symbol)
+        if state is None or not stream.restore(stock_symbol, state):
+            stored = self.news_store.articles(stock_symbol, datetime.fromtimestamp(0))
+            stream.update(
+                stock_symbol,
+                [article['datetime'] for article in reversed(stored)],
+                [article['polarity'] for article in reversed(stored)]
+            )
+        return stream
     
     def _generate_recommendation_from_sentiment(self, sentiment_score: float) -> str:
         """
@@ -179,59 +276,44 @@ class SentimentAnalyzer:
         
         return headlines
 
-def analyze_stocks_sentiment(stocks: Dict[str, str], max_workers: int = 10) -> Dict[str, Dict[str, Any]]:
+def empty_result(symbol: str, explanation: str) -> Dict[str, Any]:
+    """Neutral placeholder for a stock without usable news (flagged with 'placeholder')"""
+    return {
+        'symbol': symbol,
+        'placeholder': True,
+        'sentiment': 0,
+        'sentiment_explanation': explanation,
+        'recommendation': 'HOLD',
+        'articles_analyzed': 0,
+        'top_headlines': [],
+        'analysis_date': datetime.now().isoformat()
+    }
+
+def is_placeholder(result: Dict[str, Any]) -> bool:
+    """Whether a result is a neutral placeholder rather than an analysis of fetched news"""
+    return bool(result.get('placeholder'))
+
+def analyze_stocks_sentiment(stocks: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
     """
-    Analyze sentiment for multiple stocks in parallel
+    Analyze sentiment for multiple stocks (blocking wrapper around SentimentAnalyzer.analyze_many)
+    
+    Must not be called from a running event loop; async code should await
+    `sentiment_analyzer.analyze_many` directly.
     
     Args:
         stocks: Dictionary with stock symbols as keys
-        max_workers: Maximum number of parallel workers
         
     Returns:
         Dictionary with stock symbols as keys and sentiment data as values
     """
-    analyzer = SentimentAnalyzer()
-    results = {}
-    
-    # Use ThreadPoolExecutor for parallel processing
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Submit all tasks
-        future_to_symbol = {
-            executor.submit(analyzer.get_news_sentiment, symbol): symbol 
-            for symbol in stocks
-        }
-        
-        # Process results as they complete
-        for future in concurrent.futures.as_completed(future_to_symbol):
-            symbol = future_to_symbol[future]
-            try:
-                sentiment_data = future.result()
-                
-                if sentiment_data is not None:
-                    results[symbol] = sentiment_data
-                else:
-                    results[symbol] = {
-                        'symbol': symbol,
-                        'sentiment': 0,
-                        'sentiment_explanation': 'No data',
-                        'recommendation': 'HOLD',
-                        'articles_analyzed': 0,
-                        'top_headlines': [],
-                        'analysis_date': datetime.now().isoformat()
-                    }
-            except Exception as e:
-                logger.error(f"Error analyzing sentiment for {symbol}: {e}")
-                results[symbol] = {
-                    'symbol': symbol,
-                    'sentiment': 0,
-                    'sentiment_explanation': 'Error',
-                    'recommendation': 'HOLD',
-                    'articles_analyzed': 0,
-                    'top_headlines': [],
-                    'analysis_date': datetime.now().isoformat()
-                }
+    async def run() -> Dict[str, Dict[str, Any]]:
+        try:
+            return await get_sentiment_analyzer().analyze_many(list(stocks))
+        finally:
+            # The connection pool belongs to this short-lived event loop
+            await close_news_clients()
     
-    return results
+    return asyncio.run(run())
 
 def get_sentiment_explanation(score: float) -> str:
     """
@@ -262,4 +344,13 @@ def get_all_bist_sentiment() -> Dict[str, Dict[str, Any]]:
         Dictionary with results for all stocks
     """
     from main import BIST_STOCKS
-    return analyze_stocks_sentiment(BIST_STOCKS) 
\ No newline at end of file
+    return analyze_stocks_sentiment(BIST_STOCKS)
+
+_sentiment_analyzer: Optional[SentimentAnalyzer] = None
+
+def get_sentiment_analyzer() -> SentimentAnalyzer:
+    """Return the process-wide sentiment analyzer"""
+    global _sentiment_analyzer
+    if _sentiment_analyzer is None:
+        _sentiment_analyzer = SentimentAnalyzer()
+    return _sentiment_analyzer
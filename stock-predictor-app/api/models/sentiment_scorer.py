@@ -0,0 +1,241 @@
+import os
+import re
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, repeat
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Processes used for large scoring batches (0 or 1: score in the calling process)
+SENTIMENT_WORKERS = int(os.getenv("SENTIMENT_WORKERS", 0))
+# Articles below this count are always scored in the calling process
+SENTIMENT_POOL_MIN_ARTICLES = int(os.getenv("SENTIMENT_POOL_MIN_ARTICLES", 2000))
+
+# Same split as TextBlob's tokenizer: punctuation is peeled off the ends of
+# whitespace separated words ("good!!" -> good ! !), "n't" is split off and
+# apostrophes stand alone ("isn't" -> is n ' t)
+_PUNCTUATION = re.escape('.,;:!?()[]{}`\'"@#$^&*+-|=~_')
+TOKEN_RE = re.compile(rf"[{_PUNCTUATION}]|[^\s{_PUNCTUATION}](?:\S*[^\s{_PUNCTUATION}])?")
+_QUOTES = str.maketrans({"'": " ' ", "‘": " ' ", "’": " ' ", "“": ' " ', "”": ' " '})
+
+NEGATIONS = ("no", "not", "n't", "never")
+EXCLAMATION = "!"
+
+
+class Lexicon:
+    """
+    TextBlob's pattern polarity lexicon compiled into a token -> row hash table
+    with per-row arrays (polarity, intensity and flags). Unknown tokens map to
+    the last row, which is all zeros.
+    """
+
+    def __init__(self):
+        from textblob.en import sentiment
+
+        words = list(sentiment.keys())
+        extra = [token for token in NEGATIONS + (EXCLAMATION,) if token not in sentiment]
+        self.table: Dict[str, int] = {token: row for row, token in enumerate(words + extra)}
+
+        rows = len(self.table) + 1
+        self.known = np.zeros(rows, dtype=bool)
+        self.polarity = np.zeros(rows)
+        self.intensity = np.ones(rows)
+        self.modifier = np.zeros(rows, dtype=bool)
+        self.ly_modifier = np.zeros(rows, dtype=bool)
+        self.negation = np.zeros(rows, dtype=bool)
+        self.exclamation = np.zeros(rows, dtype=bool)
+
+        for row, word in enumerate(words):
+            senses = sentiment[word]
+            polarity, _, intensity = senses[None]
+            self.known[row] = True
+            self.polarity[row] = polarity
+            self.intensity[row] = intensity
+            self.modifier[row] = "RB" in senses
+            self.ly_modifier[row] = self.modifier[row] and word.endswith("ly")
+        for token, row in self.table.items():
+            self.negation[row] = token in NEGATIONS
+            self.exclamation[row] = token == EXCLAMATION
+
+    def rows(self, tokens: Sequence[str]) -> np.ndarray:
+        return np.fromiter(map(self.table.get, tokens, repeat(-1)), dtype=np.int64, count=len(tokens))
+
+
+_lexicon: Optional[Lexicon] = None
+
+
+def get_lexicon() -> Lexicon:
+    """Return the process-wide compiled lexicon"""
+    global _lexicon
+    if _lexicon is None:
+        _lexicon = Lexicon()
+    return _lexicon
+
+
+def tokenize_batch(texts: Sequence[str]) -> List[List[str]]:
+    """Lowercased tokens of each text"""
+    return [TOKEN_RE.findall(text.lower().replace("n't", " n't").translate(_QUOTES)) for text in texts]
+
+
+def _last_before(mask: np.ndarray) -> np.ndarray:
+    """Index of the last True position strictly before each position (-1 if none)"""
+    positions = np.where(mask, np.arange(len(mask)), -1)
+    return np.concatenate(([-1], np.maximum.accumulate(positions)[:-1]))
+
+
+def polarity_batch(texts: Sequence[str], lexicon: Optional[Lexicon] = None) -> np.ndarray:
+    """
+    TextBlob (PatternAnalyzer) polarity of many texts in one pass
+
+    All texts are tokenized into one token stream that is looked up in the
+    compiled lexicon; the analyzer's rules are then applied with array
+    operations over the stream:
+
+    - a known word right after a known adverb (RB) merges into its assessment
+      and takes polarity * the adverb's intensity ("very good")
+    - a negation before a word (across one-letter tokens) negates its
+      assessment, which ends up at -0.5 x polarity ("not good"); a negation
+      after a pending -ly adverb negates the adverb's assessment
+    - every "!" after an assessment multiplies its polarity by 1.25
+    - the text's polarity is the mean over its assessments
+
+    Emoticons and "(!)" are not special-cased (they do not survive news
+    text tokenization); benchmarks/sentiment_parity.py measures the
+    agreement with TextBlob.
+
+    Args:
+        texts: Texts to score
+        lexicon: Compiled lexicon (default: the process-wide one)
+
+    Returns:
+        Polarity of each text between -1 and 1 (0 for texts without known words)
+    """
+    lexicon = lexicon or get_lexicon()
+    token_lists = tokenize_batch(texts)
+    lengths = np.fromiter(map(len, token_lists), dtype=np.int64, count=len(token_lists))
+    tokens = list(chain.from_iterable(token_lists))
+    if not tokens:
+        return np.zeros(len(texts))
+
+    n = len(tokens)
+    idx = np.arange(n)
+    doc = np.repeat(np.arange(len(texts)), lengths)
+    doc_start = np.repeat(np.cumsum(lengths) - lengths, lengths)
+
+    rows = lexicon.rows(tokens)
+    token_len = np.fromiter(map(len, tokens), dtype=np.int64, count=n)
+    known = lexicon.known[rows]
+    negation = lexicon.negation[rows]
+
+    last_known = _last_before(known)
+    has_prev_known = last_known >= doc_start
+    prev_row = rows[np.maximum(last_known, 0)]
+
+    # Pending adverb: last known word is an RB with no unknown word longer than two letters since.
+    # "really not good": a negation while an -ly adverb is pending attaches to the adverb's
+    # assessment and keeps the adverb pending
+    after_ly = ~known & negation & has_prev_known & lexicon.ly_modifier[prev_row]
+    blocks_modifier = ~known & (token_len > 2) & ~after_ly
+    modifier_pending = has_prev_known & lexicon.modifier[prev_row] & (_last_before(blocks_modifier) < last_known)
+    adverb_negation = after_ly & modifier_pending
+    merge = known & modifier_pending
+    start = known & ~merge
+
+    # Pending negation: set by negation words, cleared by other known words and by unknown words longer than one letter
+    sets_negation = negation & ~adverb_negation
+    clears_negation = (known & ~negation) | (~known & ~negation & (token_len > 1)) | adverb_negation
+    last_set = _last_before(sets_negation)
+    negated = known & (last_set >= doc_start) & (last_set > _last_before(clears_negation))
+
+    # Value after each known word: merged words use the previous word's (possibly inverted) intensity
+    intensity = lexicon.intensity[rows]
+    effective_intensity = np.where(negated, 1.0 / np.where(intensity == 0, 1.0, intensity), intensity)
+    value = np.where(merge, np.clip(lexicon.polarity[rows] * effective_intensity[np.maximum(last_known, 0)], -1.0, 1.0),
+                     lexicon.polarity[rows])
+
+    # Assessment id of each known word; its final value is the one after its last word
+    group = np.cumsum(start) - 1
+    known_idx = idx[known]
+    n_groups = int(start.sum())
+    group_last = np.zeros(n_groups, dtype=np.int64)
+    group_last[group[known_idx]] = known_idx
+    polarity = value[group_last]
+
+    group_negated = np.zeros(n_groups, dtype=bool)
+    group_negated[group[idx[negated]]] = True
+    group_negated[group[last_known[adverb_negation]]] = True
+
+    # Exclamation marks after an assessment's last word
+    boosting = lexicon.exclamation[rows] & has_prev_known
+    boosted_group = group[last_known[boosting]]
+    is_last = group_last[boosted_group] == last_known[boosting]
+    boosts = np.bincount(boosted_group[is_last], minlength=n_groups)
+    polarity = np.clip(polarity * 1.25 ** boosts, -1.0, 1.0)
+    polarity = np.where(group_negated, polarity * -0.5, polarity)
+
+    group_doc = doc[idx[start]]
+    counts = np.bincount(group_doc, minlength=len(texts))
+    totals = np.bincount(group_doc, weights=polarity, minlength=len(texts))
+    return totals / np.maximum(counts, 1)
+
+
+def score_articles_local(articles: Sequence[Dict[str, Any]]) -> List[Optional[float]]:
+    """Headline/summary weighted 2:1 polarity per article (None for articles without text)"""
+    headlines = [article.get('headline') or '' for article in articles]
+    summaries = [article.get('summary') or '' for article in articles]
+    polarity = polarity_batch(headlines + summaries)
+    scores = (2 * polarity[:len(articles)] + polarity[len(articles):]) / 3
+    return [
+        None if not headline.strip() and not summary.strip() else float(score)
+        for headline, summary, score in zip(headlines, summaries, scores)
+    ]
+
+
+class SentimentScorer:
+    """Batch article scorer with an optional process pool for large batches"""
+
+    def __init__(self, workers: int = SENTIMENT_WORKERS, pool_min_articles: int = SENTIMENT_POOL_MIN_ARTICLES):
+        self.workers = workers
+        self.pool_min_articles = pool_min_articles
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def score_articles(self, articles: Sequence[Dict[str, Any]]) -> List[Optional[float]]:
+        """
+        Score articles (see polarity_batch)
+
+        Args:
+            articles: Article dicts with 'headline' and 'summary' keys
+
+        Returns:
+            Polarity per article, None for articles without text
+        """
+        if self.workers <= 1 or len(articles) < self.pool_min_articles:
+            return score_articles_local(articles)
+
+        if self._pool is None:
+            # spawn: the API process runs threads and an event loop
+            self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                             mp_context=multiprocessing.get_context("spawn"))
+        chunk = -(-len(articles) // self.workers)
+        chunks = [list(articles[i:i + chunk]) for i in range(0, len(articles), chunk)]
+        return list(chain.from_iterable(self._pool.map(score_articles_local, chunks)))
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+_scorer: Optional[SentimentScorer] = None
+
+
+def get_sentiment_scorer() -> SentimentScorer:
+    """Return the process-wide sentiment scorer"""
+    global _scorer
+    if _scorer is None:
+        _scorer = SentimentScorer()
+    return _scorer
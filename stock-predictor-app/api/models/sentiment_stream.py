@@ -0,0 +1,172 @@
+import os
+import math
+import time
+import logging
+import threading
+from typing import Dict, List, Optional, Sequence
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Half-lives tracked for every symbol (pandas Timedelta strings)
+SENTIMENT_HALF_LIVES = [name.strip() for name in os.getenv("SENTIMENT_HALF_LIVES", "1d,7d,30d").split(",") if name.strip()]
+# Half-life that drives `sentiment`, `recommendation` and `sentiment_explanation`
+SENTIMENT_HALF_LIFE = os.getenv("SENTIMENT_HALF_LIFE", "7d")
+
+
+class DecayedStats:
+    """
+    Exponentially decayed weight, sum and sum of squares of article scores.
+
+    The sums are stored as of `anchor` (the newest article time); an article
+    published `dt` seconds before the anchor counts with weight 2^(-dt / half_life).
+    Adding an article and querying are O(1).
+    """
+
+    __slots__ = ('half_life', 'anchor', 'weight', 'total', 'total_sq')
+
+    def __init__(self, half_life: float, anchor: float = 0.0, weight: float = 0.0, total: float = 0.0,
+                 total_sq: float = 0.0):
+        self.half_life = half_life
+        self.anchor = anchor
+        self.weight = weight
+        self.total = total
+        self.total_sq = total_sq
+
+    def _decay(self, seconds: float) -> float:
+        return math.pow(2.0, -seconds / self.half_life)
+
+    def add(self, timestamp: float, value: float) -> None:
+        if timestamp > self.anchor:
+            factor = self._decay(timestamp - self.anchor)
+            self.weight *= factor
+            self.total *= factor
+            self.total_sq *= factor
+            self.anchor = timestamp
+        w = self._decay(self.anchor - timestamp)
+        self.weight += w
+        self.total += w * value
+        self.total_sq += w * value * value
+
+    def at(self, timestamp: float) -> Dict[str, float]:
+        """Decayed mean, effective article count and standard deviation as of a time after the anchor"""
+        weight = self.weight * self._decay(max(0.0, timestamp - self.anchor))
+        if self.weight <= 0:
+            return {'sentiment': 0.0, 'articles': 0.0, 'volatility': 0.0}
+        mean = self.total / self.weight
+        variance = max(0.0, self.total_sq / self.weight - mean * mean)
+        return {'sentiment': mean, 'articles': weight, 'volatility': math.sqrt(variance)}
+
+    def state(self) -> List[float]:
+        return [self.anchor, self.weight, self.total, self.total_sq]
+
+
+class SentimentStream:
+    """
+    Per-symbol decayed sentiment aggregates over several half-lives.
+
+    New article scores are folded in as they are ingested, so a refresh costs
+    O(new articles) and never rescans the article history. The state of a
+    symbol is a small JSON-serializable dict that the news store persists.
+    """
+
+    def __init__(self, half_lives: Sequence[str] = SENTIMENT_HALF_LIVES):
+        self.half_lives = {name: pd.Timedelta(name).total_seconds() for name in half_lives}
+        # symbol -> half-life name -> stats
+        self._stats: Dict[str, Dict[str, DecayedStats]] = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._stats
+
+    def update(self, symbol: str, timestamps: Sequence[float], scores: Sequence[Optional[float]]) -> None:
+        """
+        Fold scored articles into a symbol's aggregates
+
+        Args:
+            symbol: Stock symbol
+            timestamps: Publish times (Unix seconds)
+            scores: Article scores (None for articles without text, skipped)
+        """
+        self.restore(symbol, self.updated(symbol, timestamps, scores))
+
+    def updated(self, symbol: str, timestamps: Sequence[float],
+                scores: Sequence[Optional[float]]) -> Dict[str, List[float]]:
+        """
+        State of a symbol after folding in scored articles, leaving the stream unchanged
+
+        Persist the returned state first and then commit it with restore, so a
+        failed write does not leave aggregates that the store never saw.
+
+        Args:
+            symbol: Stock symbol
+            timestamps: Publish times (Unix seconds)
+            scores: Article scores (None for articles without text, skipped)
+
+        Returns:
+            Half-life name -> persisted state values
+        """
+        with self._lock:
+            current = self._stats.get(symbol, {})
+            stats = {
+                name: DecayedStats(seconds, *current[name].state()) if name in current else DecayedStats(seconds)
+                for name, seconds in self.half_lives.items()
+            }
+        for timestamp, score in zip(timestamps, scores):
+            if score is None:
+                continue
+            for item in stats.values():
+                item.add(float(timestamp), float(score))
+        return {name: item.state() for name, item in stats.items()}
+
+    def query(self, symbol: str, timestamp: Optional[float] = None) -> Dict[str, Dict[str, float]]:
+        """
+        Aggregates of a symbol for every half-life
+
+        Args:
+            symbol: Stock symbol
+            timestamp: Query time in Unix seconds (default: now); times before the
+                newest article give the aggregates as of that article
+
+        Returns:
+            Half-life name -> {'sentiment', 'articles', 'volatility'}
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            stats = self._stats.get(symbol, {})
+            return {
+                name: stats[name].at(timestamp) if name in stats else {'sentiment': 0.0, 'articles': 0.0, 'volatility': 0.0}
+                for name in self.half_lives
+            }
+
+    def state(self, symbol: str) -> Dict[str, List[float]]:
+        with self._lock:
+            return {name: item.state() for name, item in self._stats.get(symbol, {}).items()}
+
+    def restore(self, symbol: str, state: Dict[str, List[float]]) -> bool:
+        """
+        Load a persisted state
+
+        Returns:
+            False if the state does not cover the configured half-lives (rebuild needed)
+        """
+        if set(state) != set(self.half_lives):
+            return False
+        with self._lock:
+            self._stats[symbol] = {
+                name: DecayedStats(self.half_lives[name], *values) for name, values in state.items()
+            }
+        return True
+
+
+_streams: Dict[str, SentimentStream] = {}
+_streams_lock = threading.Lock()
+
+
+def get_sentiment_stream(name: str) -> SentimentStream:
+    """Return the process-wide sentiment stream for a news store (keyed by the store's path)"""
+    with _streams_lock:
+        if name not in _streams:
+            _streams[name] = SentimentStream()
+        return _streams[name]
@@ -0,0 +1,52 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent async calls that share a key.
+
+    The first caller for a key starts the computation; callers arriving while it
+    is still running await the same result instead of starting their own. Once the
+    computation finishes the key is released, so later calls compute again.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run `fn(*args, **kwargs)` once per key among concurrent callers
+
+        Args:
+            key: Deduplication key
+            fn: Coroutine function producing the result
+            *args, **kwargs: Arguments for fn
+
+        Returns:
+            Result of the shared computation (exceptions are re-raised to every caller)
+        """
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn(*args, **kwargs))
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._release(key, done))
+        else:
+            logger.debug(f"Joining in-flight computation for {key}")
+
+        # A cancelled waiter must not cancel the computation shared with others
+        return await asyncio.shield(future)
+
+    async def run_in_thread(self, key: Hashable, fn: Callable[..., Any], *args: Any) -> Any:
+        """Coalesced variant of asyncio.to_thread(fn, *args)"""
+        return await self.do(key, asyncio.to_thread, fn, *args)
+
+    def _release(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
@@ -4,11 +4,16 @@ from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.preprocessing import StandardScaler
 import numpy as np
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, List, Optional
+
+from models.feature_pipeline import FEATURE_SETS, get_feature_pipeline
+
+# Maximum number of tickers requested in a single multi-ticker download
+BULK_DOWNLOAD_CHUNK_SIZE = 50
 
 def get_stock_data(symbol: str, period: str = '1y') -> pd.DataFrame:
     """
-    Fetch stock data for a given symbol
+    Fetch stock data for a given symbol from the configured market data provider
     
     Args:
         symbol: Stock symbol (e.g., "AAPL")
@@ -17,58 +22,94 @@ def get_stock_data(symbol: str, period: str = '1y') -> pd.DataFrame:
     Returns:
         DataFrame with stock data or empty DataFrame if error
     """
+    # Imported here to avoid a circular import (providers fetch through this module)
+    from models.data_providers import get_provider
+    
     try:
-        stock = yf.Ticker(symbol)
-        df = stock.history(period=period)
+        df = get_provider().get_price_history(symbol, period=period)
         
         if df.empty:
             return pd.DataFrame()
             
         # Fill missing values
-        df.fillna(method='ffill', inplace=True)
+        df = df.fillna(method='ffill')
         return df
     except Exception as e:
         print(f"Error fetching data for {symbol}: {e}")
         return pd.DataFrame()
 
-def prepare_data(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame, pd.Series, pd.Series]:
+def download_price_history(symbols: List[str], period: str = '2y', start: Optional[str] = None,
+                           chunk_size: int = BULK_DOWNLOAD_CHUNK_SIZE) -> Dict[str, pd.DataFrame]:
+    """
+    Fetch daily OHLCV history for many symbols with multi-ticker requests
+    
+    Symbols are downloaded in chunks of `chunk_size` tickers per request and the
+    combined result is split back into one DataFrame per symbol.
+    
+    Args:
+        symbols: Stock symbols (e.g., "AKBNK.IS")
+        period: Time period ('1mo', '3mo', '6mo', '1y', '2y', '5y', 'max')
+        start: First date to fetch (YYYY-MM-DD). Takes precedence over period.
+        chunk_size: Maximum number of tickers per download request
+    
+    Returns:
+        Dictionary mapping each requested symbol to its DataFrame. Symbols
+        without data are left out.
+    """
+    ticker_list = list(dict.fromkeys(symbols))
+    range_kwargs = {'start': start} if start else {'period': period}
+    frames: Dict[str, pd.DataFrame] = {}
+    
+    for i in range(0, len(ticker_list), chunk_size):
+        chunk = ticker_list[i:i + chunk_size]
+        try:
+            data = yf.download(
+                chunk,
+                group_by='ticker',
+                # Split and dividend adjusted, like Ticker.history
+                auto_adjust=True,
+                threads=True,
+                progress=False,
+                **range_kwargs
+            )
+        except Exception as e:
+            print(f"Error fetching data for {', '.join(chunk)}: {e}")
+            continue
+        
+        if data.empty:
+            continue
+        
+        for ticker in chunk:
+            if isinstance(data.columns, pd.MultiIndex):
+                if ticker not in data.columns.get_level_values(0):
+                    continue
+                df = data[ticker]
+            else:
+                # Single ticker downloads come back with flat columns
+                df = data
+            
+            df = df.dropna(how='all')
+            if not df.empty:
+                frames[ticker] = df.copy()
+    
+    return frames
+
+def prepare_data(df: pd.DataFrame, symbol: Optional[str] = None) -> Tuple[pd.DataFrame, pd.DataFrame, pd.Series, pd.Series]:
     """
     Prepare stock data for machine learning
     
+    Technical indicators come from the 'classic' feature set of the shared
+    feature pipeline (SMA20/50/200, RSI, MACD, Bollinger Bands, price change
+    and momentum).
+    
     Args:
         df: DataFrame with stock data
+        symbol: Stock symbol; when given, features are cached per (symbol, last bar)
     
     Returns:
         Tuple of (X_train, X_test, y_train, y_test)
     """
-    # Create technical indicators
-    df['SMA20'] = df['Close'].rolling(window=20).mean()
-    df['SMA50'] = df['Close'].rolling(window=50).mean()
-    df['SMA200'] = df['Close'].rolling(window=200).mean()
-    
-    # Relative Strength Index
-    delta = df['Close'].diff()
-    gain = delta.where(delta > 0, 0)
-    loss = -delta.where(delta < 0, 0)
-    avg_gain = gain.rolling(window=14).mean()
-    avg_loss = loss.rolling(window=14).mean()
-    rs = avg_gain / avg_loss
-    df['RSI'] = 100 - (100 / (1 + rs))
-    
-    # MACD
-    exp1 = df['Close'].ewm(span=12, adjust=False).mean()
-    exp2 = df['Close'].ewm(span=26, adjust=False).mean()
-    df['MACD'] = exp1 - exp2
-    df['Signal_Line'] = df['MACD'].ewm(span=9, adjust=False).mean()
-    
-    # Bollinger Bands
-    df['BB_Middle'] = df['Close'].rolling(window=20).mean()
-    df['BB_Upper'] = df['BB_Middle'] + (df['Close'].rolling(window=20).std() * 2)
-    df['BB_Lower'] = df['BB_Middle'] - (df['Close'].rolling(window=20).std() * 2)
-    
-    # Price ratios
-    df['Price_Change'] = df['Close'].pct_change()
-    df['Price_Momentum'] = df['Close'] / df['Close'].shift(20)
+    df = get_feature_pipeline().compute(df, 'classic', symbol).copy()
     
     # Target - next day's closing price
     df['Target'] = df['Close'].shift(-1)
@@ -76,15 +117,7 @@ def prepare_data(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame, pd.Serie
     # Drop NaN values
     df = df.dropna()
     
-    # Feature columns
-    feature_columns = [
-        'Open', 'High', 'Low', 'Close', 'Volume', 
-        'SMA20', 'SMA50', 'SMA200', 'RSI', 'MACD', 
-        'Signal_Line', 'BB_Middle', 'BB_Upper', 'BB_Lower',
-        'Price_Change', 'Price_Momentum'
-    ]
-    
-    X = df[feature_columns]
+    X = df[FEATURE_SETS['classic']]
     y = df['Target']
     
     return train_test_split(X, y, test_size=0.2, random_state=42, shuffle=False)
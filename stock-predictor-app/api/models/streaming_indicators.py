@@ -0,0 +1,441 @@
+import os
+import json
+import math
+import logging
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from models.feature_pipeline import ewm_mean, ffill
+from models.panel_features import CALENDAR_COLUMNS, INDICATOR_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+# JSON checkpoint of the process-wide engine ("" disables checkpoints)
+INDICATOR_CHECKPOINT = os.getenv(
+    "INDICATOR_CHECKPOINT",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "indicators.json")
+)
+# Closes compared against the source data before new bars are streamed in
+REVISION_CHECK_BARS = 21
+
+NAN = float('nan')
+
+
+class RollingWindow:
+    """Fixed-size window with O(1) running mean and sample standard deviation"""
+
+    # Running sums are rebuilt from the window every this many updates to stop float drift
+    RESYNC_EVERY = 1000
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values: Deque[float] = deque(maxlen=window)
+        self.total = 0.0
+        self.total_sq = 0.0
+        self._updates = 0
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.window
+
+    def push(self, value: float) -> None:
+        if self.full:
+            old = self.values[0]
+            self.total -= old
+            self.total_sq -= old * old
+        self.values.append(value)
+        self.total += value
+        self.total_sq += value * value
+
+        self._updates += 1
+        if self._updates % self.RESYNC_EVERY == 0:
+            self.total = math.fsum(self.values)
+            self.total_sq = math.fsum(v * v for v in self.values)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.window if self.full else NAN
+
+    @property
+    def std(self) -> float:
+        if not self.full or self.window < 2:
+            return NAN
+        mean = self.total / self.window
+        variance = (self.total_sq - self.window * mean * mean) / (self.window - 1)
+        return math.sqrt(max(variance, 0.0))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'window': self.window, 'values': list(self.values)}
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> 'RollingWindow':
+        rolling = cls(state['window'])
+        for value in state['values']:
+            rolling.push(value)
+        return rolling
+
+
+class EMA:
+    """Exponential moving average with pandas ewm(adjust=False) semantics"""
+
+    def __init__(self, alpha: float, value: Optional[float] = None):
+        self.alpha = alpha
+        self.value = value
+
+    @classmethod
+    def from_span(cls, span: int) -> 'EMA':
+        return cls(2.0 / (span + 1.0))
+
+    def push(self, value: float) -> float:
+        if self.value is None:
+            self.value = value
+        else:
+            self.value += self.alpha * (value - self.value)
+        return self.value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'alpha': self.alpha, 'value': self.value}
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> 'EMA':
+        return cls(state['alpha'], state['value'])
+
+
+class IndicatorState:
+    """
+    Running technical indicator state for one symbol.
+
+    Every update is O(1) and the values match the batch implementations
+    (StockPredictor features and stock_data.prepare_data) within float tolerance,
+    including NaN until each window has enough bars.
+    """
+
+    _WINDOWS = (5, 10, 20, 50, 200)
+    RSI_WINDOW = 14
+    MOMENTUM_WINDOW = 20
+
+    def __init__(self):
+        self.windows = {window: RollingWindow(window) for window in self._WINDOWS}
+        self.gains = RollingWindow(self.RSI_WINDOW)
+        self.losses = RollingWindow(self.RSI_WINDOW)
+        self.wilder_gain = EMA(1.0 / self.RSI_WINDOW)
+        self.wilder_loss = EMA(1.0 / self.RSI_WINDOW)
+        self.ema12 = EMA.from_span(12)
+        self.ema26 = EMA.from_span(26)
+        self.signal = EMA.from_span(9)
+        self.closes: Deque[float] = deque(maxlen=self.MOMENTUM_WINDOW + 1)
+        self.last_date: Optional[pd.Timestamp] = None
+        self.bars = 0
+
+    @classmethod
+    def from_history(cls, closes: pd.Series) -> 'IndicatorState':
+        """
+        Build the state after a whole close history with the batch feature primitives
+
+        Args:
+            closes: Closing prices with a DatetimeIndex (NaNs are forward filled)
+
+        Returns:
+            State equal to streaming every bar through update()
+        """
+        values = ffill(closes.to_numpy(dtype=np.float64)[:, None])[:, 0]
+        valid = ~np.isnan(values)
+        if not valid.any():
+            raise ValueError("History has no valid close")
+        # Leading NaNs stay NaN in the batch pipeline too; the state starts at the first close
+        first = int(np.argmax(valid))
+        values, dates = values[first:], closes.index[first:]
+
+        state = cls()
+        for window, rolling in state.windows.items():
+            for value in values[-window:]:
+                rolling.push(float(value))
+
+        delta = np.concatenate(([0.0], np.diff(values)))
+        gain, loss = np.maximum(delta, 0.0), np.maximum(-delta, 0.0)
+        for value in gain[-cls.RSI_WINDOW:]:
+            state.gains.push(float(value))
+        for value in loss[-cls.RSI_WINDOW:]:
+            state.losses.push(float(value))
+
+        # An EMA with alpha 1/14 has span 27
+        wilder_span = int(round(2 / state.wilder_gain.alpha - 1))
+        state.wilder_gain.value = float(ewm_mean(gain[:, None], wilder_span)[-1, 0])
+        state.wilder_loss.value = float(ewm_mean(loss[:, None], wilder_span)[-1, 0])
+        ema12 = ewm_mean(values[:, None], 12)[:, 0]
+        ema26 = ewm_mean(values[:, None], 26)[:, 0]
+        state.ema12.value = float(ema12[-1])
+        state.ema26.value = float(ema26[-1])
+        state.signal.value = float(ewm_mean((ema12 - ema26)[:, None], 9)[-1, 0])
+
+        state.closes.extend(float(value) for value in values[-(cls.MOMENTUM_WINDOW + 1):])
+        state.last_date = pd.Timestamp(dates[-1])
+        state.bars = len(values)
+        return state
+
+    def update(self, close: float, date: Optional[pd.Timestamp] = None) -> Dict[str, float]:
+        """
+        Add one bar and return the current indicator values
+
+        Args:
+            close: Closing price (NaN repeats the previous close, like a forward fill)
+            date: Bar date
+
+        Returns:
+            Dictionary with the current indicator values
+        """
+        prev_close = self.closes[-1] if self.closes else None
+        if close is None or math.isnan(close):
+            if prev_close is None:
+                raise ValueError("First bar must have a valid close")
+            close = prev_close
+        close = float(close)
+
+        for rolling in self.windows.values():
+            rolling.push(close)
+
+        # The first bar has no change; pandas counts it as zero gain and loss
+        delta = close - prev_close if prev_close is not None else 0.0
+        gain, loss = max(delta, 0.0), max(-delta, 0.0)
+        self.gains.push(gain)
+        self.losses.push(loss)
+        self.wilder_gain.push(gain)
+        self.wilder_loss.push(loss)
+
+        macd = self.ema12.push(close) - self.ema26.push(close)
+        self.signal.push(macd)
+
+        self.closes.append(close)
+        self.bars += 1
+        if date is not None:
+            self.last_date = pd.Timestamp(date)
+
+        return self.snapshot()
+
+    def snapshot(self) -> Dict[str, float]:
+        """Current indicator values (both StockPredictor and prepare_data names)"""
+        if not self.closes:
+            return {}
+
+        close = self.closes[-1]
+        prev_close = self.closes[-2] if len(self.closes) > 1 else NAN
+        ma20, std20 = self.windows[20].mean, self.windows[20].std
+        macd = self.ema12.value - self.ema26.value
+
+        values = {
+            'MA5': self.windows[5].mean,
+            'MA10': self.windows[10].mean,
+            'MA20': ma20,
+            'MA50': self.windows[50].mean,
+            'Volatility': self.windows[10].std,
+            'RSI': _rsi(self.gains.mean, self.losses.mean),
+            'RSI_Wilder': _rsi(self.wilder_gain.value, self.wilder_loss.value),
+            'MACD': macd,
+            'MACD_Signal': self.signal.value,
+            'BB_Middle': ma20,
+            'BB_Upper': ma20 + 2 * std20,
+            'BB_Lower': ma20 - 2 * std20,
+            'SMA20': ma20,
+            'SMA50': self.windows[50].mean,
+            'SMA200': self.windows[200].mean,
+            'Signal_Line': self.signal.value,
+            'Price_Change': close / prev_close - 1 if prev_close == prev_close else NAN,
+            'Price_Momentum': (close / self.closes[0]
+                               if len(self.closes) > self.MOMENTUM_WINDOW else NAN),
+        }
+        return values
+
+    def prediction_row(self) -> Dict[str, float]:
+        """Calendar and indicator values in StockPredictor feature order for the last bar"""
+        if self.last_date is None:
+            raise ValueError("No dated bar has been added")
+        values = self.snapshot()
+        date = self.last_date
+        row = dict(zip(CALENDAR_COLUMNS, [date.day, date.month, date.year, date.dayofweek]))
+        row.update({name: values[name] for name in INDICATOR_COLUMNS})
+        return row
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'windows': {str(window): rolling.to_dict() for window, rolling in self.windows.items()},
+            'gains': self.gains.to_dict(),
+            'losses': self.losses.to_dict(),
+            'wilder_gain': self.wilder_gain.to_dict(),
+            'wilder_loss': self.wilder_loss.to_dict(),
+            'ema12': self.ema12.to_dict(),
+            'ema26': self.ema26.to_dict(),
+            'signal': self.signal.to_dict(),
+            'closes': list(self.closes),
+            'last_date': self.last_date.isoformat() if self.last_date is not None else None,
+            'bars': self.bars,
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> 'IndicatorState':
+        indicator = cls()
+        indicator.windows = {int(window): RollingWindow.from_dict(rolling)
+                             for window, rolling in state['windows'].items()}
+        indicator.gains = RollingWindow.from_dict(state['gains'])
+        indicator.losses = RollingWindow.from_dict(state['losses'])
+        indicator.wilder_gain = EMA.from_dict(state['wilder_gain'])
+        indicator.wilder_loss = EMA.from_dict(state['wilder_loss'])
+        indicator.ema12 = EMA.from_dict(state['ema12'])
+        indicator.ema26 = EMA.from_dict(state['ema26'])
+        indicator.signal = EMA.from_dict(state['signal'])
+        indicator.closes = deque(state['closes'], maxlen=cls.MOMENTUM_WINDOW + 1)
+        indicator.last_date = pd.Timestamp(state['last_date']) if state['last_date'] else None
+        indicator.bars = state['bars']
+        return indicator
+
+
+def _rsi(avg_gain: Optional[float], avg_loss: Optional[float]) -> float:
+    if avg_gain is None or avg_loss is None or math.isnan(avg_gain) or math.isnan(avg_loss):
+        return NAN
+    if avg_loss == 0:
+        return NAN if avg_gain == 0 else 100.0
+    return 100 - (100 / (1 + avg_gain / avg_loss))
+
+
+class IndicatorEngine:
+    """
+    Per-symbol streaming indicator states with JSON checkpoints.
+
+    `sync` brings a symbol's state up to the end of a price frame by streaming
+    only the bars after its last processed date. When that date is missing from
+    the frame (a gap) or the recent closes differ from the frame (a revision,
+    e.g. a dividend adjustment), the state is rebuilt from the whole frame.
+    """
+
+    def __init__(self):
+        self.states: Dict[str, IndicatorState] = {}
+        self._lock = threading.Lock()
+
+    def update(self, symbol: str, close: float, date: Optional[pd.Timestamp] = None) -> Dict[str, float]:
+        """Add one bar for a symbol and return its current indicator values"""
+        state = self.states.setdefault(symbol, IndicatorState())
+        return state.update(close, date)
+
+    def update_frame(self, symbol: str, df: pd.DataFrame) -> Dict[str, float]:
+        """
+        Add the bars of `df` that are newer than the symbol's last processed date
+
+        Args:
+            symbol: Stock symbol
+            df: OHLCV DataFrame with a DatetimeIndex
+
+        Returns:
+            Indicator values after the last added bar
+        """
+        state = self.states.setdefault(symbol, IndicatorState())
+        closes = df['Close']
+        if state.last_date is not None:
+            closes = closes[closes.index > state.last_date]
+        for date, close in zip(closes.index, closes.to_numpy(dtype=float)):
+            state.update(close, date)
+        return state.snapshot()
+
+    def snapshot(self, symbol: str) -> Dict[str, float]:
+        state = self.states.get(symbol)
+        return state.snapshot() if state else {}
+
+    @staticmethod
+    def _matches(state: IndicatorState, closes: pd.Series) -> bool:
+        """Whether the state's last date is in `closes` with the same recent closes"""
+        if state.last_date is None or state.last_date not in closes.index:
+            return False
+        position = closes.index.get_loc(state.last_date)
+        if not isinstance(position, int):
+            return False
+        recent = list(state.closes)[-REVISION_CHECK_BARS:]
+        source = closes.iloc[max(0, position + 1 - len(recent)):position + 1].to_numpy(dtype=np.float64)
+        return len(source) == len(recent) and np.allclose(source, recent, rtol=1e-9, atol=0.0)
+
+    def sync(self, symbol: str, df: pd.DataFrame) -> IndicatorState:
+        """
+        Bring a symbol's state up to the last bar of `df`
+
+        Args:
+            symbol: Stock symbol
+            df: OHLCV DataFrame with a DatetimeIndex
+
+        Returns:
+            The symbol's state after the last bar of `df`
+        """
+        closes = df['Close'].ffill()
+        with self._lock:
+            state = self.states.get(symbol)
+            if state is not None and self._matches(state, closes):
+                for date, close in closes[closes.index > state.last_date].items():
+                    state.update(float(close), date)
+            else:
+                if state is not None:
+                    logger.info(f"Rebuilding indicator state for {symbol}: history gap or revision")
+                state = IndicatorState.from_history(closes)
+                self.states[symbol] = state
+            return state
+
+    def latest_features(self, symbol: str, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Last row of prepare_feature_frames(df) computed from the streaming state
+
+        Args:
+            symbol: Stock symbol
+            df: Raw OHLCV DataFrame with a DatetimeIndex
+
+        Returns:
+            One-row DataFrame with the raw, calendar and indicator columns
+        """
+        state = self.sync(symbol, df)
+        # Batch frames forward fill the raw columns and turn remaining gaps into 0
+        row = df.ffill().iloc[-1].astype(np.float64).fillna(0.0).to_dict()
+        values = state.prediction_row()
+        row.update({name: 0.0 if value != value else float(value) for name, value in values.items()})
+        columns = list(df.columns) + CALENDAR_COLUMNS + INDICATOR_COLUMNS
+        return pd.DataFrame([row], index=df.index[-1:], columns=columns)
+
+    def save(self, path: str) -> None:
+        """Checkpoint all states to a JSON file"""
+        with self._lock:
+            states = {symbol: state.to_dict() for symbol, state in self.states.items()}
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(states, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'IndicatorEngine':
+        """Restore states from a JSON checkpoint (empty engine if the file is missing)"""
+        engine = cls()
+        if os.path.exists(path):
+            with open(path) as f:
+                engine.states = {symbol: IndicatorState.from_dict(state)
+                                 for symbol, state in json.load(f).items()}
+        return engine
+
+
+_engine: Optional[IndicatorEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_indicator_engine() -> IndicatorEngine:
+    """Return the process-wide engine, restored from INDICATOR_CHECKPOINT when present"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            try:
+                _engine = IndicatorEngine.load(INDICATOR_CHECKPOINT) if INDICATOR_CHECKPOINT else IndicatorEngine()
+            except Exception as e:
+                logger.warning(f"Could not load indicator checkpoint {INDICATOR_CHECKPOINT}: {e}")
+                _engine = IndicatorEngine()
+        return _engine
+
+
+def save_indicator_engine() -> None:
+    """Checkpoint the process-wide engine to INDICATOR_CHECKPOINT"""
+    if _engine is not None and INDICATOR_CHECKPOINT:
+        _engine.save(INDICATOR_CHECKPOINT)
@@ -0,0 +1,166 @@
+import os
+import time
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+from threadpoolctl import threadpool_limits
+
+logger = logging.getLogger(__name__)
+
+# Number of training processes used by the background sweep
+TRAINING_WORKERS = int(os.getenv("TRAINING_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+# Cores each training task may use (forest n_jobs and BLAS threads)
+TRAINING_THREADS_PER_TASK = int(os.getenv("TRAINING_THREADS_PER_TASK", 1))
+
+# Per-process predictor created by the pool initializer
+_worker_predictor = None
+
+
+def _init_worker(threads_per_task: int) -> None:
+    """Pool initializer: cap native thread pools and build the worker's predictor"""
+    global _worker_predictor
+    from models.predictor import StockPredictor
+
+    threadpool_limits(threads_per_task)
+    _worker_predictor = StockPredictor(n_jobs=threads_per_task)
+
+
+def _predict_task(symbol: str, time_horizon: int, model_type: str,
+                  data: Optional[pd.DataFrame], features: Optional[pd.DataFrame]) -> Dict[str, Any]:
+    return _worker_predictor.predict_stock(symbol, time_horizon, model_type, data, features)
+
+
+def _train_pooled_task(symbols: List[str]) -> Dict[str, float]:
+    return _worker_predictor.train_pooled_model(symbols)
+
+
+class SweepProgress:
+    """Progress counters of the running (or last) sweep"""
+
+    def __init__(self):
+        self.total = 0
+        self.completed = 0
+        self.failed = 0
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+
+    def start(self, total: int) -> None:
+        self.total = total
+        self.completed = 0
+        self.failed = 0
+        self.started_at = datetime.now()
+        self.finished_at = None
+
+    def advance(self, failed: bool = False) -> None:
+        self.completed += 1
+        if failed:
+            self.failed += 1
+        if self.total and self.completed % max(1, self.total // 10) == 0:
+            logger.info(f"Sweep progress: {self.completed}/{self.total} ({self.failed} failed)")
+
+    def finish(self) -> None:
+        self.finished_at = datetime.now()
+
+    @property
+    def running(self) -> bool:
+        return self.started_at is not None and self.finished_at is None
+
+    def as_dict(self) -> Dict[str, Any]:
+        end = self.finished_at or datetime.now()
+        return {
+            "running": self.running,
+            "total": self.total,
+            "completed": self.completed,
+            "failed": self.failed,
+            "percent": round(100 * self.completed / self.total, 1) if self.total else 0.0,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "elapsed_seconds": round((end - self.started_at).total_seconds(), 2) if self.started_at else 0.0,
+        }
+
+
+class TrainingExecutor:
+    """
+    Runs StockPredictor training in a process pool.
+
+    Each task gets `threads_per_task` cores, so a sweep scales with
+    `max_workers` and its pandas/sklearn work does not hold the API
+    process's GIL.
+    """
+
+    def __init__(self, max_workers: int = TRAINING_WORKERS, threads_per_task: int = TRAINING_THREADS_PER_TASK):
+        self.max_workers = max_workers
+        self.threads_per_task = threads_per_task
+        self.progress = SweepProgress()
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: forking a process that runs the event loop and threads is unsafe
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.threads_per_task,)
+            )
+            logger.info(f"Started training pool with {self.max_workers} workers "
+                        f"x {self.threads_per_task} threads")
+        return self._pool
+
+    async def predict(self, symbol: str, time_horizon: int = 7, model_type: str = "random_forest",
+                      data: Optional[pd.DataFrame] = None,
+                      features: Optional[pd.DataFrame] = None) -> Dict[str, Any]:
+        """
+        Run StockPredictor.predict_stock in the pool
+
+        Args:
+            symbol: Stock symbol
+            time_horizon: Prediction horizon in days
+            model_type: Model type
+            data: Raw price data (optional)
+            features: Prepared features (optional, avoids recomputing in the worker)
+
+        Returns:
+            Prediction result dictionary
+        """
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            result = await loop.run_in_executor(
+                self._get_pool(), _predict_task, symbol, time_horizon, model_type, data, features
+            )
+        except Exception as e:
+            logger.error(f"Training task failed for {symbol}: {e}")
+            result = {"error": str(e), "symbol": symbol}
+
+        logger.debug(f"Trained {symbol} in {time.perf_counter() - start:.2f}s")
+        return result
+
+    async def train_pooled(self, symbols: List[str]) -> Dict[str, float]:
+        """
+        Train the pooled model in the pool if it is stale
+
+        The model is saved to the registry, where the API process's
+        predictor picks it up on its next pooled prediction.
+
+        Args:
+            symbols: Universe the model must cover
+
+        Returns:
+            Holdout metrics of the current pooled model
+        """
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        metrics = await loop.run_in_executor(self._get_pool(), _train_pooled_task, symbols)
+        logger.info(f"Pooled model ready after {time.perf_counter() - start:.2f}s")
+        return metrics
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Tests import the API modules the way main.py does ("from models... import ...")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MARKET_DATA_PROVIDER", "replay")
+# Keep the process-wide indicator engine in memory
+os.environ.setdefault("INDICATOR_CHECKPOINT", "")
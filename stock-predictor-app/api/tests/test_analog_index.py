@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+from models.analog_index import AnalogIndex
+
+
+def make_close(rows=400, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.02, rows))),
+                     index=pd.bdate_range("2022-01-03", periods=rows))
+
+
+def indexed(index):
+    return index._patterns[:len(index)], index._outcomes[:len(index)]
+
+
+def assert_same_index(actual, expected):
+    for actual_rows, expected_rows in zip(indexed(actual), indexed(expected)):
+        np.testing.assert_allclose(actual_rows, expected_rows, atol=1e-6)
+
+
+def test_sliding_window_adds_only_new_windows():
+    close = make_close()
+    full = AnalogIndex(window=10, horizon=5)
+    full.update("X", close)
+
+    sliding = AnalogIndex(window=10, horizon=5)
+    sliding.update("X", close.iloc[:250])
+    for end in range(251, len(close) + 1):
+        # Like the sweep's fixed-length period: the window start moves with the end
+        assert sliding.update("X", close.iloc[end - 250:end]) == 1
+    assert_same_index(sliding, full)
+
+
+def test_provisional_last_bar_is_not_a_revision():
+    close = make_close()
+    index = AnalogIndex(window=10, horizon=5)
+    index.update("X", close)
+    size = len(index)
+
+    intraday = close.copy()
+    intraday.iloc[-1] *= 1.03
+    assert index.update("X", intraday) == 0
+    assert len(index) == size
+
+
+def test_revised_history_is_reindexed():
+    close = make_close()
+    index = AnalogIndex(window=10, horizon=5)
+    index.update("X", close.iloc[:300])
+
+    revised = close.iloc[50:].copy()
+    revised.iloc[240] *= 1.05
+    index.update("X", revised)
+
+    expected = AnalogIndex(window=10, horizon=5)
+    expected.update("X", revised)
+    assert_same_index(index, expected)
+
+
+def test_gap_after_indexed_bars_is_reindexed():
+    close = make_close()
+    index = AnalogIndex(window=10, horizon=5)
+    index.update("X", close.iloc[:200])
+    index.update("X", close.iloc[250:])
+
+    expected = AnalogIndex(window=10, horizon=5)
+    expected.update("X", close.iloc[250:])
+    assert_same_index(index, expected)
@@ -0,0 +1,47 @@
+import threading
+
+import numpy as np
+import pytest
+
+pytest.importorskip("statsmodels")
+
+from models.arima_service import ArimaService
+from models.data_providers import ReplayProvider
+
+
+@pytest.fixture(scope="module")
+def close():
+    return ReplayProvider().get_price_history("AKBNK.IS", "2y")['Close']
+
+
+def test_concurrent_updates_append_new_bars_once(tmp_path, close):
+    service = ArimaService(root=str(tmp_path))
+    service.get_state("AKBNK", close.iloc[:-10])
+
+    barrier = threading.Barrier(4)
+    states = []
+
+    def update():
+        barrier.wait()
+        states.append(service.get_state("AKBNK", close))
+
+    threads = [threading.Thread(target=update) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    state = service.get_state("AKBNK", close)
+    assert all(other is state for other in states)
+    assert state.results.nobs == len(close)
+    assert len(state.new_errors) == 10
+    assert state.data_end == close.index[-1]
+
+
+def test_appended_state_matches_filter_over_full_history(tmp_path, close):
+    service = ArimaService(root=str(tmp_path))
+    params = service.get_state("AKBNK", close.iloc[:-10]).params
+    appended = service.forecast("AKBNK", close, steps=5)
+
+    filtered = service._fit(close, params).results.forecast(steps=5)
+    np.testing.assert_allclose(appended, filtered, rtol=1e-8)
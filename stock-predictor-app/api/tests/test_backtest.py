@@ -0,0 +1,44 @@
+import glob
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from models import backtest
+from models.backtest import BacktestConfig, run_backtest
+from models.data_providers import ReplayProvider
+
+CONFIG = BacktestConfig(model="random_forest", horizon=5, step=20, min_train=250, max_folds=2)
+
+
+def registry_dirs():
+    return set(glob.glob(os.path.join(tempfile.gettempdir(), "backtest-models-*")))
+
+
+def prices(symbol="AKBNK.IS"):
+    return ReplayProvider().get_price_history(symbol, "2y")
+
+
+def test_missing_closes_do_not_shift_features():
+    df = prices()
+    gapped = df.copy()
+    gapped.iloc[[100, 180, 300], gapped.columns.get_loc('Close')] = np.nan
+
+    result = run_backtest({"AKBNK.IS": gapped}, CONFIG, workers=1)
+    expected = run_backtest({"AKBNK.IS": gapped.dropna(subset=['Close'])}, CONFIG, workers=1)
+
+    assert result.folds["error"].isna().all()
+    pd.testing.assert_frame_equal(result.folds.drop(columns="seconds"),
+                                  expected.folds.drop(columns="seconds"))
+
+
+def test_worker_registries_are_removed():
+    before = registry_dirs()
+    run_backtest({symbol: prices(symbol) for symbol in ("AKBNK.IS", "THYAO.IS")}, CONFIG, workers=2)
+    assert registry_dirs() <= before
+
+    backtest._init_worker()
+    in_process = backtest._worker_registry_dir.name
+    backtest._init_worker()
+    assert not os.path.exists(in_process)
@@ -0,0 +1,74 @@
+import os
+import threading
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.preprocessing import StandardScaler
+
+from models.compact_forest import CompactForest
+from models.data_providers import ReplayProvider
+from models.model_registry import ModelRegistry
+from models.predictor import StockPredictor
+
+# Not used by other predictor tests, whose frames for the same symbols differ
+SYMBOLS = ["GARAN", "ISCTR", "KCHOL"]
+
+
+def fit_forest(seed, rows=200, features=6):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(rows, features))
+    y = X[:, 0] * 2 + np.sin(X[:, 1]) + rng.normal(0, 0.1, rows)
+    return RandomForestRegressor(n_estimators=20, random_state=seed).fit(X, y), X
+
+
+def test_compact_forest_matches_sklearn(tmp_path):
+    forest, X = fit_forest(0)
+    compact = CompactForest.from_sklearn(forest)
+    compact.save(str(tmp_path / "forest"))
+    np.testing.assert_allclose(CompactForest.load(str(tmp_path / "forest")).predict(X), forest.predict(X), rtol=1e-12)
+
+
+def test_stacked_forests_match_single_forests():
+    forests = [fit_forest(seed) for seed in range(3)]
+    stacked = CompactForest.stack([CompactForest.from_sklearn(forest) for forest, _ in forests])
+    X = np.vstack([X[:10] for _, X in forests])
+    forest_ids = np.repeat(np.arange(3), 10)
+    expected = np.concatenate([forest.predict(X[:10]) for forest, X in forests])
+    np.testing.assert_allclose(stacked.predict(X, forest_ids=forest_ids), expected, rtol=1e-12)
+
+
+def test_predict_latest_scores_stacked_forests(tmp_path):
+    provider = ReplayProvider()
+    frames = {symbol: provider.get_price_history(f"{symbol}.IS", "2y") for symbol in SYMBOLS}
+    predictor = StockPredictor(provider=provider, registry=ModelRegistry(str(tmp_path)))
+    trained = {symbol: predictor.predict_stock(symbol, 7, "random_forest", data=df)["prediction"]
+               for symbol, df in frames.items()}
+
+    latest = predictor.predict_latest(frames, 7, "random_forest")
+    assert len(predictor._stacked_forests) == 1
+    for symbol in SYMBOLS:
+        assert latest[symbol]["prediction"] == pytest.approx(trained[symbol], rel=1e-9)
+
+
+def test_concurrent_saves_keep_one_valid_forest(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    forest, X = fit_forest(0)
+    scaler = StandardScaler().fit(X)
+    frame = ReplayProvider().get_price_history("AKBNK.IS", "2y")
+
+    def save():
+        registry.save("AKBNK", "random_forest", forest, scaler, frame, ["a"] * X.shape[1],
+                      frame.index[-31], {"accuracy": 0.9})
+
+    threads = [threading.Thread(target=save) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    forest_dirs = [name for name in os.listdir(tmp_path) if name.endswith(".forest")]
+    assert len(forest_dirs) == 1
+    record = ModelRegistry(str(tmp_path)).load("AKBNK", "random_forest")
+    assert record.metadata["compact_forest"] == forest_dirs[0]
+    np.testing.assert_allclose(record.model.predict(X), forest.predict(X), rtol=1e-12)
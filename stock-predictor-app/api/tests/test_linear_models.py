@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+from sklearn.linear_model import LinearRegression, Ridge
+from sklearn.preprocessing import StandardScaler
+
+from models.data_providers import ReplayProvider
+from models.linear_models import HOLDOUT_DAYS, fit_linear_models
+from models.panel_features import prepare_feature_frames
+from models.predictor import RAW_COLUMNS
+
+# Not used by other predictor tests, whose frames for the same symbols differ
+SYMBOLS = ["ASELS.IS", "TUPRS.IS", "EREGL.IS"]
+
+
+@pytest.fixture(scope="module")
+def frames():
+    provider = ReplayProvider()
+    raw = {symbol: provider.get_price_history(symbol, "2y") for symbol in SYMBOLS}
+    # A shorter history exercises the padded rows of the batched solve
+    raw["EREGL.IS"] = raw["EREGL.IS"].iloc[200:]
+    return prepare_feature_frames(raw)
+
+
+@pytest.fixture(scope="module")
+def feature_columns(frames):
+    return [column for column in frames["ASELS.IS"].columns if column not in RAW_COLUMNS]
+
+
+@pytest.mark.parametrize("alpha", [1.0, 0.0])
+def test_batched_solve_matches_sklearn(frames, feature_columns, alpha):
+    fitted = fit_linear_models(frames, feature_columns, alpha=alpha)
+
+    for symbol, df in frames.items():
+        model, scaler, metrics, train_end = fitted[symbol]
+        X, y = df[feature_columns].to_numpy(), df['Close'].to_numpy()
+        X_train, X_test = X[:-HOLDOUT_DAYS], X[-HOLDOUT_DAYS:]
+        assert train_end == df.index[-HOLDOUT_DAYS - 1]
+
+        reference_scaler = StandardScaler().fit(X_train)
+        estimator = Ridge(alpha=alpha) if alpha else LinearRegression()
+        reference = estimator.fit(reference_scaler.transform(X_train), y[:-HOLDOUT_DAYS])
+
+        expected = reference.predict(reference_scaler.transform(X_test))
+        actual = model.predict(scaler.transform(X_test))
+        np.testing.assert_allclose(actual, expected, rtol=1e-6, atol=1e-6 * np.abs(y).mean())
+        assert metrics["mae"] == pytest.approx(np.abs(expected - y[-HOLDOUT_DAYS:]).mean(), rel=1e-6)
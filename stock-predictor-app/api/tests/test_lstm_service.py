@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("tensorflow")
+
+from models.data_providers import ReplayProvider
+from models import lstm_service
+from models.lstm_service import LSTMService
+
+
+@pytest.fixture(scope="module")
+def closes():
+    provider = ReplayProvider()
+    return {symbol: provider.get_price_history(symbol, "2y")['Close'] for symbol in ("AKBNK.IS", "THYAO.IS")}
+
+
+@pytest.fixture
+def no_training(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("model was retrained")
+    return lambda service: monkeypatch.setattr(service, "_train", fail)
+
+
+def test_weights_round_trip_after_restart(tmp_path, closes, no_training):
+    close = closes["AKBNK.IS"]
+    trained = LSTMService(root=str(tmp_path), look_back=20, epochs=1).forecast("AKBNK.IS", close, steps=5)
+
+    restarted = LSTMService(root=str(tmp_path), look_back=20, epochs=1)
+    no_training(restarted)
+    np.testing.assert_allclose(restarted.forecast("AKBNK.IS", close, steps=5), trained, rtol=1e-5)
+
+
+def test_forecast_many_uses_training_scaling(tmp_path, closes, no_training):
+    service = LSTMService(root=str(tmp_path), look_back=20, epochs=1)
+    service.forecast_many(closes, steps=5)
+    scaling = service._load(lstm_service.UNIVERSE_KEY).metadata['scaling']
+
+    # Two new bars shift the window's mean; the stored scaling must still be used
+    extended = {symbol: close.copy() for symbol, close in closes.items()}
+    for symbol, close in extended.items():
+        close.iloc[-2:] = close.iloc[-1] * 1.5
+    restarted = LSTMService(root=str(tmp_path), look_back=20, epochs=1)
+    no_training(restarted)
+    forecasts = restarted.forecast_many(extended, steps=5)
+
+    entry = restarted._load(lstm_service.UNIVERSE_KEY)
+    for i, symbol in enumerate(scaling['symbols']):
+        mean, scale = scaling['mean'][i], scaling['scale'][i]
+        window = (extended[symbol].to_numpy()[-20:] - mean) / scale
+        expected = restarted.rollout(entry, window[None, :], 5)[0] * scale + mean
+        np.testing.assert_allclose(forecasts[symbol], expected, rtol=1e-5)
@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from sklearn.linear_model import LinearRegression
+from sklearn.preprocessing import StandardScaler
+
+from models.data_providers import ReplayProvider
+from models.model_registry import ModelRegistry
+
+COLUMNS = ['Open', 'Volume']
+
+
+@pytest.fixture(scope="module")
+def prices():
+    return ReplayProvider().get_price_history("AKBNK.IS", "2y").iloc[:-10]
+
+
+@pytest.fixture
+def stored(tmp_path, prices):
+    registry = ModelRegistry(str(tmp_path), max_age_hours=24, max_new_bars=5)
+    X, y = prices[COLUMNS].to_numpy(), prices['Close'].to_numpy()
+    record = registry.save("AKBNK", "linear_regression", LinearRegression().fit(X, y), StandardScaler().fit(X),
+                           prices, COLUMNS, prices.index[-31], {"accuracy": 0.9})
+    return registry, record
+
+
+def test_fresh_model_is_reused(stored, prices):
+    registry, record = stored
+    assert registry.stale_reason(record, prices, COLUMNS) is None
+    # A few new bars are within max_new_bars
+    longer = ReplayProvider().get_price_history("AKBNK.IS", "2y").iloc[:-5]
+    assert registry.stale_reason(registry.load("AKBNK", "linear_regression"), longer, COLUMNS) is None
+
+
+def test_feature_schema_change(stored, prices):
+    registry, record = stored
+    assert registry.stale_reason(record, prices, COLUMNS + ['High']) == "feature schema changed"
+
+
+def test_old_model(stored, prices):
+    registry, record = stored
+    record.metadata['trained_at'] = (datetime.now() - timedelta(hours=30)).isoformat()
+    assert registry.stale_reason(record, prices, COLUMNS).endswith("h old")
+
+
+def test_new_bars(stored):
+    registry, record = stored
+    full = ReplayProvider().get_price_history("AKBNK.IS", "2y")
+    assert registry.stale_reason(record, full, COLUMNS) == "10 new bars since training"
+
+
+def test_revised_training_bar(stored, prices):
+    registry, record = stored
+    revised = prices.copy()
+    revised.iloc[50, revised.columns.get_loc('Close')] *= 1.01
+    assert registry.stale_reason(record, revised, COLUMNS) == "training data changed"
+
+    # Revisions after the training window do not invalidate the model
+    revised = prices.copy()
+    revised.iloc[-1, revised.columns.get_loc('Close')] = np.nan
+    assert registry.stale_reason(record, revised, COLUMNS) is None
@@ -0,0 +1,97 @@
+import asyncio
+from datetime import datetime
+
+import httpx
+import pytest
+
+from models import news_client
+from models.news_client import BACKOFF_BASE_SECONDS, NewsClient, RateLimiter
+
+
+class FakeClock:
+    """Monotonic clock advanced only by the sleeps it records"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(news_client.asyncio, "sleep", clock.sleep)
+    return clock
+
+
+def make_client(clock, handler, calls_per_minute=60, max_retries=4):
+    requests = []
+
+    def record(request):
+        requests.append((clock.now, request))
+        return handler(request, len(requests))
+
+    limiter = RateLimiter(calls_per_minute, burst=10, clock=clock)
+    client = NewsClient("key", limiter, max_retries=max_retries, transport=httpx.MockTransport(record))
+    return client, requests
+
+
+def company_news(client):
+    async def run():
+        try:
+            return await client.company_news("AKBNK", datetime(2024, 1, 1), datetime(2024, 1, 31))
+        finally:
+            await client.aclose()
+    return asyncio.run(run())
+
+
+def test_limiter_caps_calls_per_minute(clock):
+    limiter = RateLimiter(60, burst=10, clock=clock)
+    used = []
+
+    async def run():
+        for _ in range(300):
+            await limiter.acquire()
+            used.append(clock.now)
+    asyncio.run(run())
+
+    # Burst first, then spaced at the refill rate
+    assert used[:10] == [0.0] * 10
+    for start in used:
+        assert sum(start <= t < start + 60 for t in used) <= 60
+    assert used[-1] == pytest.approx((300 - 10) * 60 / 50)
+
+
+def test_retry_after_delays_the_retry(clock):
+    def handler(request, attempt):
+        if attempt == 1:
+            return httpx.Response(429, headers={"Retry-After": "7"})
+        return httpx.Response(200, json=[{"headline": "Record profit"}])
+
+    client, requests = make_client(clock, handler)
+    assert company_news(client) == [{"headline": "Record profit"}]
+
+    assert len(requests) == 2
+    assert requests[1][0] - requests[0][0] >= 7
+    assert requests[0][1].headers["X-Finnhub-Token"] == "key"
+    assert requests[0][1].url.params["symbol"] == "AKBNK"
+    # The limiter was paused too, so other callers also wait out the Retry-After
+    assert client.limiter.reserve() > 0
+
+
+def test_server_errors_back_off_with_jitter_then_raise(clock):
+    client, requests = make_client(clock, lambda request, attempt: httpx.Response(503), max_retries=3)
+    with pytest.raises(httpx.HTTPStatusError):
+        company_news(client)
+
+    assert len(requests) == 4
+    backoffs = clock.sleeps
+    assert len(backoffs) == 3
+    for attempt, seconds in enumerate(backoffs):
+        assert 0 <= seconds <= BACKOFF_BASE_SECONDS * 2 ** attempt
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from models.price_store import PriceStore
+
+
+class FakeSource:
+    """Download function serving slices of one frame"""
+
+    def __init__(self, df):
+        self.df = df
+        self.calls = []
+
+    def __call__(self, symbols, period='2y', start=None):
+        self.calls.append((tuple(symbols), period, start))
+        df = self.df if start is None else self.df[self.df.index >= start]
+        return {symbol: df.copy() for symbol in symbols}
+
+
+@pytest.fixture
+def history():
+    index = pd.bdate_range("2024-01-01", periods=300)
+    return pd.DataFrame({
+        'Open': 1.0, 'High': 1.0, 'Low': 1.0,
+        'Close': np.linspace(10, 20, len(index)), 'Volume': 1.0,
+    }, index=index)
+
+
+def test_incremental_refresh_appends_new_bars(tmp_path, history):
+    source = FakeSource(history.iloc[:250])
+    store = PriceStore(str(tmp_path), max_age=0, fetch=source)
+    assert store.refresh(["A"], period='max') == {"A": 250}
+
+    source.df = history.iloc[:260]
+    assert store.refresh(["A"], period='max') == {"A": 10}
+    # Starts at the last completed stored bar
+    assert source.calls[-1][2] == history.index[248].strftime('%Y-%m-%d')
+    pd.testing.assert_frame_equal(store.read("A"), history.iloc[:260], check_freq=False)
+
+
+def test_revised_history_is_downloaded_again(tmp_path, history):
+    source = FakeSource(history.iloc[:250])
+    store = PriceStore(str(tmp_path), max_age=0, fetch=source)
+    store.refresh(["A"], period='max')
+
+    # A dividend rescales every earlier adjusted close
+    adjusted = history.iloc[:270].copy()
+    adjusted['Close'] *= 0.9
+    source.df = adjusted
+    store.refresh(["A"], period='max')
+
+    assert source.calls[-1] == (("A",), 'max', None)
+    np.testing.assert_allclose(store.read("A")['Close'], adjusted['Close'])
+
+
+def test_unadjusted_files_are_replaced(tmp_path, history):
+    source = FakeSource(history)
+    store = PriceStore(str(tmp_path), max_age=0, fetch=source)
+    legacy = history.copy()
+    legacy['Adj Close'] = legacy['Close']
+    store.write("A", legacy)
+
+    assert not store.is_adjusted("A")
+    store.refresh(["A"], period='max')
+    assert store.is_adjusted("A")
+    assert 'Adj Close' not in store.read("A")
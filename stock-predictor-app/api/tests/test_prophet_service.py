@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("prophet")
+
+from models.data_providers import ReplayProvider
+from models.prophet_service import ProphetService
+
+# Warm-started refits converge to the fresh fit's optimum up to optimizer tolerance
+FORECAST_RTOL = 0.01
+
+
+@pytest.fixture(scope="module")
+def closes():
+    provider = ReplayProvider()
+    return {symbol: provider.get_price_history(symbol, "2y")['Close'] for symbol in ("AKBNK.IS", "THYAO.IS")}
+
+
+def assert_forecasts_close(actual, expected, rtol=FORECAST_RTOL):
+    assert actual['dates'] == expected['dates']
+    np.testing.assert_allclose(actual['forecast'], expected['forecast'], rtol=rtol)
+
+
+def test_reloaded_model_matches_fit(tmp_path, closes, monkeypatch):
+    close = closes["AKBNK.IS"]
+    fitted = ProphetService(root=str(tmp_path)).forecast("AKBNK.IS", close)
+
+    restarted = ProphetService(root=str(tmp_path))
+    monkeypatch.setattr("models.prophet_service.Prophet.fit",
+                        lambda *args, **kwargs: pytest.fail("model was refitted"))
+    reloaded = restarted.forecast("AKBNK.IS", close)
+    # Bounds come from uncertainty sampling; the point forecast is deterministic
+    np.testing.assert_array_equal(reloaded['forecast'], fitted['forecast'])
+    assert reloaded['dates'] == fitted['dates']
+
+
+def test_warm_started_refit_matches_fresh_fit(tmp_path, closes):
+    close = closes["AKBNK.IS"]
+    service = ProphetService(root=str(tmp_path / "warm"), max_new_bars=5)
+    service.forecast("AKBNK.IS", close.iloc[:-20])
+    warm = service.forecast("AKBNK.IS", close)
+    assert service._load("AKBNK.IS")[1]['data_end'] == close.index[-1].tz_localize(None).isoformat()
+
+    fresh = ProphetService(root=str(tmp_path / "fresh")).forecast("AKBNK.IS", close)
+    assert_forecasts_close(warm, fresh)
+
+
+def test_pool_forecasts_match_in_process(tmp_path, closes, monkeypatch):
+    service = ProphetService(root=str(tmp_path), workers=2)
+    try:
+        pooled = service.forecast_many(closes)
+    finally:
+        service.shutdown()
+
+    assert set(pooled) == set(closes)
+    monkeypatch.setattr("models.prophet_service.Prophet.fit",
+                        lambda *args, **kwargs: pytest.fail("model was refitted"))
+    for symbol, close in closes.items():
+        # Workers stored their models; the in-process forecast reuses them
+        np.testing.assert_array_equal(service.forecast(symbol, close)['forecast'], pooled[symbol]['forecast'])
@@ -0,0 +1,41 @@
+import pytest
+
+from models.refresh_scheduler import RefreshScheduler
+
+SYMBOLS = [f"S{i:03d}" for i in range(700)]
+HOT, SUBSCRIBED = "S123", "S456"
+T0 = 1_000_000.0
+
+
+@pytest.fixture
+def scheduler():
+    # 700 symbols polled hourly would need 11.7 calls per minute: over the budget of 10
+    scheduler = RefreshScheduler(SYMBOLS, subscribers=lambda: {SUBSCRIBED: 2}, calls_per_minute=10,
+                                 min_interval=60, max_interval=3600)
+    for symbol in SYMBOLS:
+        scheduler.record(symbol, 0, now=T0 - 3600)
+    for symbol in SYMBOLS:
+        scheduler.record(symbol, 20 if symbol == HOT else 0, now=T0)
+    return scheduler
+
+
+def test_intervals_are_stretched_into_the_budget(scheduler):
+    intervals = scheduler._intervals()
+    assert sum(60.0 / interval for interval in intervals.values()) == pytest.approx(10)
+    assert scheduler.status()["planned_calls_per_minute"] <= 10
+    # Stretching keeps the order: news and subscribers still shorten the interval
+    assert intervals[HOT] < intervals[SUBSCRIBED] < intervals["S000"]
+    assert scheduler.status()["symbols"][0]["symbol"] == HOT
+
+
+def test_hot_and_subscribed_symbols_are_polled_first(scheduler):
+    assert scheduler.due(now=T0 + 60) == []
+    assert scheduler.due(now=T0 + 600) == [HOT, SUBSCRIBED]
+
+
+def test_due_is_limited_by_tokens_most_overdue_first(scheduler):
+    batch = scheduler.due(now=T0 + 5000)
+    assert len(batch) == 10
+    assert batch[:2] == [HOT, SUBSCRIBED]
+    # The budget is spent: nothing more until tokens refill
+    assert scheduler.due(now=T0 + 5000) == []
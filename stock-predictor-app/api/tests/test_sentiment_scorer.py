@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("textblob")
+
+from benchmarks.sentiment_parity import MIN_EXACT, MIN_LABEL, corpus, textblob_score
+from models.sentiment_analysis import get_sentiment_explanation
+from models.sentiment_scorer import SentimentScorer, score_articles_local
+
+
+@pytest.fixture(scope="module")
+def articles():
+    return corpus()
+
+
+@pytest.fixture(scope="module")
+def expected(articles):
+    return [textblob_score(article) for article in articles]
+
+
+def test_scores_match_textblob(articles, expected):
+    actual = score_articles_local(articles)
+    assert [e is None for e in expected] == [a is None for a in actual]
+
+    pairs = np.array([(e, a) for e, a in zip(expected, actual) if e is not None])
+    assert (np.abs(pairs[:, 0] - pairs[:, 1]) < 1e-9).mean() >= MIN_EXACT
+    assert np.mean([get_sentiment_explanation(e) == get_sentiment_explanation(a) for e, a in pairs]) >= MIN_LABEL
+
+
+def test_pool_matches_local_scores(articles):
+    scorer = SentimentScorer(workers=2, pool_min_articles=0)
+    try:
+        assert scorer.score_articles(articles) == score_articles_local(articles)
+    finally:
+        scorer.shutdown()
@@ -0,0 +1,69 @@
+import math
+import time
+from datetime import datetime
+
+import pytest
+
+from models.news_store import NewsStore
+from models.sentiment_analysis import SentimentAnalyzer
+from models.sentiment_stream import DecayedStats, SentimentStream
+
+DAY = 86400.0
+
+
+def decayed_mean(articles, half_life):
+    anchor = max(timestamp for timestamp, _ in articles)
+    weights = [math.pow(2.0, -(anchor - timestamp) / half_life) for timestamp, _ in articles]
+    return sum(w * score for w, (_, score) in zip(weights, articles)) / sum(weights), sum(weights)
+
+
+def test_decayed_stats_match_direct_weights():
+    articles = [(0.0, 0.5), (3 * DAY, -0.2), (1 * DAY, 0.1), (10 * DAY, 0.8)]
+    stats = DecayedStats(7 * DAY)
+    for timestamp, score in articles:
+        stats.add(timestamp, score)
+
+    mean, weight = decayed_mean(articles, 7 * DAY)
+    result = stats.at(10 * DAY)
+    assert result['sentiment'] == pytest.approx(mean, rel=1e-12)
+    assert result['articles'] == pytest.approx(weight, rel=1e-12)
+    # One half-life later the effective count halves, the mean is unchanged
+    later = stats.at(17 * DAY)
+    assert later['articles'] == pytest.approx(weight / 2, rel=1e-12)
+    assert later['sentiment'] == pytest.approx(mean, rel=1e-12)
+
+
+def test_updated_leaves_stream_unchanged():
+    stream = SentimentStream(["1d", "7d"])
+    stream.update("X", [0.0], [0.4])
+    before = stream.state("X")
+
+    state = stream.updated("X", [DAY, 2 * DAY], [-0.3, None])
+    assert stream.state("X") == before
+    assert stream.restore("X", state)
+
+    expected = SentimentStream(["1d", "7d"])
+    expected.update("X", [0.0, DAY, 2 * DAY], [0.4, -0.3, None])
+    assert stream.state("X") == pytest.approx(expected.state("X"))
+
+
+def test_failed_store_write_does_not_fold_articles(tmp_path, monkeypatch):
+    analyzer = SentimentAnalyzer(store=NewsStore(str(tmp_path / "news.db")))
+    now = time.time()
+    articles = [{'id': i, 'datetime': int(now - i * 3600), 'headline': headline, 'summary': ''}
+                for i, headline in enumerate(["Record profit", "Heavy losses", "Strong growth"])]
+    start, fetched_at = datetime.fromtimestamp(now - 30 * DAY), datetime.fromtimestamp(now)
+
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+    with monkeypatch.context() as patch:
+        patch.setattr(analyzer.news_store, "add", fail)
+        with pytest.raises(OSError):
+            analyzer._ingest_and_summarize("AKBNK.IS", articles, start, fetched_at)
+    # Aggregates still match the (empty) store
+    assert all(weight == 0 for _, weight, _, _ in analyzer.sentiment_stream.state("AKBNK.IS").values())
+
+    # The retry ingests the same articles once
+    result = analyzer._ingest_and_summarize("AKBNK.IS", articles, start, fetched_at)
+    assert result['new_articles'] == 3
+    assert result['sentiment_horizons']['30d']['articles'] == pytest.approx(3, abs=0.01)
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from models.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    calls = []
+
+    async def compute(value):
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        return value * 2
+
+    async def run():
+        flight = SingleFlight()
+        results = await asyncio.gather(*(flight.do("key", compute, 21) for _ in range(10)))
+        assert len(flight) == 0
+        # Released once finished: a later call computes again
+        await flight.do("key", compute, 1)
+        return results
+
+    assert asyncio.run(run()) == [42] * 10
+    assert calls == [21, 1]
+
+
+def test_different_keys_run_separately():
+    calls = []
+
+    def compute(value):
+        calls.append(value)
+        return value
+
+    async def run():
+        flight = SingleFlight()
+        return await asyncio.gather(flight.run_in_thread("a", compute, 1), flight.run_in_thread("b", compute, 2))
+
+    assert asyncio.run(run()) == [1, 2]
+    assert sorted(calls) == [1, 2]
+
+
+def test_errors_reach_every_caller():
+    calls = []
+
+    async def fail():
+        calls.append(None)
+        await asyncio.sleep(0.01)
+        raise ValueError("no data")
+
+    async def run():
+        flight = SingleFlight()
+        return await asyncio.gather(*(flight.do("key", fail) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_cancelled_waiter_does_not_cancel_shared_call():
+    async def compute():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def run():
+        flight = SingleFlight()
+        first = asyncio.ensure_future(flight.do("key", compute))
+        second = asyncio.ensure_future(flight.do("key", compute))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(run()) == "done"
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from models.data_providers import ReplayProvider
+from models.model_registry import ModelRegistry
+from models.panel_features import prepare_feature_frames
+from models.predictor import StockPredictor
+from models.streaming_indicators import IndicatorEngine, IndicatorState
+
+
+@pytest.fixture(scope="module")
+def prices():
+    df = ReplayProvider().get_price_history("AKBNK.IS", "2y")
+    df.iloc[100:103, df.columns.get_loc('Close')] = np.nan
+    return df
+
+
+def assert_matches_batch(row, df):
+    expected = prepare_feature_frames({"X": df}, use_cache=False)["X"].iloc[-1:]
+    assert list(row.columns) == list(expected.columns)
+    np.testing.assert_allclose(row.to_numpy(), expected.to_numpy(), rtol=1e-9, atol=1e-9)
+
+
+def test_streamed_rows_match_batch_features(prices):
+    engine = IndicatorEngine()
+    for end in (30, 60, 250, 251, 252, 300, len(prices)):
+        assert_matches_batch(engine.latest_features("X", prices.iloc[:end]), prices.iloc[:end])
+
+
+def test_sliding_window_streams_new_bars(prices):
+    engine = IndicatorEngine()
+    engine.latest_features("X", prices.iloc[:400])
+    state = engine.states["X"]
+    # The window start moves forward as new bars arrive
+    row = engine.latest_features("X", prices.iloc[5:405])
+    assert engine.states["X"] is state
+    assert_matches_batch(row, prices.iloc[5:405])
+
+
+def test_revision_rebuilds_state(prices):
+    engine = IndicatorEngine()
+    engine.latest_features("X", prices.iloc[:400])
+    state = engine.states["X"]
+    adjusted = prices.iloc[:410].copy()
+    adjusted['Close'] *= 0.95
+    row = engine.latest_features("X", adjusted)
+    assert engine.states["X"] is not state
+    assert_matches_batch(row, adjusted)
+
+
+def test_history_seed_equals_streaming(prices):
+    seeded = IndicatorState.from_history(prices['Close'].iloc[:300])
+    streamed = IndicatorState()
+    for date, close in prices['Close'].iloc[:300].ffill().items():
+        streamed.update(close, date)
+    np.testing.assert_allclose(list(seeded.snapshot().values()), list(streamed.snapshot().values()),
+                               rtol=1e-9, equal_nan=True)
+
+
+@pytest.mark.parametrize("model_type", ["random_forest", "multi_horizon"])
+def test_predictor_latest_row_matches_full_frame(tmp_path, prices, model_type):
+    predictor = StockPredictor(provider=ReplayProvider(), registry=ModelRegistry(str(tmp_path)))
+    trained = predictor.predict_stock("AKBNK", 7, model_type, data=prices)
+    # Fresh stored model: scored from the streaming row without a feature frame
+    assert predictor.predict_latest({"AKBNK": prices}, 7, model_type)["AKBNK"]["prediction"] == \
+        pytest.approx(trained["prediction"], rel=1e-9)
+    # No stored model: left to the training path
+    assert predictor.predict_latest({"THYAO": prices}, 7, model_type) == {}